@@ -1,22 +1,72 @@
 import os
 
-from bottle import Bottle, run
+from bottle import Bottle
 from controllers import (
     camera_controller,
     data_controller,
+    profiler_controller,
     projector_calibration_controller,
 )
+from services.shared_module_service import load_shared_module
+
+# The server mode and the profiler are shared with SVG Utils
+wsgi_server = load_shared_module("wsgi_server")
+request_profiler = load_shared_module("request_profiler")
 
 app: Bottle = Bottle()
 
+# Maximum size of the request bodies, larger requests get a 413 error.
+# Above the 10 MB of the uploaded files, for the rest of the multipart body
+max_request_bytes = int(os.getenv("MAX_REQUEST_BYTES", str(16 * 1024 * 1024)))
+
+
+@app.get("/health")
+def health():
+    # Does not use OpenCV, so it answers as soon as the app is started
+    return {"status": "ok"}
+
+
+# Optional profiling of the next requests and of the requests with a header, listed at /profiles
+if profiler_controller.profiler is not None:
+    app.mount("/profiles", profiler_controller.app)
 app.mount("/camera", camera_controller.app)
 app.mount("/projector-calibration", projector_calibration_controller.app)
 app.mount("/", data_controller.app)
 
+# The WSGI app to serve, profiling the requests if enabled
+application = wsgi_server.RequestSizeLimitMiddleware(
+    (
+        request_profiler.ProfilingMiddleware(
+            app, profiler_controller.profiler, "/profiles"
+        )
+        if profiler_controller.profiler is not None
+        else app
+    ),
+    max_request_bytes,
+)
+
 if __name__ == "__main__":
     host = os.getenv("HOST")
     port = os.getenv("PORT")
     if not host or not port:
         raise ValueError("Environment variables HOST and PORT must be set.")
 
-    run(app, host=host, port=port)
+    # The cameras are opened in the memory of the process, so the requests are handled by threads of a single process
+    workers = int(os.getenv("SERVER_WORKERS", "1"))
+    if workers != 1:
+        raise ValueError(
+            f"The cameras are kept in memory, SERVER_WORKERS must be 1, got {workers}."
+        )
+
+    # The reference server by default, or a multi-threaded server (waitress, or gunicorn with a single worker)
+    options = wsgi_server.get_server_options(
+        os.getenv("SERVER", "wsgiref"),
+        host,
+        int(port),
+        threads=int(os.getenv("SERVER_THREADS", "1")),
+        keepalive=int(os.getenv("SERVER_KEEPALIVE", "5")),
+        graceful_timeout=int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")),
+        timeout=int(os.getenv("SERVER_TIMEOUT", "120")),
+        max_request_bytes=max_request_bytes,
+    )
+    wsgi_server.run_server(application, options)
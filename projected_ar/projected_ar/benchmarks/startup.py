@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Directory of the projected_ar modules, from which the app is imported
+PROJECTED_AR_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Maximum median time to import the app, in seconds
+DEFAULT_BUDGET = 0.15
+# Heavy modules that must not be imported with the app, only when a request uses them
+HEAVY_MODULES = ("cv2", "numpy")
+
+# Script run in a new process, measuring the import of the app, then the first use of OpenCV
+MEASURE_SCRIPT = f"""
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import app
+import_seconds = time.perf_counter() - start
+imported_heavy_modules = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+
+from services import aruco_dict_service
+
+start = time.perf_counter()
+aruco_dict_service.get_aruco_dict("DICT_4X4_50")
+first_use_seconds = time.perf_counter() - start
+
+print(json.dumps({{
+    "import_seconds": import_seconds,
+    "first_use_seconds": first_use_seconds,
+    "imported_heavy_modules": imported_heavy_modules,
+}}))
+"""
+
+
+def measure_startup() -> dict:
+    """
+    Measure the startup of the app in a new Python process.
+
+    Raises:
+        RuntimeError: If the process fails.
+
+    Returns:
+        dict: The time to import the app and the time of the first use of OpenCV in seconds,
+            and the heavy modules imported with the app.
+    """
+    process = subprocess.run(
+        [sys.executable, "-c", MEASURE_SCRIPT],
+        cwd=PROJECTED_AR_DIRECTORY,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"The startup measure failed:\n{process.stderr}")
+    return json.loads(process.stdout)
+
+
+def main() -> int:
+    """
+    Measure the startup of the app from the command line, and check it against the budget.
+
+    Returns:
+        int: Exit status, 1 if the startup is over the budget or imports a heavy module.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the time to import the app, and check it against a budget."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of processes measured."
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET,
+        help="Maximum median import time, in seconds.",
+    )
+    arguments = parser.parse_args()
+
+    results = [measure_startup() for _ in range(arguments.repeat)]
+    import_seconds = statistics.median(result["import_seconds"] for result in results)
+    first_use_seconds = statistics.median(
+        result["first_use_seconds"] for result in results
+    )
+    imported_heavy_modules = sorted(
+        {name for result in results for name in result["imported_heavy_modules"]}
+    )
+    print(
+        f"import: {import_seconds * 1000:.1f} ms (budget {arguments.budget * 1000:.0f} ms), "
+        f"first use of OpenCV: {first_use_seconds * 1000:.1f} ms"
+    )
+
+    status = 0
+    if import_seconds > arguments.budget:
+        print("The import of the app is over the budget.", file=sys.stderr)
+        status = 1
+    if imported_heavy_modules:
+        print(
+            f"Heavy modules imported with the app: {', '.join(imported_heavy_modules)}.",
+            file=sys.stderr,
+        )
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,51 @@
-from dataclasses import dataclass
-from pathlib import Path
+from __future__ import annotations
 
-import cv2
-from bottle import Bottle, FormsDict, request, response
-from services import camera_service
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterator
 
-PROJECT_ROOT = Path(__file__).parent.parent
-DATA_DIR = PROJECT_ROOT / "data"
+from bottle import Bottle, FormsDict, request, response
+from services import (
+    aruco_dict_service,
+    camera_service,
+    capture_store_service,
+    image_service,
+    projector_calibration_service,
+    stream_service,
+    tracking_service,
+)
+from services.lazy_import_service import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+# Ways of saving the captures to disk: in a background thread, before responding, or not at all
+SAVE_MODES = ("async", "sync", "none")
+# Default number of frames of a burst
+DEFAULT_BURST_FRAMES = 5
 
 
 @dataclass
 class Camera:
     id: int
     source: int
-    video_capture: cv2.VideoCapture
+    grabber: camera_service.FrameGrabber
     id_capture: int = 0
+    # Tracker of the markers updating the homography correction, if tracking is started
+    tracker: tracking_service.MarkerTracker | None = None
+    # Serializes the numbering of the captures, the requests being handled by several threads
+    lock: threading.Lock = field(default_factory=threading.Lock)
 
 
 app = Bottle()
 
 id_counter: int = 0
 cameras: dict[int, Camera] = {}
+# Protects id_counter and cameras, the requests being handled by several threads
+cameras_lock = threading.Lock()
 
 
 @app.post("/camera")
@@ -48,18 +73,21 @@ def open_camera():
             "message": "Failed to open the camera.",
         }
 
-    id_counter += 1
-    while id_counter in cameras:
+    # The frames are read continuously, so that a capture gets the newest one at once
+    grabber = camera_service.start_grabber(camera)
+
+    with cameras_lock:
         id_counter += 1
+        while id_counter in cameras:
+            id_counter += 1
+        camera_id = id_counter
 
-    cameras[id_counter] = Camera(
-        id=id_counter, source=camera_source, video_capture=camera
-    )
+        cameras[camera_id] = Camera(id=camera_id, source=camera_source, grabber=grabber)
 
     response.status = 201
     return {
         "message": "Camera opened successfully.",
-        "camera_id": id_counter,
+        "camera_id": camera_id,
         "camera_source": camera_source,
     }
 
@@ -113,8 +141,17 @@ def close_camera(camera_id: str):
             "message": f"The camera with ID '{camera_id}' was not found.",
         }
 
-    camera_service.close_camera(camera.video_capture)
-    del cameras[camera_id]
+    with cameras_lock:
+        if cameras.pop(camera_id, None) is None:
+            response.status = 404
+            return {
+                "error": "Camera not found",
+                "message": f"The camera with ID '{camera_id}' was not found.",
+            }
+    if camera.tracker is not None:
+        camera.tracker.stop()
+    camera_service.close_camera(camera.grabber)
+    capture_store_service.capture_store.remove_camera(camera_id)
 
     response.status = 200
     return {"message": f"Camera with ID '{camera_id}' closed successfully."}
@@ -122,58 +159,478 @@ def close_camera(camera_id: str):
 
 @app.post("/camera/<camera_id>/capture")
 def capture_image(camera_id: str):
+    request_time = time.monotonic()
     response.content_type = "application/json"
 
+    camera = _find_camera(camera_id)
+    if isinstance(camera, dict):
+        return camera
+
+    options = _parse_capture_options(request_time)
+    if isinstance(options, dict):
+        return options
+    read_after, timeout, save_mode = options
+
     try:
-        camera_id = int(camera_id)
+        frame = camera_service.capture_image(camera.grabber, read_after, timeout)
+    except camera_service.CameraCaptureException:
+        response.status = 500
+        return {
+            "error": "Camera Error",
+            "message": f"Failed to capture an image from the camera with ID '{camera.id}'.",
+            "camera_id": camera.id,
+        }
+
+    capture = _store_capture(camera, frame.image, frame.timestamp, save_mode)
+    if "error" in capture:
+        return capture
+
+    response.status = 201
+    return {"message": "Image captured successfully.", **capture}
+
+
+@app.post("/camera/<camera_id>/burst")
+def capture_burst(camera_id: str):
+    request_time = time.monotonic()
+    response.content_type = "application/json"
+
+    camera = _find_camera(camera_id)
+    if isinstance(camera, dict):
+        return camera
+
+    options = _parse_capture_options(request_time)
+    if isinstance(options, dict):
+        return options
+    read_after, timeout, save_mode = options
+
+    try:
+        frame_count = int(request.params.get("frame_count", DEFAULT_BURST_FRAMES))
     except ValueError:
         response.status = 400
         return {
             "error": "Invalid request data",
-            "message": "The camera ID must be an integer.",
+            "message": "The number of frames must be an integer.",
         }
-
-    camera = cameras.get(camera_id)
-    if not camera:
-        response.status = 404
+    stack_method = request.params.get("stack_method", "mean")
+    if stack_method not in image_service.STACK_METHODS:
+        response.status = 400
         return {
-            "error": "Camera not found",
-            "message": f"The camera with ID '{camera_id}' was not found.",
+            "error": "Invalid request data",
+            "message": f"The stack method must be one of {', '.join(image_service.STACK_METHODS)}.",
         }
 
+    # Optional detection of the markers, in the stacked frame and, with merge_frames, in each frame
+    aruco_dict_type = request.params.get("aruco_dict_type")
+    merge_frames = request.params.get("merge_frames", "").lower() in ("1", "true")
+    if aruco_dict_type:
+        try:
+            aruco_dict = aruco_dict_service.get_aruco_dict(aruco_dict_type)
+        except ValueError:
+            response.status = 400
+            return {
+                "error": "Invalid request data",
+                "message": f"The 'aruco_dict_type' is invalid: {aruco_dict_type}.",
+                "valid_types": list(aruco_dict_service.ARUCO_DICTS),
+            }
+        try:
+            parameters = projector_calibration_service.parse_detector_parameters(
+                request.params
+            )
+        except ValueError as e:
+            response.status = 400
+            return {
+                "error": "Invalid request data",
+                "message": f"The detector parameters are invalid: {e}",
+            }
+
     try:
-        image = camera_service.capture_image(camera.video_capture)
+        frames = camera_service.capture_burst(
+            camera.grabber, frame_count, read_after, timeout
+        )
+    except ValueError as e:
+        response.status = 400
+        return {"error": "Invalid request data", "message": str(e)}
     except camera_service.CameraCaptureException:
         response.status = 500
         return {
             "error": "Camera Error",
-            "message": f"Failed to capture an image from the camera with ID '{camera_id}'.",
-            "camera_id": camera_id,
+            "message": f"Failed to capture a burst from the camera with ID '{camera.id}'.",
+            "camera_id": camera.id,
+        }
+
+    try:
+        image = image_service.stack_images(
+            [frame.image for frame in frames], stack_method
+        )
+    except ValueError as e:
+        # The resolution or the format of the camera changed during the burst
+        response.status = 500
+        return {
+            "error": "Camera Error",
+            "message": f"Failed to stack the frames of the burst from the camera with ID '{camera.id}': {e}",
+            "camera_id": camera.id,
         }
+    capture = _store_capture(camera, image, frames[-1].timestamp, save_mode)
+    if "error" in capture:
+        return capture
+    burst = {
+        "message": "Burst captured successfully.",
+        **capture,
+        "frame_count": len(frames),
+        "frame_timestamps": [frame.timestamp for frame in frames],
+        "stack_method": stack_method,
+    }
+    if not aruco_dict_type:
+        response.status = 201
+        return burst
 
-    camera.id_capture += 1
-    capture_filename = f"capture_{camera_id}_{camera.id_capture}.jpg"
-    capture_filepath = (
-        DATA_DIR / "camera" / str(camera_id) / "captures" / capture_filename
+    # The markers of the stacked frame, completed by the markers it misses but some frames show
+    detected_markers = projector_calibration_service.detect_markers(
+        image, aruco_dict, parameters
     )
-    capture_filepath.parent.mkdir(parents=True, exist_ok=True)
+    if merge_frames:
+        merged_markers, detection_counts = (
+            projector_calibration_service.merge_detections(
+                [
+                    projector_calibration_service.detect_markers(
+                        frame.image, aruco_dict, parameters
+                    )
+                    for frame in frames
+                ]
+            )
+        )
+        detected_markers = {**merged_markers, **detected_markers}
+        burst["detection_counts"] = detection_counts
+
+    response.status = 201
+    return {
+        **burst,
+        "detected_markers": {
+            marker_id: corners.tolist()
+            for marker_id, corners in detected_markers.items()
+        },
+    }
+
+
+@app.get("/camera/<camera_id>/stream")
+def stream_camera(camera_id: str):
+    return _stream(camera_id, warped=False)
+
+
+@app.get("/camera/<camera_id>/stream/warped")
+def stream_warped_camera(camera_id: str):
+    return _stream(camera_id, warped=True)
+
+
+@app.post("/camera/<camera_id>/tracking")
+def start_tracking(camera_id: str):
+    response.content_type = "application/json"
+
+    camera = _find_camera(camera_id)
+    if isinstance(camera, dict):
+        return camera
+
+    # The markers as for calculate-homography-correction, the detector parameters as for detect-markers
+    form: FormsDict = request.forms
+    for name in ("aruco_dict_type", "real_markers", "projected_markers"):
+        if not form.get(name):
+            response.status = 400
+            return {
+                "error": "Invalid request data",
+                "message": f"The '{name}' field is required.",
+            }
 
     try:
-        cv2.imwrite(str(capture_filepath), image)
-    except cv2.error:
-        response.status = 500
+        dict_type = aruco_dict_service.get_aruco_dict(form.get("aruco_dict_type"))
+    except ValueError:
+        response.status = 400
         return {
-            "error": "Image Error",
-            "message": "Failed to save the captured image.",
-            "camera_id": camera_id,
+            "error": "Invalid request data",
+            "message": f"The 'aruco_dict_type' is invalid: {form.get('aruco_dict_type')}.",
+            "valid_types": list(aruco_dict_service.ARUCO_DICTS),
         }
 
+    try:
+        tracker = tracking_service.MarkerTracker(
+            camera.grabber,
+            dict_type,
+            projector_calibration_service.parse_markers(form.get("real_markers")),
+            projector_calibration_service.parse_markers(form.get("projected_markers")),
+            projector_calibration_service.parse_detector_parameters(form),
+            float(form.get("smoothing", tracking_service.DEFAULT_SMOOTHING)),
+        )
+    except ValueError as e:
+        response.status = 400
+        return {"error": "Invalid request data", "message": str(e)}
+
+    with camera.lock:
+        previous_tracker, camera.tracker = camera.tracker, tracker
+    if previous_tracker is not None:
+        previous_tracker.stop()
+    tracker.start()
+
     response.status = 201
+    return {"message": "Tracking started.", "camera_id": camera.id}
+
+
+@app.get("/camera/<camera_id>/tracking")
+def get_tracking(camera_id: str):
+    response.content_type = "application/json"
+
+    camera = _find_camera(camera_id)
+    if isinstance(camera, dict):
+        return camera
+    tracker = camera.tracker
+    if tracker is None:
+        response.status = 404
+        return {
+            "error": "Tracking not found",
+            "message": f"The camera with ID '{camera.id}' is not tracking the markers.",
+        }
+
+    # With after, the sequence number of the previous response, waits for an update until the timeout
+    try:
+        after = request.params.get("after")
+        after = int(after) if after is not None else None
+    except ValueError:
+        response.status = 400
+        return {
+            "error": "Invalid request data",
+            "message": "The 'after' parameter must be an integer.",
+        }
+    timeout = _parse_timeout()
+    if isinstance(timeout, dict):
+        return timeout
+
+    state = tracker.get_state(after, timeout)
     return {
-        "message": "Image captured successfully.",
-        "camera_id": camera_id,
-        "capture_id": camera.id_capture,
-        "capture_filename": capture_filename,
-        "capture_filepath": str(capture_filepath),
-        "capture_url": f"/data/camera/{camera_id}/captures/{capture_filename}",
+        "camera_id": camera.id,
+        "running": not tracker.stopped,
+        "homography_correction": (
+            state.homography.tolist() if state.homography is not None else None
+        ),
+        "sequence": state.sequence,
+        "timestamp": state.timestamp,
+        "detected_markers": state.detected_marker_ids,
+        "frame_count": state.frame_count,
+        "full_detection_count": state.full_detection_count,
+    }
+
+
+@app.delete("/camera/<camera_id>/tracking")
+def stop_tracking(camera_id: str):
+    response.content_type = "application/json"
+
+    camera = _find_camera(camera_id)
+    if isinstance(camera, dict):
+        return camera
+
+    with camera.lock:
+        tracker, camera.tracker = camera.tracker, None
+    if tracker is None:
+        response.status = 404
+        return {
+            "error": "Tracking not found",
+            "message": f"The camera with ID '{camera.id}' is not tracking the markers.",
+        }
+    tracker.stop()
+
+    return {"message": f"Tracking of the camera with ID '{camera.id}' stopped."}
+
+
+def _stream(camera_id: str, warped: bool) -> Iterator[bytes] | dict:
+    """
+    Stream the frames of a camera as MJPEG (multipart/x-mixed-replace), e.g. to the src of an img element.
+
+    Reads the "fps" and "quality" query parameters, and for a warped stream the "homography" query parameter,
+    a 3x3 matrix as JSON. The clients of a camera with the same parameters share the encoded frames.
+
+    Args:
+        camera_id (str): The ID of the camera.
+        warped (bool): Whether the frames are warped by the homography.
+
+    Returns:
+        Iterator[bytes] | dict: The parts of the response, or the JSON response of the error.
+    """
+    response.content_type = "application/json"
+
+    camera = _find_camera(camera_id)
+    if isinstance(camera, dict):
+        return camera
+
+    homography = None
+    if warped:
+        homography_string = request.params.get("homography")
+        if not homography_string:
+            response.status = 400
+            return {
+                "error": "Invalid request data",
+                "message": "The 'homography' parameter is required.",
+            }
+        try:
+            homography = np.array(json.loads(homography_string), dtype=np.float64)
+        except (ValueError, TypeError):
+            response.status = 400
+            return {
+                "error": "Invalid request data",
+                "message": "The 'homography' parameter must be a 3x3 matrix as JSON.",
+            }
+
+    try:
+        fps = float(request.params.get("fps", stream_service.DEFAULT_FPS))
+        quality = int(request.params.get("quality", stream_service.DEFAULT_QUALITY))
+    except ValueError:
+        response.status = 400
+        return {
+            "error": "Invalid request data",
+            "message": "The 'fps' parameter must be a number and the 'quality' parameter an integer.",
+        }
+
+    try:
+        stream = stream_service.open_stream(
+            camera.id, camera.grabber, fps, quality, homography
+        )
+    except ValueError as e:
+        response.status = 400
+        return {"error": "Invalid request data", "message": str(e)}
+
+    response.content_type = (
+        f"multipart/x-mixed-replace; boundary={stream_service.BOUNDARY}"
+    )
+    response.set_header("Cache-Control", "no-cache, no-store")
+    return stream_service.iter_multipart(stream)
+
+
+def _find_camera(camera_id: str) -> Camera | dict:
+    """
+    Get an opened camera by the ID of the request path. Sets the status of the response on error.
+
+    Args:
+        camera_id (str): The ID of the camera.
+
+    Returns:
+        Camera | dict: The camera, or the JSON response of the error as a dict.
+    """
+    try:
+        camera_id = int(camera_id)
+    except ValueError:
+        response.status = 400
+        return {
+            "error": "Invalid request data",
+            "message": "The camera ID must be an integer.",
+        }
+
+    camera = cameras.get(camera_id)
+    if not camera:
+        response.status = 404
+        return {
+            "error": "Camera not found",
+            "message": f"The camera with ID '{camera_id}' was not found.",
+        }
+    return camera
+
+
+def _parse_timeout() -> float | dict:
+    """
+    Parse the "timeout" parameter of a request, the maximum time to wait, up to MAX_CAPTURE_TIMEOUT.
+    Sets the status of the response on error.
+
+    Returns:
+        float | dict: The timeout in seconds, CAPTURE_TIMEOUT by default, or the JSON response of the error as a dict.
+    """
+    try:
+        timeout = float(request.params.get("timeout", camera_service.CAPTURE_TIMEOUT))
+    except ValueError:
+        timeout = math.nan
+    # Also rejects NaN and infinity, with which waiting would never end or never start
+    if not 0 < timeout <= camera_service.MAX_CAPTURE_TIMEOUT:
+        response.status = 400
+        return {
+            "error": "Invalid request data",
+            "message": f"The timeout must be a number of seconds above 0 and at most {camera_service.MAX_CAPTURE_TIMEOUT:g}.",
+        }
+    return timeout
+
+
+def _parse_capture_options(
+    request_time: float,
+) -> tuple[float | None, float, str] | dict:
+    """
+    Parse the options of a capture request. Sets the status of the response on error.
+
+    Args:
+        request_time (float): Time the request was received, from time.monotonic.
+
+    Returns:
+        tuple[float | None, float, str] | dict: The time the frames must be read after (None for the newest frame),
+            the maximum time to wait for a frame, and the save mode, or the JSON response of the error as a dict.
+    """
+    # By default the newest frame, or with wait_new_frame a frame read after the request was received
+    wait_new_frame = request.params.get("wait_new_frame", "").lower() in ("1", "true")
+    timeout = _parse_timeout()
+    if isinstance(timeout, dict):
+        return timeout
+    # The captures are kept in memory for the next requests, and saved to disk in the background by default
+    save_mode = request.params.get("save", "async")
+    if save_mode not in SAVE_MODES:
+        response.status = 400
+        return {
+            "error": "Invalid request data",
+            "message": f"The save mode must be one of {', '.join(SAVE_MODES)}.",
+        }
+    return request_time if wait_new_frame else None, timeout, save_mode
+
+
+def _store_capture(
+    camera: Camera, image: np.ndarray, timestamp: float, save_mode: str
+) -> dict:
+    """
+    Number a captured image, keep it in memory and save it as requested. Sets the status of the response on error.
+
+    Args:
+        camera (Camera): The camera.
+        image (np.ndarray): The captured image.
+        timestamp (float): Time the image was read from the camera, in seconds since the epoch.
+        save_mode (str): How the image is saved to disk, one of SAVE_MODES.
+
+    Returns:
+        dict: The fields of the capture in the JSON response, or the JSON response of the error.
+    """
+    with camera.lock:
+        camera.id_capture += 1
+        id_capture = camera.id_capture
+
+    capture_store_service.capture_store.put(
+        camera.id,
+        id_capture,
+        capture_store_service.Capture(image=image, timestamp=timestamp),
+    )
+
+    capture_filepath = capture_store_service.get_capture_filepath(camera.id, id_capture)
+    if save_mode == "async":
+        capture_store_service.save_image_in_background(image, capture_filepath)
+    elif save_mode == "sync":
+        capture_filepath.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            image_service.save_image(image, str(capture_filepath))
+        except (ValueError, cv2.error):
+            response.status = 500
+            return {
+                "error": "Image Error",
+                "message": "Failed to save the captured image.",
+                "camera_id": camera.id,
+            }
+    saved = save_mode != "none"
+
+    return {
+        "camera_id": camera.id,
+        "capture_id": id_capture,
+        "capture_timestamp": timestamp,
+        "capture_filename": capture_filepath.name if saved else None,
+        "capture_filepath": str(capture_filepath) if saved else None,
+        "capture_url": (
+            f"/data/camera/{camera.id}/captures/{capture_filepath.name}"
+            if saved
+            else None
+        ),
     }
@@ -2,7 +2,7 @@ import os
 from pathlib import Path
 
 from bottle import Bottle, FileUpload, request, response, static_file
-from services import data_service
+from services import capture_store_service, data_service
 
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
@@ -22,6 +22,8 @@ app = Bottle()
 @app.get("/data/<filepath:path>")
 def serve_data(filepath):
     full_filepath: Path = DATA_DIR / filepath
+    # The captures are saved in the background, wait for the file if it is being written
+    capture_store_service.wait_until_saved(full_filepath)
 
     if not full_filepath.exists() or not full_filepath.is_file():
         response.status = 404
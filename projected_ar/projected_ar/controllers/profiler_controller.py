@@ -0,0 +1,62 @@
+import os
+from pathlib import Path
+
+from bottle import Bottle, request, response, static_file
+from services.shared_module_service import load_shared_module
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+
+app = Bottle()
+
+# The profiler is shared with SVG Utils
+request_profiler = load_shared_module("request_profiler")
+
+# Profiler of the next requests and of the requests with a header, None if profiling is disabled
+profiler: request_profiler.RequestProfiler | None = (
+    request_profiler.RequestProfiler(
+        os.getenv("PROFILE_DIR", str(DATA_DIR / "profiles")),
+        int(os.getenv("PROFILE_REQUESTS", "0")),
+        os.getenv("PROFILE_HEADER", "X-Profile"),
+        os.getenv("PROFILE_MODE", "cprofile"),
+    )
+    if os.getenv("PROFILING_ENABLED") == "1"
+    else None
+)
+
+
+@app.get("/")
+def list_profiles():
+    response.content_type = "application/json"
+
+    return {
+        "remaining_requests": profiler.get_remaining_count(),
+        "profiles": profiler.list_profiles(),
+    }
+
+
+@app.post("/")
+def arm_profiler():
+    response.content_type = "application/json"
+
+    try:
+        count = int(request.params.get("count", "1"))
+        remaining_count = profiler.arm(count)
+    except ValueError as e:
+        response.status = 400
+        return {
+            "error": "Invalid request data",
+            "message": str(e),
+        }
+
+    return {"remaining_requests": remaining_count}
+
+
+@app.get("/<name>")
+def get_profile(name: str):
+    return static_file(
+        name,
+        root=profiler.directory,
+        mimetype="application/octet-stream",
+        download=True,
+    )
@@ -3,8 +3,15 @@ from pathlib import Path
 from typing import Any
 
 from bottle import Bottle, FormsDict, request, response
-import numpy as np
-from services import aruco_dict_service, image_service, projector_calibration_service
+from services import (
+    aruco_dict_service,
+    capture_store_service,
+    image_service,
+    projector_calibration_service,
+)
+from services.lazy_import_service import lazy_import
+
+np = lazy_import("numpy")
 
 PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
@@ -18,8 +25,12 @@ def detect_markers() -> dict[str, Any]:
     Handle a POST request to detect ArUco markers in an image.
 
     Expects a form-urlencoded payload with the following fields:
-    - capture_filepath: Path to the image file.
+    - capture_filepath: Path to the image file, or camera_id and capture_id: IDs of a capture, read from memory.
     - aruco_dict_type: Type of ArUco dictionary to use for detection.
+    - corner_refinement (optional): Corner refinement method, "none", "subpix", "contour" or "apriltag".
+    - adaptive_thresh_win_size_min, adaptive_thresh_win_size_max, adaptive_thresh_win_size_step (optional):
+      Window sizes of the adaptive thresholding, in pixels.
+    - min_marker_perimeter_rate (optional): Minimum perimeter of the markers, relative to the largest image side.
 
     Returns:
         dict[str, Any]: A JSON response with the detected markers or an error message.
@@ -38,11 +49,11 @@ def detect_markers() -> dict[str, Any]:
     aruco_dict_type = form.get("aruco_dict_type")
 
     # Check if the required fields are present
-    if not capture_filepath:
+    if not capture_filepath and not form.get("capture_id"):
         response.status = 400
         return {
             "error": "Bad Request",
-            "message": "The 'capture_filepath' field is required.",
+            "message": "The 'capture_filepath' field, or the 'camera_id' and 'capture_id' fields, are required.",
         }
     if not aruco_dict_type:
         response.status = 400
@@ -51,40 +62,36 @@ def detect_markers() -> dict[str, Any]:
             "message": "The 'aruco_dict_type' field is required.",
         }
 
-    # Check if the file exists
-    capture_filepath = Path(capture_filepath)
-    if not capture_filepath.is_file():
-        response.status = 404
-        return {
-            "error": "Not Found",
-            "message": f"The file '{capture_filepath}' does not exist.",
-        }
+    # Read the image, from memory or from its file
+    image = _load_form_image(form, "capture_filepath")
+    if isinstance(image, dict):
+        return image
 
-    # Check if the file is a valid image
+    # Check if the aruco_dict_type is valid
     try:
-        image = image_service.load_image(str(capture_filepath))
-    except ValueError:
-        response.status = 415
+        aruco_dict = aruco_dict_service.get_aruco_dict(aruco_dict_type)
+    except ValueError as e:
+        response.status = 400
         return {
-            "error": "Unsupported Media Type",
-            "message": f"The file '{capture_filepath}' is not a valid image.",
+            "error": "Bad Request",
+            "message": f"The 'aruco_dict_type' is invalid: {aruco_dict_type}.",
+            "valid_types": list(aruco_dict_service.ARUCO_DICTS),
         }
 
-    # Check if the aruco_dict_type is valid
+    # Check if the detector parameters are valid, the missing ones keep their default value
     try:
-        aruco_dict = aruco_dict_service.get_aruco_dict(aruco_dict_type)
+        parameters = projector_calibration_service.parse_detector_parameters(form)
     except ValueError as e:
         response.status = 400
         return {
             "error": "Bad Request",
-            "message": f"The 'aruco_dict_type' is invalid: {aruco_dict_type}.",
-            "valid_types": list(aruco_dict_service.ARUCO_DICTS.keys()),
+            "message": f"The detector parameters are invalid: {e}",
         }
 
     # Process the image and detect markers
     try:
         detected_markers = projector_calibration_service.detect_markers(
-            image, aruco_dict
+            image, aruco_dict, parameters
         )
     except Exception as e:
         response.status = 500
@@ -95,7 +102,10 @@ def detect_markers() -> dict[str, Any]:
 
     response.status = 200
     return {
-        "detected_markers": detected_markers,
+        "detected_markers": {
+            marker_id: corners.tolist()
+            for marker_id, corners in detected_markers.items()
+        },
     }
 
 
@@ -155,43 +165,26 @@ def calculate_homography_correction() -> dict[str, Any]:
             "message": "The 'projected_markers' field is required.",
         }
 
-    # Convert the JSON strings to dictionaries
-    try:
-        detected_markers_list = json.loads(detected_markers_string)
-        real_markers_list = json.loads(real_markers_string)
-        expected_projected_markers_list = json.loads(expected_projected_markers_string)
-    except json.JSONDecodeError:
-        response.status = 400
-        return {
-            "error": "Bad Request",
-            "message": "Invalid JSON format in the input fields.",
-        }
-
-    # Convert the lists to numpy arrays
+    # Convert the JSON strings to dictionaries of numpy arrays
     try:
-        detected_markers = {
-            int(marker_id): np.array(corners, dtype=np.float64)
-            for marker_id, corners in detected_markers_list.items()
-        }
-        real_markers = {
-            int(marker_id): np.array(corners, dtype=np.float64)
-            for marker_id, corners in real_markers_list.items()
-        }
-        expected_projected_markers = {
-            int(marker_id): np.array(corners, dtype=np.float64)
-            for marker_id, corners in expected_projected_markers_list.items()
-        }
-    except ValueError:
+        detected_markers = projector_calibration_service.parse_markers(
+            detected_markers_string
+        )
+        real_markers = projector_calibration_service.parse_markers(real_markers_string)
+        expected_projected_markers = projector_calibration_service.parse_markers(
+            expected_projected_markers_string
+        )
+    except ValueError as e:
         response.status = 400
         return {
             "error": "Bad Request",
-            "message": "Invalid data format in the input fields.",
+            "message": f"Invalid input fields: {e}",
         }
 
     # Calculate the homography correction
     try:
         homography_correction: np.ndarray[tuple[3, 3], np.float64] = (
-            projector_calibration_service.calculate_homography(
+            projector_calibration_service.calculate_homography_correction(
                 detected_markers,
                 real_markers,
                 expected_projected_markers,
@@ -218,7 +211,7 @@ def apply_homography() -> dict[str, Any]:
     Handle a POST request to apply a homography  to an image.
 
     Expects a form-urlencoded payload with the following fields:
-    - image_filepath: Path to the image file.
+    - image_filepath: Path to the image file, or camera_id and capture_id: IDs of a capture, read from memory.
     - homography: A JSON string containing the homography matrix.
     Expects the JSON string to be in the format:
     [
@@ -244,11 +237,11 @@ def apply_homography() -> dict[str, Any]:
     homography_string = form.get("homography")
 
     # Check if the required fields are present
-    if not image_filepath:
+    if not image_filepath_string and not form.get("capture_id"):
         response.status = 400
         return {
             "error": "Bad Request",
-            "message": "The 'image_filepath' field is required.",
+            "message": "The 'image_filepath' field, or the 'camera_id' and 'capture_id' fields, are required.",
         }
     if not homography_string:
         response.status = 400
@@ -257,24 +250,17 @@ def apply_homography() -> dict[str, Any]:
             "message": "The 'homography' field is required.",
         }
 
-    # Check if the file exists
-    image_filepath = Path(image_filepath_string)
-    if not image_filepath.is_file():
-        response.status = 404
-        return {
-            "error": "Not Found",
-            "message": f"The file '{image_filepath}' does not exist.",
-        }
-
-    # Check if the file is a valid image
-    try:
-        image = image_service.load_image(str(image_filepath))
-    except ValueError:
-        response.status = 415
-        return {
-            "error": "Unsupported Media Type",
-            "message": f"The file '{image_filepath}' is not a valid image.",
-        }
+    # Read the image, from memory or from its file
+    image = _load_form_image(form, "image_filepath")
+    if isinstance(image, dict):
+        return image
+    image_filepath = (
+        Path(image_filepath_string)
+        if image_filepath_string
+        else capture_store_service.get_capture_filepath(
+            int(form.get("camera_id")), int(form.get("capture_id"))
+        )
+    )
 
     # Convert the JSON string to a list
     try:
@@ -312,8 +298,10 @@ def apply_homography() -> dict[str, Any]:
         f"{image_filepath.stem}_corrected{image_filepath.suffix}"
     )
     try:
+        # The directory of a capture is only created once the capture is saved, never with save=none
+        output_filepath.parent.mkdir(parents=True, exist_ok=True)
         image_service.save_image(corrected_image, str(output_filepath))
-    except ValueError:
+    except (OSError, ValueError):
         response.status = 500
         return {
             "error": "Internal Server Error",
@@ -326,3 +314,55 @@ def apply_homography() -> dict[str, Any]:
         "corrected_image_filepath": str(output_filepath),
         "corrected_image_url": str(output_filepath.relative_to(PROJECT_ROOT)),
     }
+
+
+def _load_form_image(form: FormsDict, filepath_field: str) -> Any:
+    """
+    Load the image of a request, from the capture store if the form has the "camera_id" and "capture_id"
+    fields, else from the file of the filepath field. Sets the status of the response on error.
+
+    Args:
+        form (FormsDict): The form of the request.
+        filepath_field (str): Name of the field with the path of the image file.
+
+    Returns:
+        Any: The image, or the JSON response of the error as a dict.
+    """
+    if form.get("capture_id"):
+        try:
+            camera_id = int(form.get("camera_id", ""))
+            capture_id = int(form.get("capture_id"))
+        except ValueError:
+            response.status = 400
+            return {
+                "error": "Bad Request",
+                "message": "The 'camera_id' and 'capture_id' fields must be integers.",
+            }
+        try:
+            return capture_store_service.get_capture_image(camera_id, capture_id)
+        except ValueError as e:
+            response.status = 404
+            return {
+                "error": "Not Found",
+                "message": str(e),
+            }
+
+    # Check if the file exists, once written if it is a capture being saved
+    filepath = Path(form.get(filepath_field))
+    capture_store_service.wait_until_saved(filepath)
+    if not filepath.is_file():
+        response.status = 404
+        return {
+            "error": "Not Found",
+            "message": f"The file '{filepath}' does not exist.",
+        }
+
+    # Check if the file is a valid image
+    try:
+        return image_service.load_image(str(filepath))
+    except ValueError:
+        response.status = 415
+        return {
+            "error": "Unsupported Media Type",
+            "message": f"The file '{filepath}' is not a valid image.",
+        }
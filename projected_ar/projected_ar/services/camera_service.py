@@ -1,4 +1,24 @@
-import cv2
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from services.lazy_import_service import lazy_import
+
+cv2 = lazy_import("cv2")
+
+# Number of newest frames kept by the grabber of each camera
+FRAME_BUFFER_SIZE = 4
+# Default and largest maximum time to wait for a frame, in seconds
+CAPTURE_TIMEOUT = 5.0
+MAX_CAPTURE_TIMEOUT = 60.0
+# Time between two reads after a failed read (e.g. a network camera reconnecting), in seconds
+READ_RETRY_INTERVAL = 0.05
+# Maximum number of frames of a burst, all kept in memory until they are stacked
+MAX_BURST_FRAMES = 30
 
 
 class CameraOpenException(Exception):
@@ -15,6 +35,20 @@ class CameraCaptureException(Exception):
         super().__init__(message)
 
 
+def check_timeout(timeout: float):
+    """
+    Checks a maximum time to wait, e.g. for a frame.
+
+    Args:
+        timeout (float): The time in seconds, infinite to wait without limit.
+
+    Raises:
+        ValueError: If the time is negative or not a number, with which waiting would never end or never start.
+    """
+    if math.isnan(timeout) or timeout < 0:
+        raise ValueError(f"The timeout must be at least 0 seconds, got {timeout}.")
+
+
 def open_camera(camera_source: int | str = 0) -> cv2.VideoCapture:
     """
     Opens a camera with the given source (ID or URL).
@@ -34,32 +68,214 @@ def open_camera(camera_source: int | str = 0) -> cv2.VideoCapture:
     return camera
 
 
-def capture_image(
-    camera: cv2.VideoCapture,
-) -> cv2.typing.MatLike:
+@dataclass
+class Frame:
+    """A frame read from a camera."""
+
+    image: cv2.typing.MatLike
+    # Time the frame was read from the camera, in seconds since the epoch, as reported to the clients
+    timestamp: float
+    # Number of the frame since the grabber was started, from 1, ordering the frames
+    index: int
+    # Time the frame was read from the camera, from time.monotonic, unaffected by the changes of the system clock
+    monotonic_time: float
+
+
+class FrameGrabber:
+    """Background thread reading the frames of a camera as they come, keeping the newest ones.
+
+    The camera buffers its frames (a few for local cameras, more for network streams such as MJPEG URLs),
+    so reading it on request returns a stale frame and blocks until the next one. Reading it continuously
+    keeps its buffer empty, and the newest frame is available at once.
+    """
+
+    def __init__(self, camera: cv2.VideoCapture, buffer_size: int = FRAME_BUFFER_SIZE):
+        """
+        Initializes a new FrameGrabber object. The thread is started by start.
+
+        Args:
+            camera (cv2.VideoCapture): The camera object, read only by the grabber thread.
+            buffer_size (int): Number of newest frames kept. Defaults to FRAME_BUFFER_SIZE.
+        """
+        self._camera: cv2.VideoCapture = camera
+        self._frames: deque[Frame] = deque(maxlen=buffer_size)
+        self._frame_count: int = 0
+        self._new_frame: threading.Condition = threading.Condition()
+        self._stopped: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._grab, daemon=True
+        )
+
+    def start(self):
+        """Starts reading the frames."""
+        self._thread.start()
+
+    @property
+    def stopped(self) -> bool:
+        """
+        Returns whether the grabber is stopped, e.g. because the camera is closed.
+
+        Returns:
+            bool: Whether the grabber is stopped.
+        """
+        return self._stopped.is_set()
+
+    def stop(self, timeout: float = CAPTURE_TIMEOUT):
+        """
+        Stops reading the frames and releases the camera, once the current read is finished.
+
+        Args:
+            timeout (float): Maximum time to wait for the current read, in seconds. Defaults to CAPTURE_TIMEOUT.
+        """
+        self._stopped.set()
+        with self._new_frame:
+            self._new_frame.notify_all()
+        if self._thread.ident is None:
+            self._camera.release()
+        else:
+            # The grabber thread releases the camera, so that it is not released during a read
+            self._thread.join(timeout)
+
+    def get_latest_frame(
+        self,
+        newer_than: int | None = None,
+        read_after: float | None = None,
+        timeout: float = CAPTURE_TIMEOUT,
+    ) -> Frame:
+        """
+        Gets the newest frame, waiting for it if there is none yet.
+
+        Args:
+            newer_than (int | None): Index the frame must be greater than, e.g. of the previous frame the caller got.
+                Defaults to None (the newest frame, whatever its index).
+            read_after (float | None): Time the frame must be read after, from time.monotonic,
+                e.g. the time of the request. Defaults to None (the newest frame, whatever its time).
+            timeout (float): Maximum time to wait for the frame, in seconds. Defaults to CAPTURE_TIMEOUT.
+
+        Raises:
+            ValueError: If the timeout is negative or not a number.
+            CameraCaptureException: If there is no such frame before the timeout, or if the grabber is stopped.
+
+        Returns:
+            Frame: The frame.
+        """
+        check_timeout(timeout)
+        deadline = time.monotonic() + timeout
+        with self._new_frame:
+            while not self._stopped.is_set():
+                if (
+                    self._frames
+                    and (newer_than is None or self._frames[-1].index > newer_than)
+                    and (
+                        read_after is None
+                        or self._frames[-1].monotonic_time > read_after
+                    )
+                ):
+                    return self._frames[-1]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # An infinite timeout waits in steps, longer waits overflow
+                self._new_frame.wait(min(remaining, threading.TIMEOUT_MAX))
+        raise CameraCaptureException()
+
+    def _grab(self):
+        """Reads the frames until the grabber is stopped, then releases the camera."""
+        try:
+            while not self._stopped.is_set():
+                ret, image = self._camera.read()
+                if not ret:
+                    self._stopped.wait(READ_RETRY_INTERVAL)
+                    continue
+                with self._new_frame:
+                    self._frame_count += 1
+                    self._frames.append(
+                        Frame(image, time.time(), self._frame_count, time.monotonic())
+                    )
+                    self._new_frame.notify_all()
+        finally:
+            self._camera.release()
+
+
+def start_grabber(
+    camera: cv2.VideoCapture, buffer_size: int = FRAME_BUFFER_SIZE
+) -> FrameGrabber:
     """
-    Captures an image from the camera.
+    Starts reading the frames of a camera in a background thread.
 
     Args:
         camera (cv2.VideoCapture): The camera object.
+        buffer_size (int): Number of newest frames kept. Defaults to FRAME_BUFFER_SIZE.
+
+    Returns:
+        FrameGrabber: The grabber of the camera.
+    """
+    grabber = FrameGrabber(camera, buffer_size)
+    grabber.start()
+    return grabber
+
+
+def capture_image(
+    grabber: FrameGrabber,
+    read_after: float | None = None,
+    timeout: float = CAPTURE_TIMEOUT,
+) -> Frame:
+    """
+    Captures an image from the camera, the newest frame read by its grabber.
+
+    Args:
+        grabber (FrameGrabber): The grabber of the camera.
+        read_after (float | None): Time the frame must be read after, from time.monotonic,
+            e.g. the time of the request. Defaults to None (the newest frame, whatever its time).
+        timeout (float): Maximum time to wait for the frame, in seconds. Defaults to CAPTURE_TIMEOUT.
 
     Raises:
-        CameraCaptureException: If the camera fails to capture an image.
+        CameraCaptureException: If the camera fails to capture an image before the timeout.
 
     Returns:
-        cv2.typing.MatLike: The captured image.
+        Frame: The captured image, with its timestamp.
     """
-    ret, frame = camera.read()
-    if not ret:
-        raise CameraCaptureException()
-    return frame
+    return grabber.get_latest_frame(read_after=read_after, timeout=timeout)
 
 
-def close_camera(camera: cv2.VideoCapture):
+def capture_burst(
+    grabber: FrameGrabber,
+    frame_count: int,
+    read_after: float | None = None,
+    timeout: float = CAPTURE_TIMEOUT,
+) -> list[Frame]:
     """
-    Closes the camera.
+    Captures successive frames from the camera, each read after the previous one.
 
     Args:
-        camera (cv2.VideoCapture): The camera object.
+        grabber (FrameGrabber): The grabber of the camera.
+        frame_count (int): Number of frames, from 1 to MAX_BURST_FRAMES.
+        read_after (float | None): Time the first frame must be read after, from time.monotonic,
+            e.g. the time of the request. Defaults to None (the newest frame, whatever its time).
+        timeout (float): Maximum time to wait for each frame, in seconds. Defaults to CAPTURE_TIMEOUT.
+
+    Raises:
+        ValueError: If the number of frames is out of range.
+        CameraCaptureException: If the camera fails to capture a frame before the timeout.
+
+    Returns:
+        list[Frame]: The captured frames, the oldest first.
+    """
+    if not 1 <= frame_count <= MAX_BURST_FRAMES:
+        raise ValueError(
+            f"The number of frames must be between 1 and {MAX_BURST_FRAMES}, got {frame_count}."
+        )
+    frames = [grabber.get_latest_frame(read_after=read_after, timeout=timeout)]
+    while len(frames) < frame_count:
+        frames.append(grabber.get_latest_frame(frames[-1].index, timeout=timeout))
+    return frames
+
+
+def close_camera(grabber: FrameGrabber):
+    """
+    Closes the camera, stopping its grabber.
+
+    Args:
+        grabber (FrameGrabber): The grabber of the camera.
     """
-    camera.release()
+    grabber.stop()
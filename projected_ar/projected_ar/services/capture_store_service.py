@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from services import image_service
+from services.lazy_import_service import lazy_import
+
+np = lazy_import("numpy")
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
+# Maximum size of the decoded images kept in memory, in bytes
+MAX_BYTES = int(os.getenv("CAPTURE_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Maximum time to wait for an image being written, in seconds
+SAVE_TIMEOUT = 10.0
+# Maximum number of images waiting to be written in the background, each a whole decoded frame in memory
+MAX_PENDING_SAVES = int(os.getenv("CAPTURE_MAX_PENDING_SAVES", "8"))
+
+
+@dataclass
+class Capture:
+    """An image captured from a camera."""
+
+    image: np.ndarray
+    # Time the frame was read from the camera, in seconds since the epoch
+    timestamp: float
+
+
+class CaptureStore:
+    """Thread-safe store of the captured images, decoded, with a maximum size in memory.
+
+    The least recently used captures are evicted first.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        Initializes a new CaptureStore object.
+
+        Args:
+            max_bytes (int): Maximum size of the images kept, in bytes.
+        """
+        self._max_bytes: int = max_bytes
+        self._captures: OrderedDict[tuple[int, int], Capture] = OrderedDict()
+        self._bytes: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def put(self, camera_id: int, capture_id: int, capture: Capture):
+        """
+        Adds a capture, evicting the least recently used ones if needed. A capture larger than the maximum size is not kept.
+
+        Args:
+            camera_id (int): ID of the camera.
+            capture_id (int): ID of the capture, for the camera.
+            capture (Capture): The capture.
+        """
+        size = capture.image.nbytes
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            self._remove((camera_id, capture_id))
+            self._captures[camera_id, capture_id] = capture
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                self._remove(next(iter(self._captures)))
+
+    def get(self, camera_id: int, capture_id: int) -> Capture | None:
+        """
+        Gets a capture, marking it as the most recently used.
+
+        Args:
+            camera_id (int): ID of the camera.
+            capture_id (int): ID of the capture, for the camera.
+
+        Returns:
+            Capture | None: The capture, or None if it is not kept.
+        """
+        with self._lock:
+            capture = self._captures.get((camera_id, capture_id))
+            if capture is not None:
+                self._captures.move_to_end((camera_id, capture_id))
+            return capture
+
+    def remove_camera(self, camera_id: int):
+        """
+        Removes the captures of a camera.
+
+        Args:
+            camera_id (int): ID of the camera.
+        """
+        with self._lock:
+            for key in [key for key in self._captures if key[0] == camera_id]:
+                self._remove(key)
+
+    def _remove(self, key: tuple[int, int]):
+        """
+        Removes a capture, if it is kept. The caller holds the lock.
+
+        Args:
+            key (tuple[int, int]): ID of the camera and of the capture.
+        """
+        capture = self._captures.pop(key, None)
+        if capture is not None:
+            self._bytes -= capture.image.nbytes
+
+
+capture_store = CaptureStore(MAX_BYTES)
+# Writer of the images saved in the background, one at a time
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="capture-writer")
+# Images being written, by path
+_pending_saves: dict[Path, Future] = {}
+_pending_saves_lock = threading.Lock()
+
+
+def get_capture_filepath(camera_id: int, capture_id: int) -> Path:
+    """
+    Get the path a capture is saved to.
+
+    Args:
+        camera_id (int): ID of the camera.
+        capture_id (int): ID of the capture, for the camera.
+
+    Returns:
+        Path: The path of the JPEG file.
+    """
+    return (
+        DATA_DIR
+        / "camera"
+        / str(camera_id)
+        / "captures"
+        / f"capture_{camera_id}_{capture_id}.jpg"
+    )
+
+
+def get_capture_image(camera_id: int, capture_id: int) -> np.ndarray:
+    """
+    Get the image of a capture, from memory, or from its file if it is no longer kept in memory.
+
+    Args:
+        camera_id (int): ID of the camera.
+        capture_id (int): ID of the capture, for the camera.
+
+    Raises:
+        ValueError: If the capture is neither in memory nor saved.
+
+    Returns:
+        np.ndarray: The image.
+    """
+    capture = capture_store.get(camera_id, capture_id)
+    if capture is not None:
+        return capture.image
+
+    filepath = get_capture_filepath(camera_id, capture_id)
+    wait_until_saved(filepath)
+    if not filepath.is_file():
+        raise ValueError(
+            f"The capture '{capture_id}' of the camera '{camera_id}' was not found."
+        )
+    return image_service.load_image(str(filepath))
+
+
+def save_image_in_background(image: np.ndarray, filepath: Path):
+    """
+    Save an image in a background thread. The readers of the file wait for it with wait_until_saved.
+
+    When MAX_PENDING_SAVES images are already waiting, the image is saved in the calling thread instead,
+    so that captures faster than the disk slow down rather than fill the memory.
+
+    Args:
+        image (np.ndarray): The image to save, not modified afterwards.
+        filepath (Path): The path where the image will be saved.
+    """
+
+    def save():
+        try:
+            _write_image(image, filepath)
+        finally:
+            with _pending_saves_lock:
+                if _pending_saves.get(filepath) is future:
+                    del _pending_saves[filepath]
+
+    with _pending_saves_lock:
+        is_queue_full = len(_pending_saves) >= MAX_PENDING_SAVES
+        if not is_queue_full:
+            future = _writer.submit(save)
+            _pending_saves[filepath] = future
+    if is_queue_full:
+        try:
+            _write_image(image, filepath)
+        except Exception:
+            # As for the images saved in the background, a failed save leaves no file, which the reader reports
+            pass
+
+
+def _write_image(image: np.ndarray, filepath: Path):
+    """
+    Write an image to its file, creating its directory if needed.
+
+    Args:
+        image (np.ndarray): The image to save.
+        filepath (Path): The path where the image will be saved.
+    """
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    image_service.save_image(image, str(filepath))
+
+
+def wait_until_saved(filepath: Path, timeout: float = SAVE_TIMEOUT):
+    """
+    Wait for an image being saved in the background, if any, so that its file can be read.
+
+    Args:
+        filepath (Path): The path of the image.
+        timeout (float): Maximum time to wait, in seconds. Defaults to SAVE_TIMEOUT.
+    """
+    with _pending_saves_lock:
+        future = _pending_saves.get(Path(filepath))
+    if future is None:
+        return
+    try:
+        # A failed save leaves no file, which the reader reports
+        future.exception(timeout)
+    except TimeoutError:
+        pass
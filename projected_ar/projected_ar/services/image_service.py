@@ -1,5 +1,12 @@
-import cv2
-import numpy as np
+from __future__ import annotations
+
+from services.lazy_import_service import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+# Methods combining the frames of a burst into one image
+STACK_METHODS = ("mean", "median")
 
 
 def load_image(image_path: str) -> np.ndarray:
@@ -29,3 +36,46 @@ def save_image(image: np.ndarray, output_path: str) -> None:
     success = cv2.imwrite(output_path, image)
     if not success:
         raise ValueError(f"Could not save image to path: {output_path}")
+
+
+def stack_images(images: list[np.ndarray], method: str = "mean") -> np.ndarray:
+    """
+    Combine images of the same scene into one, reducing the noise of the sensor and the flicker of the projector.
+
+    The mean is cheaper, the median also removes outliers, e.g. a frame caught during a projector refresh.
+
+    Args:
+        images (list[np.ndarray]): The images, of the same shape and type.
+        method (str): The method, one of STACK_METHODS. Defaults to "mean".
+
+    Raises:
+        ValueError: If there is no image, if the images differ in shape or type, or if the method is unknown.
+
+    Returns:
+        np.ndarray: The combined image, of the type of the images.
+    """
+    if method not in STACK_METHODS:
+        raise ValueError(
+            f"The stack method must be one of {', '.join(STACK_METHODS)}, got '{method}'."
+        )
+    if not images:
+        raise ValueError("There is no image to stack.")
+    first = images[0]
+    if any(
+        image.shape != first.shape or image.dtype != first.dtype for image in images
+    ):
+        raise ValueError("The images to stack must have the same shape and type.")
+    if len(images) == 1:
+        return first.copy()
+
+    if method == "median":
+        stacked = np.median(np.stack(images), axis=0)
+    else:
+        # Summed one image at a time, without a copy of the whole stack
+        stacked = first.astype(np.float32)
+        for image in images[1:]:
+            stacked += image
+        stacked /= len(images)
+    if np.issubdtype(first.dtype, np.integer):
+        stacked = np.rint(stacked)
+    return stacked.astype(first.dtype)
@@ -0,0 +1,61 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule:
+    """Module imported on the first access to one of its attributes.
+
+    Used for the heavy dependencies (cv2, numpy), so that the app starts without importing them
+    and only the requests that need them pay for their import, once.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initializes a new LazyModule object.
+
+        Args:
+            name (str): Name of the module, e.g. "cv2".
+        """
+        self._name: str = name
+        self._module: ModuleType | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    def __getattr__(self, attribute: str) -> Any:
+        """
+        Gets an attribute of the module, importing it if needed.
+
+        Args:
+            attribute (str): Name of the attribute.
+
+        Returns:
+            Any: The attribute.
+        """
+        return getattr(self.load(), attribute)
+
+    def load(self) -> ModuleType:
+        """
+        Imports the module, if it is not imported yet.
+
+        Returns:
+            ModuleType: The module.
+        """
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Gets a module that is imported on first use.
+
+    Args:
+        name (str): Name of the module, e.g. "cv2".
+
+    Returns:
+        LazyModule: The module, to use like the imported module.
+    """
+    return LazyModule(name)
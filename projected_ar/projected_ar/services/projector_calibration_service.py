@@ -1,31 +1,218 @@
-import cv2
-import numpy as np
+from __future__ import annotations
+
+import functools
+import json
+from dataclasses import dataclass
+from typing import Mapping
+
+from services.lazy_import_service import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+
+# Corner refinement methods of the detector, by name, with the names of their constants in cv2.aruco
+CORNER_REFINEMENTS: dict[str, str] = {
+    "none": "CORNER_REFINE_NONE",
+    "subpix": "CORNER_REFINE_SUBPIX",
+    "contour": "CORNER_REFINE_CONTOUR",
+    "apriltag": "CORNER_REFINE_APRILTAG",
+}
+# Maximum number of detectors kept, one per dictionary type and parameter set
+MAX_DETECTORS = 32
+# Fields setting the detector parameters in the requests, with their types
+DETECTOR_PARAMETER_TYPES: dict[str, type] = {
+    "corner_refinement": str,
+    "adaptive_thresh_win_size_min": int,
+    "adaptive_thresh_win_size_max": int,
+    "adaptive_thresh_win_size_step": int,
+    "min_marker_perimeter_rate": float,
+}
+
+
+@dataclass(frozen=True)
+class DetectorParameters:
+    """Parameters of the ArUco detector, with the defaults of OpenCV.
+
+    Hashable, so that the detectors are cached by dictionary type and parameter set.
+    """
+
+    corner_refinement: str = "none"
+    adaptive_thresh_win_size_min: int = 3
+    adaptive_thresh_win_size_max: int = 23
+    adaptive_thresh_win_size_step: int = 10
+    min_marker_perimeter_rate: float = 0.03
+
+    def __post_init__(self):
+        """
+        Validates the parameters.
+
+        Raises:
+            ValueError: If a parameter is invalid.
+        """
+        if self.corner_refinement not in CORNER_REFINEMENTS:
+            raise ValueError(
+                f"The corner refinement must be one of {', '.join(CORNER_REFINEMENTS)}, "
+                f"got '{self.corner_refinement}'."
+            )
+        if not (
+            3 <= self.adaptive_thresh_win_size_min <= self.adaptive_thresh_win_size_max
+        ):
+            raise ValueError(
+                "The adaptive threshold window sizes must be at least 3, with the minimum not above the maximum, "
+                f"got {self.adaptive_thresh_win_size_min} and {self.adaptive_thresh_win_size_max}."
+            )
+        if self.adaptive_thresh_win_size_step <= 0:
+            raise ValueError(
+                "The adaptive threshold window size step must be positive, "
+                f"got {self.adaptive_thresh_win_size_step}."
+            )
+        if not 0 < self.min_marker_perimeter_rate < 4:
+            raise ValueError(
+                "The minimum marker perimeter rate must be between 0 and 4 (the maximum rate), "
+                f"got {self.min_marker_perimeter_rate}."
+            )
+
+
+def parse_detector_parameters(fields: Mapping[str, str]) -> DetectorParameters:
+    """
+    Parse the detector parameters of a request, the missing ones keeping their default value.
+
+    Args:
+        fields (Mapping[str, str]): The fields of the request, see DETECTOR_PARAMETER_TYPES.
+
+    Raises:
+        ValueError: If a parameter is not of its type or is invalid.
+
+    Returns:
+        DetectorParameters: The parameters.
+    """
+    return DetectorParameters(
+        **{
+            name: type_(fields.get(name))
+            for name, type_ in DETECTOR_PARAMETER_TYPES.items()
+            if fields.get(name)
+        }
+    )
+
+
+@functools.lru_cache(maxsize=MAX_DETECTORS)
+def get_detector(
+    dict_type: int, parameters: DetectorParameters = DetectorParameters()
+) -> cv2.aruco.ArucoDetector:
+    """
+    Get the ArUco detector of a dictionary type and a parameter set, created on the first call
+    and reused by the next ones.
+
+    Args:
+        dict_type (int): The type of ArUco dictionary to use.
+        parameters (DetectorParameters): The parameters of the detector. Defaults to the defaults of OpenCV.
+
+    Returns:
+        cv2.aruco.ArucoDetector: The detector.
+    """
+    detector_parameters = cv2.aruco.DetectorParameters()
+    detector_parameters.cornerRefinementMethod = getattr(
+        cv2.aruco, CORNER_REFINEMENTS[parameters.corner_refinement]
+    )
+    detector_parameters.adaptiveThreshWinSizeMin = (
+        parameters.adaptive_thresh_win_size_min
+    )
+    detector_parameters.adaptiveThreshWinSizeMax = (
+        parameters.adaptive_thresh_win_size_max
+    )
+    detector_parameters.adaptiveThreshWinSizeStep = (
+        parameters.adaptive_thresh_win_size_step
+    )
+    detector_parameters.minMarkerPerimeterRate = parameters.min_marker_perimeter_rate
+
+    aruco_dict = cv2.aruco.getPredefinedDictionary(dict_type)
+    return cv2.aruco.ArucoDetector(aruco_dict, detector_parameters)
 
 
 def detect_markers(
     frame: cv2.typing.MatLike,
     dict_type: int,
-) -> dict[int, np.ndarray[tuple[4, 2], np.float64]]:
+    parameters: DetectorParameters = DetectorParameters(),
+) -> dict[int, np.ndarray[tuple[4, 2], np.float32]]:
     """
     Detect ArUco markers in the given frame.
 
     Args:
         frame (cv2.typing.MatLike): The input frame.
         dict_type (int): The type of ArUco dictionary to use.
+        parameters (DetectorParameters): The parameters of the detector. Defaults to the defaults of OpenCV.
+
+    Returns:
+        dict[int, np.ndarray]: A dictionary mapping marker IDs to their corners, empty if no marker is detected.
+    """
+    corners, ids, rejected = get_detector(dict_type, parameters).detectMarkers(frame)
+    if ids is None:
+        return {}
+
+    return {
+        int(marker_id): corner.reshape(4, 2)
+        for marker_id, corner in zip(ids.flatten(), corners)
+    }
+
+
+def parse_markers(
+    markers_string: str,
+) -> dict[int, np.ndarray[tuple[4, 2], np.float64]]:
+    """
+    Parse markers sent as JSON, {"marker_id": [[x1, y1], [x2, y2], [x3, y3], [x4, y4]], ...}.
+
+    Args:
+        markers_string (str): The JSON string.
+
+    Raises:
+        ValueError: If the string is not valid JSON or the markers are not in this format.
 
     Returns:
         dict[int, np.ndarray]: A dictionary mapping marker IDs to their corners.
     """
-    aruco_dict = cv2.aruco.getPredefinedDictionary(dict_type)
-    parameters = cv2.aruco.DetectorParameters()
+    try:
+        markers_list = json.loads(markers_string)
+        markers = {
+            int(marker_id): np.array(corners, dtype=np.float64)
+            for marker_id, corners in markers_list.items()
+        }
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError("Invalid JSON format or data format of the markers.")
+    if any(corners.shape != (4, 2) for corners in markers.values()):
+        raise ValueError("The corners of each marker must be 4 points [x, y].")
+    return markers
 
-    corners, ids, rejected = cv2.aruco.detectMarkers(
-        frame,
-        aruco_dict,
-        parameters=parameters,
-    )
 
-    return {marker_id: corner for marker_id, corner in zip(ids.flatten(), corners)}
+def merge_detections(
+    detections: list[dict[int, np.ndarray[tuple[4, 2], np.float32]]],
+) -> tuple[dict[int, np.ndarray[tuple[4, 2], np.float32]], dict[int, int]]:
+    """
+    Merge the markers detected in several frames of the same scene, e.g. the frames of a burst.
+
+    A marker missed in some frames, e.g. a projected marker during a projector refresh, is kept if it is
+    detected in any frame. Its corners are the median of its detections, robust to a bad detection.
+
+    Args:
+        detections (list[dict[int, np.ndarray]]): The markers detected in each frame, see detect_markers.
+
+    Returns:
+        tuple[dict[int, np.ndarray], dict[int, int]]: The merged corners of each marker,
+            and the number of frames each marker was detected in.
+    """
+    corners_by_marker: dict[int, list[np.ndarray]] = {}
+    for detected_markers in detections:
+        for marker_id, corners in detected_markers.items():
+            corners_by_marker.setdefault(marker_id, []).append(corners)
+
+    merged_markers = {
+        marker_id: np.median(np.stack(corners), axis=0).astype(np.float32)
+        for marker_id, corners in corners_by_marker.items()
+    }
+    detection_counts = {
+        marker_id: len(corners) for marker_id, corners in corners_by_marker.items()
+    }
+    return merged_markers, detection_counts
 
 
 def apply_homography(
@@ -0,0 +1,42 @@
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+# Directory of the modules shared with SVG Utils, in the same repository, which keeps their single source and tests
+SHARED_DIR = Path(__file__).resolve().parents[3] / "svg-utils" / "svg_utils" / "utils"
+
+
+def load_shared_module(name: str) -> ModuleType:
+    """
+    Imports a module of SVG Utils shared with this app, once. The shared modules only import
+    the standard library and the common dependencies of the apps (bottle).
+
+    Args:
+        name (str): Name of the module in SHARED_DIR, e.g. "wsgi_server".
+
+    Raises:
+        ModuleNotFoundError: If the module is not in SHARED_DIR.
+
+    Returns:
+        ModuleType: The module.
+    """
+    module_name = f"shared.{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    filepath = SHARED_DIR / f"{name}.py"
+    if not filepath.is_file():
+        raise ModuleNotFoundError(
+            f"The shared module '{name}' was not found in '{SHARED_DIR}'."
+        )
+    spec = importlib.util.spec_from_file_location(module_name, filepath)
+    module = importlib.util.module_from_spec(spec)
+    # Registered before running it, as the dataclasses of the module look it up
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Iterator
+
+from services import camera_service, projector_calibration_service
+from services.lazy_import_service import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+# Default and maximum frame rates of the streams, in frames per second
+DEFAULT_FPS = 15.0
+MAX_FPS = 30.0
+# Default JPEG quality of the streamed frames, from 0 to 100
+DEFAULT_QUALITY = 80
+# Boundary between the frames of the multipart responses
+BOUNDARY = "frame"
+
+
+class MJPEGStream:
+    """Background thread encoding the newest frames of a camera as JPEG at a target frame rate,
+    optionally warped by a homography, shared by all the clients of the stream.
+
+    Each frame is encoded once, whatever the number of clients, and a slow client skips the frames
+    it missed instead of delaying the others.
+    """
+
+    def __init__(
+        self,
+        grabber: camera_service.FrameGrabber,
+        fps: float = DEFAULT_FPS,
+        quality: int = DEFAULT_QUALITY,
+        homography: np.ndarray | None = None,
+    ):
+        """
+        Initializes a new MJPEGStream object. The thread is started by start.
+
+        Args:
+            grabber (camera_service.FrameGrabber): The grabber of the camera.
+            fps (float): Maximum number of frames encoded per second. Defaults to DEFAULT_FPS.
+            quality (int): JPEG quality, from 0 to 100. Defaults to DEFAULT_QUALITY.
+            homography (np.ndarray | None): Homography applied to the frames. Defaults to None (the raw frames).
+        """
+        self._grabber: camera_service.FrameGrabber = grabber
+        self._interval: float = 1 / fps
+        self._quality: int = quality
+        self._homography: np.ndarray | None = homography
+        self._jpeg: bytes | None = None
+        self._sequence: int = 0
+        self._new_jpeg: threading.Condition = threading.Condition()
+        self._stopped: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._encode, daemon=True
+        )
+
+    def start(self):
+        """Starts encoding the frames."""
+        self._thread.start()
+
+    @property
+    def stopped(self) -> bool:
+        """
+        Returns whether the stream is stopped.
+
+        Returns:
+            bool: Whether the stream is stopped.
+        """
+        return self._stopped.is_set()
+
+    def stop(self):
+        """Stops encoding the frames, the clients waiting for a frame get None."""
+        self._stopped.set()
+        with self._new_jpeg:
+            self._new_jpeg.notify_all()
+
+    def wait_next_jpeg(
+        self, sequence: int = 0, timeout: float = camera_service.CAPTURE_TIMEOUT
+    ) -> tuple[int, bytes] | None:
+        """
+        Gets the newest encoded frame, waiting for one newer than the last one the client got.
+
+        Args:
+            sequence (int): Sequence number of the last frame the client got. Defaults to 0 (no frame yet).
+            timeout (float): Maximum time to wait for the frame, in seconds. Defaults to CAPTURE_TIMEOUT.
+
+        Returns:
+            tuple[int, bytes] | None: The sequence number and the JPEG data of the frame,
+                or None if the stream is stopped (e.g. the camera is closed) or there is no new frame before the timeout.
+
+        Raises:
+            ValueError: If the timeout is negative or not a number.
+        """
+        camera_service.check_timeout(timeout)
+        deadline = time.monotonic() + timeout
+        with self._new_jpeg:
+            while not self._stopped.is_set():
+                if self._sequence > sequence:
+                    return self._sequence, self._jpeg
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # An infinite timeout waits in steps, longer waits overflow
+                self._new_jpeg.wait(min(remaining, threading.TIMEOUT_MAX))
+        return None
+
+    def _encode(self):
+        """Encodes the newest frame at each interval, until the stream or the camera is stopped."""
+        index = None
+        next_time = time.monotonic()
+        try:
+            while not self._stopped.is_set():
+                try:
+                    frame = self._grabber.get_latest_frame(index)
+                except camera_service.CameraCaptureException:
+                    # The camera is closed, or sends no frame for a while (e.g. a network camera reconnecting)
+                    if self._grabber.stopped:
+                        break
+                    continue
+                index = frame.index
+                image = frame.image
+                if self._homography is not None:
+                    image = projector_calibration_service.apply_homography(
+                        image, self._homography
+                    )
+                ok, jpeg = cv2.imencode(
+                    ".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self._quality]
+                )
+                if ok:
+                    with self._new_jpeg:
+                        self._sequence += 1
+                        self._jpeg = jpeg.tobytes()
+                        self._new_jpeg.notify_all()
+
+                # Paced from the previous frame, skipping the intervals missed by a slow camera
+                next_time = max(next_time + self._interval, time.monotonic())
+                self._stopped.wait(next_time - time.monotonic())
+        finally:
+            self.stop()
+
+
+# Streams being sent, by camera, frame rate, quality and homography, with their number of clients
+_streams: dict[tuple, tuple[MJPEGStream, int]] = {}
+_streams_lock = threading.Lock()
+
+
+def open_stream(
+    camera_id: int,
+    grabber: camera_service.FrameGrabber,
+    fps: float = DEFAULT_FPS,
+    quality: int = DEFAULT_QUALITY,
+    homography: np.ndarray | None = None,
+) -> MJPEGStream:
+    """
+    Opens a stream of a camera for a new client, sharing the stream of the other clients with the same options.
+    The stream must be released by release_stream once the client is gone.
+
+    Args:
+        camera_id (int): ID of the camera.
+        grabber (camera_service.FrameGrabber): The grabber of the camera.
+        fps (float): Maximum number of frames per second, up to MAX_FPS. Defaults to DEFAULT_FPS.
+        quality (int): JPEG quality, from 0 to 100. Defaults to DEFAULT_QUALITY.
+        homography (np.ndarray | None): Homography applied to the frames, 3x3. Defaults to None (the raw frames).
+
+    Raises:
+        ValueError: If the frame rate, the quality or the homography is invalid.
+
+    Returns:
+        MJPEGStream: The stream.
+    """
+    if not 0 < fps <= MAX_FPS:
+        raise ValueError(
+            f"The frame rate must be above 0 and at most {MAX_FPS:g}, got {fps:g}."
+        )
+    if not 0 <= quality <= 100:
+        raise ValueError(f"The quality must be between 0 and 100, got {quality}.")
+    if homography is not None:
+        homography = np.asarray(homography, dtype=np.float64)
+        if homography.shape != (3, 3):
+            raise ValueError(
+                f"The homography must be a 3x3 matrix, got shape {homography.shape}."
+            )
+
+    key = (
+        camera_id,
+        fps,
+        quality,
+        None if homography is None else homography.tobytes(),
+    )
+    with _streams_lock:
+        stream, client_count = _streams.get(key, (None, 0))
+        # A stream stopped by its camera is replaced, its clients no longer count
+        if stream is None or stream.stopped:
+            stream, client_count = MJPEGStream(grabber, fps, quality, homography), 0
+            stream.start()
+        _streams[key] = (stream, client_count + 1)
+    return stream
+
+
+def release_stream(stream: MJPEGStream):
+    """
+    Releases a stream opened by open_stream, stopping it when its last client is gone.
+
+    Args:
+        stream (MJPEGStream): The stream.
+    """
+    with _streams_lock:
+        for key, (open_stream_, client_count) in _streams.items():
+            if open_stream_ is stream:
+                if client_count > 1:
+                    _streams[key] = (stream, client_count - 1)
+                else:
+                    del _streams[key]
+                    stream.stop()
+                return
+
+
+def iter_multipart(
+    stream: MJPEGStream, timeout: float = camera_service.CAPTURE_TIMEOUT
+) -> Iterator[bytes]:
+    """
+    Generates the body of a multipart/x-mixed-replace response from a stream, one part per frame,
+    until the stream is stopped or sends no frame before the timeout. Releases the stream at the end,
+    including when the client disconnects and the server closes the generator.
+
+    Args:
+        stream (MJPEGStream): The stream, opened by open_stream.
+        timeout (float): Maximum time to wait for a frame, in seconds. Defaults to CAPTURE_TIMEOUT.
+
+    Returns:
+        Iterator[bytes]: The parts of the response, separated by BOUNDARY.
+    """
+    try:
+        sequence = 0
+        while True:
+            jpeg = stream.wait_next_jpeg(sequence, timeout)
+            if jpeg is None:
+                return
+            sequence, data = jpeg
+            yield (
+                f"--{BOUNDARY}\r\n"
+                "Content-Type: image/jpeg\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n"
+            ).encode() + data + b"\r\n"
+    finally:
+        release_stream(stream)
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+from services import camera_service, projector_calibration_service
+from services.lazy_import_service import lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+# Default weight of the previous homography in the smoothed one, from 0 (no smoothing) to below 1
+DEFAULT_SMOOTHING = 0.5
+# Margin around the previous position of a marker searched in the next frame, relative to the size of the marker
+ROI_MARGIN = 1.0
+# Number of frames between two detections in the whole frame, to find the markers not tracked yet
+FULL_DETECTION_INTERVAL = 30
+
+
+@dataclass
+class TrackingState:
+    """The homography correction published by a tracker."""
+
+    # Smoothed homography correction of the projector, None until the markers are detected
+    homography: np.ndarray | None = None
+    # Number of updates of the homography
+    sequence: int = 0
+    # Time the frame of the last update was read from the camera, in seconds since the epoch
+    timestamp: float | None = None
+    # Markers detected in the last frame
+    detected_marker_ids: list[int] = field(default_factory=list)
+    # Number of frames processed, and of detections in the whole frame among them
+    frame_count: int = 0
+    full_detection_count: int = 0
+
+
+class MarkerTracker:
+    """Background thread detecting the markers in each new frame of a camera and updating the homography
+    correction of the projector, so that the projection stays aligned when the surface or the camera moves.
+
+    The markers are searched around their previous positions only, which costs less than a detection
+    in the whole frame. The whole frame is searched when a marker is lost, and every FULL_DETECTION_INTERVAL
+    frames to find the markers entering the view. The published homography is an exponential moving average
+    of the homographies of the frames, smoothing the jitter of the detected corners.
+    """
+
+    def __init__(
+        self,
+        grabber: camera_service.FrameGrabber,
+        dict_type: int,
+        real_markers: dict[int, np.ndarray[tuple[4, 2], np.float64]],
+        projected_markers: dict[int, np.ndarray[tuple[4, 2], np.float64]],
+        parameters: projector_calibration_service.DetectorParameters = projector_calibration_service.DetectorParameters(),
+        smoothing: float = DEFAULT_SMOOTHING,
+    ):
+        """
+        Initializes a new MarkerTracker object. The thread is started by start.
+
+        Args:
+            grabber (camera_service.FrameGrabber): The grabber of the camera.
+            dict_type (int): The type of ArUco dictionary of the markers.
+            real_markers (dict[int, np.ndarray]): Real markers, see calculate_homography_correction.
+            projected_markers (dict[int, np.ndarray]): Expected projected markers, see calculate_homography_correction.
+            parameters (projector_calibration_service.DetectorParameters): The parameters of the detector.
+                Defaults to the defaults of OpenCV.
+            smoothing (float): Weight of the previous homography in the smoothed one, from 0 (no smoothing)
+                to below 1. Defaults to DEFAULT_SMOOTHING.
+
+        Raises:
+            ValueError: If the smoothing is out of range or there is no real or projected marker.
+        """
+        if not 0 <= smoothing < 1:
+            raise ValueError(
+                f"The smoothing must be at least 0 and below 1, got {smoothing}."
+            )
+        if not real_markers or not projected_markers:
+            raise ValueError("The real and projected markers must not be empty.")
+        self._grabber: camera_service.FrameGrabber = grabber
+        self._dict_type: int = dict_type
+        self._parameters: projector_calibration_service.DetectorParameters = parameters
+        self._real_markers: dict[int, np.ndarray] = real_markers
+        self._projected_markers: dict[int, np.ndarray] = projected_markers
+        self._marker_ids: set[int] = set(real_markers) | set(projected_markers)
+        self._smoothing: float = smoothing
+        # Corners of the markers detected in the previous frame
+        self._previous_markers: dict[int, np.ndarray] = {}
+        self._state: TrackingState = TrackingState()
+        self._updated: threading.Condition = threading.Condition()
+        self._stopped: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._track, daemon=True
+        )
+
+    def start(self):
+        """Starts tracking the markers."""
+        self._thread.start()
+
+    @property
+    def stopped(self) -> bool:
+        """
+        Returns whether the tracker is stopped, by stop or because the camera is closed.
+
+        Returns:
+            bool: Whether the tracker is stopped.
+        """
+        return self._stopped.is_set()
+
+    def stop(self):
+        """Stops tracking the markers, once the current frame is processed."""
+        self._stopped.set()
+        with self._updated:
+            self._updated.notify_all()
+
+    def get_state(
+        self, newer_than: int | None = None, timeout: float = 0
+    ) -> TrackingState:
+        """
+        Gets the current state, optionally waiting for an update of the homography.
+
+        Args:
+            newer_than (int | None): Sequence number the state must be newer than, e.g. of the previous state
+                the client got. Defaults to None (the current state).
+            timeout (float): Maximum time to wait for a newer state, in seconds, after which the current state
+                is returned. Defaults to 0.
+
+        Raises:
+            ValueError: If the timeout is negative or not a number.
+
+        Returns:
+            TrackingState: A copy of the state.
+        """
+        camera_service.check_timeout(timeout)
+        deadline = time.monotonic() + timeout
+        with self._updated:
+            while (
+                newer_than is not None
+                and self._state.sequence <= newer_than
+                and not self._stopped.is_set()
+            ):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # An infinite timeout waits in steps, longer waits overflow
+                self._updated.wait(min(remaining, threading.TIMEOUT_MAX))
+            return TrackingState(
+                homography=(
+                    None
+                    if self._state.homography is None
+                    else self._state.homography.copy()
+                ),
+                sequence=self._state.sequence,
+                timestamp=self._state.timestamp,
+                detected_marker_ids=list(self._state.detected_marker_ids),
+                frame_count=self._state.frame_count,
+                full_detection_count=self._state.full_detection_count,
+            )
+
+    def _track(self):
+        """Processes each new frame until the tracker or the camera is stopped."""
+        index = None
+        try:
+            while not self._stopped.is_set():
+                try:
+                    frame = self._grabber.get_latest_frame(index)
+                except camera_service.CameraCaptureException:
+                    # The camera is closed, or sends no frame for a while (e.g. a network camera reconnecting)
+                    if self._grabber.stopped:
+                        break
+                    continue
+                index = frame.index
+                detected_markers, full_detection = self._detect(frame.image)
+                self._update(detected_markers, full_detection, frame.timestamp)
+        finally:
+            self.stop()
+
+    def _detect(self, image: cv2.typing.MatLike) -> tuple[dict[int, np.ndarray], bool]:
+        """
+        Detects the markers of the calibration in a frame, around their previous positions if possible.
+
+        Args:
+            image (cv2.typing.MatLike): The frame.
+
+        Returns:
+            tuple[dict[int, np.ndarray], bool]: The corners of the detected markers, in the coordinates of the frame,
+                and whether the whole frame was searched.
+        """
+        if (
+            self._previous_markers
+            and self._state.frame_count % FULL_DETECTION_INTERVAL != 0
+        ):
+            detected_markers = {}
+            for corners in self._previous_markers.values():
+                x_min, y_min, x_max, y_max = self._get_roi(corners, image.shape)
+                for (
+                    marker_id,
+                    roi_corners,
+                ) in projector_calibration_service.detect_markers(
+                    image[y_min:y_max, x_min:x_max], self._dict_type, self._parameters
+                ).items():
+                    if marker_id in self._marker_ids:
+                        detected_markers[marker_id] = roi_corners + (x_min, y_min)
+            if self._previous_markers.keys() <= detected_markers.keys():
+                return detected_markers, False
+
+        # First frame, a marker lost, or a periodic search for new markers
+        detected_markers = projector_calibration_service.detect_markers(
+            image, self._dict_type, self._parameters
+        )
+        return {
+            marker_id: corners
+            for marker_id, corners in detected_markers.items()
+            if marker_id in self._marker_ids
+        }, True
+
+    @staticmethod
+    def _get_roi(
+        corners: np.ndarray, shape: tuple[int, ...]
+    ) -> tuple[int, int, int, int]:
+        """
+        Gets the region searched for a marker, its bounding box enlarged by ROI_MARGIN and clipped to the frame.
+
+        Args:
+            corners (np.ndarray): The previous corners of the marker.
+            shape (tuple[int, ...]): The shape of the frame.
+
+        Returns:
+            tuple[int, int, int, int]: The minimum x and y, included, and the maximum x and y, excluded.
+        """
+        x_min, y_min = corners.min(axis=0)
+        x_max, y_max = corners.max(axis=0)
+        margin = ROI_MARGIN * max(x_max - x_min, y_max - y_min)
+        height, width = shape[:2]
+        return (
+            max(int(x_min - margin), 0),
+            max(int(y_min - margin), 0),
+            min(int(x_max + margin) + 1, width),
+            min(int(y_max + margin) + 1, height),
+        )
+
+    def _update(
+        self,
+        detected_markers: dict[int, np.ndarray],
+        full_detection: bool,
+        timestamp: float,
+    ):
+        """
+        Updates the smoothed homography with the markers detected in a frame, if they are enough to compute it.
+
+        Args:
+            detected_markers (dict[int, np.ndarray]): The corners of the detected markers.
+            full_detection (bool): Whether the whole frame was searched.
+            timestamp (float): Time the frame was read from the camera, in seconds since the epoch.
+        """
+        self._previous_markers = detected_markers
+        homography = None
+        if not detected_markers.keys().isdisjoint(
+            self._real_markers
+        ) and not detected_markers.keys().isdisjoint(self._projected_markers):
+            try:
+                homography = (
+                    projector_calibration_service.calculate_homography_correction(
+                        detected_markers, self._real_markers, self._projected_markers
+                    )
+                )
+            except (ValueError, cv2.error, np.linalg.LinAlgError):
+                # Degenerate corners, e.g. a marker detected at the edge of the frame
+                pass
+
+        with self._updated:
+            state = self._state
+            state.frame_count += 1
+            state.full_detection_count += full_detection
+            state.detected_marker_ids = sorted(detected_markers)
+            if homography is None or homography[2, 2] == 0:
+                return
+            # Normalized, so that the homographies of the frames can be averaged
+            homography = homography / homography[2, 2]
+            if state.homography is not None:
+                homography = (
+                    self._smoothing * state.homography
+                    + (1 - self._smoothing) * homography
+                )
+            state.homography = homography
+            state.sequence += 1
+            state.timestamp = timestamp
+            self._updated.notify_all()
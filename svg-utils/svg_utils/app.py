@@ -1,17 +1,86 @@
 import os
+from pathlib import Path
 
-from bottle import Bottle, run
-from controllers import PathToSVGController
+from bottle import BaseRequest, Bottle
+from controllers import PathToSVGController, ProfilerController
+from services import PathToSVGService
+from utils import (
+    ProfilingMiddleware,
+    RequestMetrics,
+    RequestProfiler,
+    RequestSizeLimitMiddleware,
+    ResultCache,
+    get_server_options,
+    run_server,
+)
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data"
 
 app: Bottle = Bottle()
 
-path_to_svg_controller = PathToSVGController()
+# Maximum size of the request bodies, larger requests get a 413 error.
+# Bottle also rejects the form bodies larger than MEMFILE_MAX, so it is raised to the same size
+max_request_bytes = int(os.getenv("MAX_REQUEST_BYTES", str(10 * 1024 * 1024)))
+BaseRequest.MEMFILE_MAX = max_request_bytes
+
+# Number of worker processes building the path data of large multi-path drawings and the drawings of batches
+path_data_workers = int(os.getenv("PATH_DATA_WORKERS", "1"))
+
+# Optional cache of the generated SVGs, in memory and on disk
+cache_max_bytes = int(os.getenv("SVG_CACHE_MAX_BYTES", "0"))
+cache_directory = os.getenv("SVG_CACHE_DIR")
+cache = (
+    ResultCache(cache_max_bytes, cache_directory)
+    if cache_max_bytes > 0 or cache_directory
+    else None
+)
+
+# Optional metrics of the requests at /metrics, and durations of their stages in a Server-Timing header
+metrics = RequestMetrics() if os.getenv("METRICS_ENABLED") == "1" else None
+server_timing = os.getenv("SERVER_TIMING") == "1"
+
+# Optional profiling of the next requests and of the requests with a header, listed at /profiles
+profiler = (
+    RequestProfiler(
+        os.getenv("PROFILE_DIR", str(DATA_DIR / "profiles")),
+        int(os.getenv("PROFILE_REQUESTS", "0")),
+        os.getenv("PROFILE_HEADER", "X-Profile"),
+        os.getenv("PROFILE_MODE", "cprofile"),
+    )
+    if os.getenv("PROFILING_ENABLED") == "1"
+    else None
+)
+if profiler is not None:
+    app.mount("/profiles", ProfilerController(profiler).app)
+
+path_to_svg_controller = PathToSVGController(
+    PathToSVGService(max_workers=path_data_workers), cache, metrics, server_timing
+)
 app.mount("/", path_to_svg_controller.app)
 
+# The WSGI app to serve, profiling the requests if enabled
+application = RequestSizeLimitMiddleware(
+    ProfilingMiddleware(app, profiler, "/profiles") if profiler is not None else app,
+    max_request_bytes,
+)
+
 if __name__ == "__main__":
     host = os.getenv("HOST")
     port = os.getenv("PORT")
     if not host or not port:
         raise ValueError("Environment variables HOST and PORT must be set.")
 
-    run(app, host=host, port=port)
+    # The reference server by default, or a multi-threaded (waitress) or pre-fork (gunicorn) server
+    options = get_server_options(
+        os.getenv("SERVER", "wsgiref"),
+        host,
+        int(port),
+        workers=int(os.getenv("SERVER_WORKERS", "1")),
+        threads=int(os.getenv("SERVER_THREADS", "1")),
+        keepalive=int(os.getenv("SERVER_KEEPALIVE", "5")),
+        graceful_timeout=int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")),
+        timeout=int(os.getenv("SERVER_TIMEOUT", "120")),
+        max_request_bytes=max_request_bytes,
+    )
+    run_server(application, options)
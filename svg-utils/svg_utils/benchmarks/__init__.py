@@ -0,0 +1,6 @@
+from .cases import CASE_SIZES, CASES
+
+__all__ = [
+    "CASE_SIZES",
+    "CASES",
+]
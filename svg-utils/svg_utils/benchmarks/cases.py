@@ -0,0 +1,258 @@
+import io
+import json
+import struct
+from typing import Callable
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+import numpy as np
+from bottle import Bottle
+from controllers import PathToSVGController
+from services import PathToSVGService
+from utils import PathBuilder, SVGBuilder
+
+# Number of points of each path of the multi-path cases
+POINTS_PER_PATH = 20
+# Size of the drawings, the random walks stay well inside it
+DRAWING_SIZE = (4000, 4000)
+
+# Sizes of each case: number of points for the single path cases, number of paths for the multi-path cases
+CASE_SIZES: dict[str, tuple[int, ...]] = {
+    "path_builder": (1_000, 10_000, 100_000, 1_000_000, 2_000_000),
+    "svg_builder": (1_000, 10_000, 100_000, 1_000_000, 2_000_000),
+    "single_path": (1_000, 10_000, 100_000, 1_000_000, 2_000_000),
+    "multiple_paths": (10, 100, 1_000, 10_000, 100_000),
+    # The form bodies are limited to bottle.BaseRequest.MEMFILE_MAX (100 kB), about 5000 points
+    "request_single_path": (100, 1_000, 5_000),
+    "request_multiple_paths": (10, 50, 250),
+    "binary_request_single_path": (1_000, 10_000, 100_000, 1_000_000, 2_000_000),
+    "binary_request_multiple_paths": (10, 100, 1_000, 10_000, 100_000),
+}
+# Sizes of each case with the --quick option
+QUICK_CASE_SIZES: dict[str, tuple[int, ...]] = {
+    name: sizes[:3] for name, sizes in CASE_SIZES.items()
+}
+
+
+def generate_points(point_count: int, seed: int = 0) -> np.ndarray:
+    """
+    Generate a reproducible random walk of integer points, like the contours sent by the clients.
+
+    Args:
+        point_count (int): Number of points.
+        seed (int): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        np.ndarray: Array of int32 points of shape (N, 2).
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.integers(-3, 4, (point_count, 2))
+    return (np.cumsum(steps, axis=0) % DRAWING_SIZE[0]).astype(np.int32)
+
+
+def generate_paths(path_count: int, seed: int = 0) -> list[np.ndarray]:
+    """
+    Generate reproducible random walks of POINTS_PER_PATH integer points.
+
+    Args:
+        path_count (int): Number of paths.
+        seed (int): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        list[np.ndarray]: Arrays of int32 points of shape (POINTS_PER_PATH, 2).
+    """
+    points = generate_points(path_count * POINTS_PER_PATH, seed)
+    return np.split(points, path_count)
+
+
+def encode_binary_request(points: np.ndarray, header: dict) -> bytes:
+    """
+    Encode a request body in the binary format of BinaryPathRequest.
+
+    Args:
+        points (np.ndarray): Points of all paths, of shape (N, 2).
+        header (dict): Fields of the request, except the points.
+
+    Returns:
+        bytes: The request body.
+    """
+    encoded_header = json.dumps(header).encode()
+    return (
+        struct.pack("<I", len(encoded_header))
+        + encoded_header
+        + points.astype("<i4").tobytes()
+    )
+
+
+def call_app(app: Bottle, path: str, body: bytes, content_type: str) -> bytes:
+    """
+    Send a POST request to a WSGI app, without a server.
+
+    Args:
+        app (Bottle): The app.
+        path (str): Path of the endpoint.
+        body (bytes): Body of the request.
+        content_type (str): Content type of the body.
+
+    Raises:
+        RuntimeError: If the response status is not 200.
+
+    Returns:
+        bytes: Body of the response.
+    """
+    environ: dict = {}
+    setup_testing_defaults(environ)
+    environ.update(
+        {
+            "REQUEST_METHOD": "POST",
+            "PATH_INFO": path,
+            "CONTENT_TYPE": content_type,
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        }
+    )
+    statuses: list[str] = []
+    response_body = b"".join(
+        app(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    )
+    if not statuses[0].startswith("200"):
+        raise RuntimeError(f"The request to {path} failed: {statuses[0]}.")
+    return response_body
+
+
+def path_builder_case(size: int) -> Callable[[], int]:
+    """Build the path data of a single path of the given number of points with PathBuilder."""
+    points = generate_points(size)
+
+    def run() -> int:
+        path_builder = PathBuilder()
+        path_builder.polyline_from_array(points)
+        path_builder.get_data()
+        return size
+
+    return run
+
+
+def svg_builder_case(size: int) -> Callable[[], int]:
+    """Serialize an SVG with the path data of a single path of the given number of points with SVGBuilder."""
+    path_builder = PathBuilder()
+    path_builder.polyline_from_array(generate_points(size))
+    path_data = path_builder.get_data()
+
+    def run() -> int:
+        svg_builder = SVGBuilder(size=DRAWING_SIZE, validate=False)
+        svg_builder.add_path(path_data, fill="none", stroke="black", stroke_width=1)
+        svg_builder.get_svg_string()
+        return size
+
+    return run
+
+
+def single_path_case(size: int) -> Callable[[], int]:
+    """Generate the SVG of a single path of the given number of points with PathToSVGService."""
+    service = PathToSVGService()
+    points = generate_points(size)
+
+    def run() -> int:
+        service.generate_line_path_svg(points, DRAWING_SIZE)
+        return size
+
+    return run
+
+
+def multiple_paths_case(size: int) -> Callable[[], int]:
+    """Generate the SVG of the given number of paths with PathToSVGService."""
+    service = PathToSVGService()
+    paths = generate_paths(size)
+
+    def run() -> int:
+        service.generate_multiple_line_paths_svg(paths, DRAWING_SIZE)
+        return size * POINTS_PER_PATH
+
+    return run
+
+
+def request_single_path_case(size: int) -> Callable[[], int]:
+    """Send a form /generate-single-path request with a path of the given number of points through the Bottle app."""
+    app = PathToSVGController(PathToSVGService()).app
+    body = urlencode(
+        {
+            "points": json.dumps(generate_points(size).tolist()),
+            "size": json.dumps(DRAWING_SIZE),
+        }
+    ).encode()
+
+    def run() -> int:
+        call_app(
+            app, "/generate-single-path", body, PathToSVGController.FORM_CONTENT_TYPE
+        )
+        return size
+
+    return run
+
+
+def request_multiple_paths_case(size: int) -> Callable[[], int]:
+    """Send a form /generate-multiple-paths request with the given number of paths through the Bottle app."""
+    app = PathToSVGController(PathToSVGService()).app
+    body = urlencode(
+        {
+            "paths": json.dumps([path.tolist() for path in generate_paths(size)]),
+            "size": json.dumps(DRAWING_SIZE),
+        }
+    ).encode()
+
+    def run() -> int:
+        call_app(
+            app, "/generate-multiple-paths", body, PathToSVGController.FORM_CONTENT_TYPE
+        )
+        return size * POINTS_PER_PATH
+
+    return run
+
+
+def binary_request_single_path_case(size: int) -> Callable[[], int]:
+    """Send a binary /generate-single-path request with a path of the given number of points through the Bottle app."""
+    app = PathToSVGController(PathToSVGService()).app
+    body = encode_binary_request(generate_points(size), {"size": DRAWING_SIZE})
+
+    def run() -> int:
+        call_app(
+            app, "/generate-single-path", body, PathToSVGController.BINARY_CONTENT_TYPE
+        )
+        return size
+
+    return run
+
+
+def binary_request_multiple_paths_case(size: int) -> Callable[[], int]:
+    """Send a binary /generate-multiple-paths request with the given number of paths through the Bottle app."""
+    app = PathToSVGController(PathToSVGService()).app
+    body = encode_binary_request(
+        generate_points(size * POINTS_PER_PATH),
+        {"size": DRAWING_SIZE, "path_lengths": [POINTS_PER_PATH] * size},
+    )
+
+    def run() -> int:
+        call_app(
+            app,
+            "/generate-multiple-paths",
+            body,
+            PathToSVGController.BINARY_CONTENT_TYPE,
+        )
+        return size * POINTS_PER_PATH
+
+    return run
+
+
+# Each case prepares its data for a size, out of the measures, and returns the function to measure,
+# which returns the number of points it processed
+CASES: dict[str, Callable[[int], Callable[[], int]]] = {
+    "path_builder": path_builder_case,
+    "svg_builder": svg_builder_case,
+    "single_path": single_path_case,
+    "multiple_paths": multiple_paths_case,
+    "request_single_path": request_single_path_case,
+    "request_multiple_paths": request_multiple_paths_case,
+    "binary_request_single_path": binary_request_single_path_case,
+    "binary_request_multiple_paths": binary_request_multiple_paths_case,
+}
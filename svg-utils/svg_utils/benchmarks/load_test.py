@@ -0,0 +1,269 @@
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from controllers import PathToSVGController
+
+from .cases import DRAWING_SIZE, POINTS_PER_PATH, encode_binary_request, generate_points
+from .runner import SVG_UTILS_DIRECTORY, get_metadata
+
+# Server configurations measured by default, as "server:workers:threads"
+DEFAULT_CONFIGURATIONS = ("wsgiref:1:1", "waitress:1:8", "gunicorn:4:2")
+# Maximum time the server has to start listening, in seconds
+STARTUP_TIMEOUT = 30
+
+
+def parse_configuration(configuration: str) -> tuple[str, int, int]:
+    """
+    Parse a server configuration.
+
+    Args:
+        configuration (str): The configuration, as "server:workers:threads", e.g. "gunicorn:4:2".
+
+    Raises:
+        ValueError: If the configuration is not in this format.
+
+    Returns:
+        tuple[str, int, int]: The server, the number of worker processes and the number of threads per worker.
+    """
+    try:
+        server, workers, threads = configuration.split(":")
+        return server, int(workers), int(threads)
+    except ValueError:
+        raise ValueError(
+            f"The configuration must be 'server:workers:threads', got '{configuration}'."
+        )
+
+
+def get_free_port() -> int:
+    """
+    Get a free TCP port of the loopback interface.
+
+    Returns:
+        int: The port.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(
+    server: str, workers: int, threads: int, port: int
+) -> subprocess.Popen:
+    """
+    Start the app in a new process, as configured by its environment variables, and wait until it listens.
+
+    Args:
+        server (str): Name of the server.
+        workers (int): Number of worker processes.
+        threads (int): Number of threads per worker process.
+        port (int): Port of the loopback interface the server listens on.
+
+    Raises:
+        RuntimeError: If the server exits or does not listen before STARTUP_TIMEOUT.
+
+    Returns:
+        subprocess.Popen: The process of the server.
+    """
+    environment = {
+        **os.environ,
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "SERVER": server,
+        "SERVER_WORKERS": str(workers),
+        "SERVER_THREADS": str(threads),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "app.py"],
+        cwd=SVG_UTILS_DIRECTORY,
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(
+                f"The server {server} exited with status {process.returncode}."
+            )
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    stop_server(process)
+    raise RuntimeError(f"The server {server} did not start listening.")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    """
+    Stop a server started by start_server, with SIGTERM.
+
+    Args:
+        process (subprocess.Popen): The process of the server.
+    """
+    process.terminate()
+    try:
+        process.wait(timeout=STARTUP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def run_load(
+    port: int, body: bytes, path: str, concurrency: int, duration: float
+) -> dict[str, int | float]:
+    """
+    Send the same request from several clients as fast as possible, each on a keep-alive connection.
+
+    Args:
+        port (int): Port of the server on the loopback interface.
+        body (bytes): Body of the binary requests.
+        path (str): Path of the requests.
+        concurrency (int): Number of concurrent clients.
+        duration (float): Duration of the load, in seconds.
+
+    Returns:
+        dict[str, int | float]: The number of successful requests and of errors, the requests per second,
+            and the median and 95th percentile latencies in seconds.
+    """
+    latencies: list[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client() -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        headers = {"Content-Type": PathToSVGController.BINARY_CONTENT_TYPE}
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request("POST", path, body, headers)
+                response = connection.getresponse()
+                response.read()
+                success = response.status == 200
+            except (OSError, http.client.HTTPException):
+                # The connection was closed by the server, the next request opens a new one
+                connection.close()
+                success = False
+            with lock:
+                if success:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors[0] += 1
+        connection.close()
+
+    start = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "requests_per_second": len(latencies) / elapsed,
+        "median_latency_seconds": statistics.median(latencies) if latencies else None,
+        "p95_latency_seconds": (
+            latencies[int(0.95 * (len(latencies) - 1))] if latencies else None
+        ),
+    }
+
+
+def main() -> int:
+    """
+    Run the load test from the command line.
+
+    Returns:
+        int: Exit status.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the throughput of the app under concurrent requests, with several server configurations."
+    )
+    parser.add_argument(
+        "--configuration",
+        action="append",
+        help="Server configuration as 'server:workers:threads', can be repeated "
+        f"(default: {' '.join(DEFAULT_CONFIGURATIONS)}).",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Number of concurrent clients."
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10, help="Duration of each load, in seconds."
+    )
+    parser.add_argument(
+        "--paths", type=int, default=500, help="Number of paths of each request."
+    )
+    parser.add_argument("--output", help="File to write the results to, as JSON.")
+    arguments = parser.parse_args()
+
+    body = encode_binary_request(
+        generate_points(arguments.paths * POINTS_PER_PATH),
+        {"size": DRAWING_SIZE, "path_lengths": [POINTS_PER_PATH] * arguments.paths},
+    )
+    results = []
+    for configuration in arguments.configuration or DEFAULT_CONFIGURATIONS:
+        server, workers, threads = parse_configuration(configuration)
+        port = get_free_port()
+        process = start_server(server, workers, threads, port)
+        try:
+            result = run_load(
+                port,
+                body,
+                "/generate-multiple-paths",
+                arguments.concurrency,
+                arguments.duration,
+            )
+        finally:
+            stop_server(process)
+        result = {
+            "server": server,
+            "workers": workers,
+            "threads": threads,
+            "concurrency": arguments.concurrency,
+            "paths": arguments.paths,
+            **result,
+        }
+        print(_format_result(result), file=sys.stderr)
+        results.append(result)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump({"metadata": get_metadata(), "results": results}, file, indent=2)
+    return 0
+
+
+def _format_result(result: dict) -> str:
+    """
+    Format a result of run_load on one line.
+
+    Args:
+        result (dict): The result, with its server configuration.
+
+    Returns:
+        str: The formatted result.
+    """
+    median_latency = result["median_latency_seconds"]
+    p95_latency = result["p95_latency_seconds"]
+    return (
+        f"{result['server']:<10}{result['workers']:>3} workers {result['threads']:>3} threads "
+        f"{result['requests_per_second']:>10.1f} requests/s "
+        f"{(median_latency or float('nan')) * 1000:>10.1f} ms median "
+        f"{(p95_latency or float('nan')) * 1000:>10.1f} ms p95 "
+        f"{result['errors']:>6} errors"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+from .cases import CASE_SIZES, CASES, QUICK_CASE_SIZES
+
+# Version of the format of the results, to change when the fields change
+RESULTS_VERSION = 1
+# Minimum total duration of the measures of a case, the fast cases are repeated until it is reached
+MIN_DURATION = 0.5
+# Maximum number of measures of a case
+MAX_REPEAT = 50
+# Relative slowdown of the median duration above which a case is reported as a regression
+DEFAULT_THRESHOLD = 0.1
+
+# Directory of the svg_utils modules, from which the cases are run
+SVG_UTILS_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_peak_rss() -> int | None:
+    """
+    Get the peak resident set size of the current process.
+
+    Returns:
+        int | None: The peak RSS in bytes, or None if it is not available on this platform.
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def measure_case(
+    name: str, size: int, min_repeat: int = 3
+) -> dict[str, str | int | float | None]:
+    """
+    Measure a case in the current process. The data is prepared once, then the case is run
+    at least min_repeat times and until MIN_DURATION is reached.
+
+    Args:
+        name (str): Name of the case, a key of CASES.
+        size (int): Size of the case.
+        min_repeat (int): Minimum number of measures. Defaults to 3.
+
+    Raises:
+        ValueError: If the case does not exist.
+
+    Returns:
+        dict[str, str | int | float | None]: The case, its size, the number of points, the number of measures,
+            the minimum and median durations in seconds, the points per second at the median duration,
+            and the peak RSS of the process in bytes before and after the case.
+    """
+    if name not in CASES:
+        raise ValueError(f"Unknown benchmark case '{name}'.")
+    # The modules are imported, so this is the memory used before the case
+    baseline_rss = get_peak_rss()
+    run = CASES[name](size)
+
+    durations: list[float] = []
+    while len(durations) < min_repeat or (
+        sum(durations) < MIN_DURATION and len(durations) < MAX_REPEAT
+    ):
+        start = time.perf_counter()
+        point_count = run()
+        durations.append(time.perf_counter() - start)
+
+    median_duration = statistics.median(durations)
+    return {
+        "case": name,
+        "size": size,
+        "points": point_count,
+        "repeat": len(durations),
+        "min_seconds": min(durations),
+        "median_seconds": median_duration,
+        "points_per_second": (
+            point_count / median_duration if median_duration > 0 else None
+        ),
+        "baseline_rss_bytes": baseline_rss,
+        "peak_rss_bytes": get_peak_rss(),
+    }
+
+
+def measure_case_in_subprocess(
+    name: str, size: int, min_repeat: int = 3
+) -> dict[str, str | int | float | None]:
+    """
+    Measure a case in a new Python process, so that its peak RSS is not raised by the other cases.
+
+    Args:
+        name (str): Name of the case, a key of CASES.
+        size (int): Size of the case.
+        min_repeat (int): Minimum number of measures. Defaults to 3.
+
+    Raises:
+        RuntimeError: If the process fails.
+
+    Returns:
+        dict[str, str | int | float | None]: The result of measure_case.
+    """
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.runner",
+            "--measure",
+            name,
+            str(size),
+            "--repeat",
+            str(min_repeat),
+        ],
+        cwd=SVG_UTILS_DIRECTORY,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"The benchmark case '{name}' of size {size} failed:\n{process.stderr}"
+        )
+    return json.loads(process.stdout)
+
+
+def get_metadata() -> dict[str, str | int | None]:
+    """
+    Get the description of the machine and of the code the benchmarks are run on.
+
+    Returns:
+        dict[str, str | int | None]: The date, the git commit (None outside a repository),
+            the Python and NumPy versions, the platform and the number of CPUs.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=SVG_UTILS_DIRECTORY,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "date": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_benchmarks(
+    case_names: list[str] | None = None,
+    quick: bool = False,
+    min_repeat: int = 3,
+) -> dict:
+    """
+    Measure the cases for each of their sizes, each in a new process.
+
+    Args:
+        case_names (list[str] | None): Names of the cases to run. Defaults to None (all cases).
+        quick (bool): Whether to run only the small sizes. Defaults to False.
+        min_repeat (int): Minimum number of measures of each case. Defaults to 3.
+
+    Raises:
+        ValueError: If a case does not exist.
+
+    Returns:
+        dict: The version of the format, the metadata (see get_metadata) and the results (see measure_case).
+    """
+    case_names = case_names or list(CASES)
+    unknown_names = [name for name in case_names if name not in CASES]
+    if unknown_names:
+        raise ValueError(f"Unknown benchmark cases: {', '.join(unknown_names)}.")
+
+    case_sizes = QUICK_CASE_SIZES if quick else CASE_SIZES
+    results = []
+    for name in case_names:
+        for size in case_sizes[name]:
+            result = measure_case_in_subprocess(name, size, min_repeat)
+            print(_format_result(result), file=sys.stderr)
+            results.append(result)
+    return {"version": RESULTS_VERSION, "metadata": get_metadata(), "results": results}
+
+
+def compare_results(
+    baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[str]:
+    """
+    Compare the median durations of the cases measured in both results.
+
+    Args:
+        baseline (dict): Results of run_benchmarks, e.g. of the previous commit.
+        current (dict): Results of run_benchmarks.
+        threshold (float): Relative slowdown above which a case is reported. Defaults to DEFAULT_THRESHOLD.
+
+    Returns:
+        list[str]: A description of each case slower than the baseline by more than the threshold.
+    """
+    baseline_results = {
+        (result["case"], result["size"]): result for result in baseline["results"]
+    }
+    regressions = []
+    for result in current["results"]:
+        baseline_result = baseline_results.get((result["case"], result["size"]))
+        if baseline_result is None:
+            continue
+        ratio = result["median_seconds"] / baseline_result["median_seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{result['case']} ({result['size']}): {ratio:.2f}x slower "
+                f"({baseline_result['median_seconds']:.4f} s -> {result['median_seconds']:.4f} s)"
+            )
+    return regressions
+
+
+def _format_result(result: dict) -> str:
+    """
+    Format a result of measure_case on one line.
+
+    Args:
+        result (dict): The result.
+
+    Returns:
+        str: The formatted result.
+    """
+    peak_rss = result["peak_rss_bytes"]
+    return (
+        f"{result['case']:<32}{result['size']:>10} "
+        f"{result['median_seconds'] * 1000:>12.2f} ms "
+        f"{(result['points_per_second'] or 0) / 1e6:>10.2f} Mpoints/s "
+        f"{peak_rss / 2**20 if peak_rss is not None else float('nan'):>10.1f} MiB"
+    )
+
+
+def main() -> int:
+    """
+    Run the benchmarks from the command line.
+
+    Returns:
+        int: Exit status, 1 if a regression was found against the baseline.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the throughput and the memory of the SVG generation."
+    )
+    parser.add_argument(
+        "--case",
+        action="append",
+        choices=list(CASES),
+        help="Case to run, can be repeated (default: all cases).",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Run only the small sizes."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Minimum number of measures of a case."
+    )
+    parser.add_argument("--output", help="File to write the results to, as JSON.")
+    parser.add_argument("--compare", help="Results to compare with, as JSON.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Relative slowdown reported as a regression.",
+    )
+    parser.add_argument(
+        "--measure",
+        nargs=2,
+        metavar=("CASE", "SIZE"),
+        help=argparse.SUPPRESS,
+    )
+    arguments = parser.parse_args()
+
+    # Measure of a single case, in the process started by measure_case_in_subprocess
+    if arguments.measure:
+        name, size = arguments.measure
+        print(json.dumps(measure_case(name, int(size), arguments.repeat)))
+        return 0
+
+    results = run_benchmarks(arguments.case, arguments.quick, arguments.repeat)
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)
+        regressions = compare_results(baseline, results, arguments.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
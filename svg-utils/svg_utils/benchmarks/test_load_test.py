@@ -0,0 +1,59 @@
+import threading
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Iterable
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import pytest
+from benchmarks.load_test import parse_configuration, run_load
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """WSGI server of the standard library handling each connection in a thread."""
+
+    daemon_threads = True
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    """WSGI request handler without logs."""
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+def app(environ: dict[str, Any], start_response: Callable) -> Iterable[bytes]:
+    """WSGI app reading the request body and responding with an empty SVG."""
+    environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0))
+    start_response("200 OK", [("Content-Type", "image/svg+xml")])
+    return [b"<svg/>"]
+
+
+class TestLoadTest:
+    """Test for the load test."""
+
+    def test_parse_configuration(self) -> None:
+        """Test parsing a server configuration."""
+        assert parse_configuration("gunicorn:4:2") == ("gunicorn", 4, 2)
+        with pytest.raises(ValueError):
+            parse_configuration("gunicorn:4")
+
+    def test_run_load(self) -> None:
+        """Test that the requests of concurrent clients are counted."""
+        server = make_server(
+            "127.0.0.1",
+            0,
+            app,
+            ThreadingWSGIServer,
+            QuietWSGIRequestHandler,
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            result = run_load(server.server_port, b"body", "/", 2, 0.2)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert result["requests"] > 0
+        assert result["errors"] == 0
+        assert result["requests_per_second"] > 0
+        assert 0 < result["median_latency_seconds"] <= result["p95_latency_seconds"]
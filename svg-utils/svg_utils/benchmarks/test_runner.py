@@ -0,0 +1,46 @@
+import pytest
+from benchmarks import CASES
+from benchmarks.runner import compare_results, measure_case
+
+
+class TestRunner:
+    """Test for the benchmark runner."""
+
+    @pytest.mark.parametrize("name", list(CASES))
+    def test_measure_case(self, name: str) -> None:
+        """Test that each case runs and is measured, with a small size."""
+        result = measure_case(name, 10, min_repeat=1)
+
+        assert result["case"] == name
+        assert result["size"] == 10
+        assert result["points"] >= 10
+        assert 1 <= result["repeat"]
+        assert 0 < result["min_seconds"] <= result["median_seconds"]
+        assert result["points_per_second"] > 0
+
+    def test_measure_unknown_case(self) -> None:
+        """Test measuring a case that does not exist."""
+        with pytest.raises(ValueError):
+            measure_case("unknown", 10)
+
+    def test_compare_results(self) -> None:
+        """Test that only the cases slower than the baseline by more than the threshold are reported."""
+        baseline = {
+            "results": [
+                {"case": "single_path", "size": 1000, "median_seconds": 1.0},
+                {"case": "single_path", "size": 10000, "median_seconds": 1.0},
+                {"case": "multiple_paths", "size": 10, "median_seconds": 1.0},
+            ]
+        }
+        current = {
+            "results": [
+                {"case": "single_path", "size": 1000, "median_seconds": 1.05},
+                {"case": "single_path", "size": 10000, "median_seconds": 1.5},
+                {"case": "path_builder", "size": 1000, "median_seconds": 9.0},
+            ]
+        }
+
+        regressions = compare_results(baseline, current, 0.1)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("single_path (10000): 1.50x slower")
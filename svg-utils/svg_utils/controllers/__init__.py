@@ -1,3 +1,5 @@
 from .path_to_svg_controller import PathToSVGController
+from .profiler_controller import ProfilerController
+from .request_metrics_plugin import RequestMetricsPlugin
 
-__all__ = ["PathToSVGController"]
+__all__ = ["PathToSVGController", "ProfilerController", "RequestMetricsPlugin"]
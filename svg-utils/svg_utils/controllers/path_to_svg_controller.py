@@ -1,22 +1,63 @@
+import hashlib
+import io
+import itertools
+import json
+import zipfile
+import zlib
+from typing import Any, Iterator
+
+import numpy as np
 from bottle import Bottle, request, response
 from models import (
+    BatchRequest,
+    BinaryPathRequest,
     MultiplePathsRequest,
     SinglePathRequest,
     generate_validation_error_message,
 )
 from pydantic import ValidationError
 from services import PathToSVGService
+from utils import RequestMetrics, ResultCache, record_point_count, time_stage
+
+from .request_metrics_plugin import RequestMetricsPlugin
 
 
 class PathToSVGController:
     """Controller class to handle requests for generating SVGs from paths."""
 
-    def __init__(self):
-        """Initialize a new PathToSVGController object."""
+    FORM_CONTENT_TYPE = "application/x-www-form-urlencoded"
+    BINARY_CONTENT_TYPE = "application/octet-stream"
+    SVG_CONTENT_TYPE = "image/svg+xml"
+    NDJSON_CONTENT_TYPE = "application/x-ndjson"
+    ZIP_CONTENT_TYPE = "application/zip"
+    # Part of the request keys, to change when the generated SVGs change so that cached results are not reused
+    REQUEST_KEY_VERSION = 1
+
+    def __init__(
+        self,
+        svg_service: PathToSVGService | None = None,
+        cache: ResultCache | None = None,
+        metrics: RequestMetrics | None = None,
+        server_timing: bool = False,
+    ):
+        """
+        Initialize a new PathToSVGController object.
+
+        Args:
+            svg_service (PathToSVGService | None): Service generating the SVGs. Defaults to None (a new single-process service).
+            cache (ResultCache | None): Cache of the results by request key. Defaults to None (no cache).
+            metrics (RequestMetrics | None): Metrics of the requests, exposed at /metrics. Defaults to None (no metrics).
+            server_timing (bool): Whether to send the durations of the stages of the requests in a Server-Timing header.
+                Defaults to False.
+        """
         self._app: Bottle = Bottle()
-        self._svg_service: PathToSVGService = PathToSVGService()
+        self._svg_service: PathToSVGService = svg_service or PathToSVGService()
+        self._cache: ResultCache | None = cache
+        self._metrics: RequestMetrics | None = metrics
 
         self._register_routes()
+        if metrics is not None or server_timing:
+            self._app.install(RequestMetricsPlugin(metrics, server_timing))
 
     @property
     def app(self) -> Bottle:
@@ -48,55 +89,138 @@ class PathToSVGController:
             "/generate-multiple-paths", callback=self.generate_multiple_paths
         )
 
+        # /generate-batch endpoint
+        self._app.route(
+            "/generate-batch",
+            method="OPTIONS",
+            callback=self._options_generate_batch,
+        )
+        self._app.post("/generate-batch", callback=self.generate_batch)
+
+        # /cache-statistics endpoint
+        if self._cache is not None:
+            self._app.get("/cache-statistics", callback=self.get_cache_statistics)
+
+        # /metrics endpoint
+        if self._metrics is not None:
+            self._app.get("/metrics", callback=self.get_metrics)
+
     def _options_generate_single_path(self) -> None:
         """Handle an OPTIONS request for the /generate-single-path endpoint."""
         response.status = 204
         response.headers["Access-Control-Allow-Methods"] = "OPTIONS, POST"
 
-    def generate_single_path(self) -> dict[str, str]:
+    def generate_single_path(self) -> dict[str, str] | Iterator[bytes]:
         """
         Handle a POST request to generate an SVG with a single path defined by a set of points.
 
-        Expects a form-urlencoded payload with the following fields:
+        Expects a form-urlencoded payload with the following fields, or the same fields in the binary format
+        of BinaryPathRequest (application/octet-stream):
             {
                 "points": [[x1, y1], [x2, y2], ...],
                 "size": [width, height],
                 "viewbox": [x, y, width, height] (optional),
                 "is_closed_path": bool (optional),
                 "stroke": "color" (optional, default "black"),
-                "stroke_width": int (optional, default 1)
+                "stroke_width": int (optional, default 1),
+                "precision": int (optional, number of decimals of the path coordinates),
+                "compact": bool (optional, compact path data syntax, default false),
+                "curve_tolerance": float (optional, maximum distance of the points from the cubic Bézier curves fitted to them),
+                "simplify_tolerance": float (optional, maximum distance of the points removed by the simplification)
             }
 
+        With the query parameter "format=svg" or an Accept header with "image/svg+xml",
+        the SVG itself is streamed as it is generated (see _stream_svg).
+        The responses have an ETag, and results are taken from the cache if any (see _get_cached_response).
+
         Returns:
-            dict[str, str]: A JSON response with the SVG string mapped to the key "svg".
+            dict[str, str] | Iterator[bytes]: A JSON response with the SVG string mapped to the key "svg"
+                (and the number of points removed by the simplification mapped to "removed_points"),
+                or the chunks of the SVG.
         """
         response.content_type = "application/json"
 
-        if request.content_type != "application/x-www-form-urlencoded":
+        if request.content_type not in (
+            self.FORM_CONTENT_TYPE,
+            self.BINARY_CONTENT_TYPE,
+        ):
             response.status = 415
             return {
                 "error": "Unsupported Media Type",
-                "message": "The content type must be 'application/x-www-form-urlencoded'.",
+                "message": f"The content type must be '{self.FORM_CONTENT_TYPE}' or '{self.BINARY_CONTENT_TYPE}'.",
             }
 
         try:
-            data = SinglePathRequest.model_validate(request.forms)
+            is_binary = request.content_type == self.BINARY_CONTENT_TYPE
+            with time_stage("parse"):
+                body = request.body.read() if is_binary else request.forms
+            with time_stage("validate"):
+                if is_binary:
+                    data = BinaryPathRequest.from_bytes(body)
+                    # Several paths would be drawn as a single one, joined end to end
+                    if data.path_lengths is not None:
+                        raise ValueError(
+                            "The path lengths are not accepted for a single path, "
+                            "send several paths to /generate-multiple-paths."
+                        )
+                else:
+                    data = SinglePathRequest.model_validate(body)
+            record_point_count(len(data.points))
+            with time_stage("cache"):
+                key = self._get_request_key([data.points], data, "single-path")
+                cached_response = self._get_cached_response(key)
+            if cached_response is not None:
+                return cached_response
+            with time_stage("prepare"):
+                (points,), statistics = self._prepare_paths([data.points], data)
         except ValidationError as e:
             response.status = 400
             return {
                 "error": "Invalid request data",
                 "message": generate_validation_error_message(e),
             }
+        except ValueError as e:
+            response.status = 400
+            return {
+                "error": "Invalid request data",
+                "message": str(e),
+            }
+        except Exception as e:
+            response.status = 500
+            return {
+                "error": "Internal Server Error",
+                "message": f"An error occurred while preparing the paths: {str(e)}",
+            }
 
-        try:
-            svg_string: str = self._svg_service.generate_line_path_svg(
-                data.points,
+        if self._accepts_svg_stream():
+            chunks = self._svg_service.stream_line_path_svg(
+                points,
                 data.size,
                 data.viewbox,
                 data.is_closed_path,
                 data.stroke,
                 data.stroke_width,
+                data.precision,
+                data.compact,
+                data.curve_tolerance,
             )
+            return self._stream_svg(
+                self._cache_svg_chunks(key, chunks, statistics), statistics, key
+            )
+
+        try:
+            with time_stage("generate"):
+                svg_string: str = self._svg_service.generate_line_path_svg(
+                    points,
+                    data.size,
+                    data.viewbox,
+                    data.is_closed_path,
+                    data.stroke,
+                    data.stroke_width,
+                    data.precision,
+                    data.compact,
+                    data.curve_tolerance,
+                )
         except Exception as e:
             response.status = 500
             return {
@@ -104,57 +228,506 @@ class PathToSVGController:
                 "message": f"An error occurred while generating the SVG: {str(e)}",
             }
 
-        return {"svg": svg_string}
+        return self._cache_result(key, {"svg": svg_string, **statistics})
 
     def _options_generate_multiple_paths(self) -> None:
         """Handle an OPTIONS request for the /generate-multiple-paths endpoint."""
         response.status = 204
         response.headers["Access-Control-Allow-Methods"] = "OPTIONS, POST"
 
-    def generate_multiple_paths(self) -> dict[str, str]:
+    def generate_multiple_paths(self) -> dict[str, str] | Iterator[bytes]:
         """
         Handle a POST request to generate an SVG with multiple paths defined by sets of points.
 
-        Expects a form-urlencoded payload with the following fields:
+        Expects a form-urlencoded payload with the following fields, or the same fields in the binary format
+        of BinaryPathRequest (application/octet-stream), with the points of all paths concatenated and
+        the number of points of each path in "path_lengths":
             {
                 "paths": [[[x1, y1], [x2, y2], ...], [[x1, y1], [x2, y2], ...], ...],
                 "size": [width, height],
                 "viewbox": [x, y, width, height] (optional),
                 "is_closed_path": bool (optional),
                 "stroke": "color" (optional, default "black"),
-                "stroke_width": int (optional, default 1)
+                "stroke_width": int (optional, default 1),
+                "precision": int (optional, number of decimals of the path coordinates),
+                "compact": bool (optional, compact path data syntax, default false),
+                "curve_tolerance": float (optional, maximum distance of the points from the cubic Bézier curves fitted to them),
+                "merge_tolerance": float (optional, maximum distance of the path ends joined together, for open paths),
+                "simplify_tolerance": float (optional, maximum distance of the points removed by the simplification),
+                "optimize_pen_travel": bool (optional, reorder and reverse the paths to reduce the pen-up travel, default false)
             }
 
+        With the query parameter "format=svg" or an Accept header with "image/svg+xml",
+        the SVG itself is streamed as it is generated (see _stream_svg).
+        The responses have an ETag, and results are taken from the cache if any (see _get_cached_response).
+
         Returns:
-            dict[str, str]: A JSON response with the SVG string mapped to the key "svg".
+            dict[str, str] | Iterator[bytes]: A JSON response with the SVG string mapped to the key "svg"
+                (and the number of paths removed by joining them mapped to "merged_paths",
+                the number of points removed by the simplification mapped to "removed_points",
+                the pen-up travel before and after reordering mapped to "pen_travel_before" and "pen_travel_after"),
+                or the chunks of the SVG.
         """
         response.content_type = "application/json"
 
-        if request.content_type != "application/x-www-form-urlencoded":
+        if request.content_type not in (
+            self.FORM_CONTENT_TYPE,
+            self.BINARY_CONTENT_TYPE,
+        ):
             response.status = 415
             return {
                 "error": "Unsupported Media Type",
-                "message": "The content type must be 'application/x-www-form-urlencoded'.",
+                "message": f"The content type must be '{self.FORM_CONTENT_TYPE}' or '{self.BINARY_CONTENT_TYPE}'.",
             }
 
         try:
-            data = MultiplePathsRequest.model_validate(request.forms)
+            is_binary = request.content_type == self.BINARY_CONTENT_TYPE
+            with time_stage("parse"):
+                body = request.body.read() if is_binary else request.forms
+            with time_stage("validate"):
+                if is_binary:
+                    data = BinaryPathRequest.from_bytes(body)
+                    paths = data.get_paths()
+                else:
+                    data = MultiplePathsRequest.model_validate(body)
+                    paths = data.paths
+            record_point_count(sum(len(path) for path in paths))
+            with time_stage("cache"):
+                key = self._get_request_key(paths, data, "multiple-paths")
+                cached_response = self._get_cached_response(key)
+            if cached_response is not None:
+                return cached_response
+            with time_stage("prepare"):
+                paths, statistics = self._prepare_paths(paths, data)
         except ValidationError as e:
             response.status = 400
             return {
                 "error": "Invalid request data",
                 "message": generate_validation_error_message(e),
             }
+        except ValueError as e:
+            response.status = 400
+            return {
+                "error": "Invalid request data",
+                "message": str(e),
+            }
+        except Exception as e:
+            response.status = 500
+            return {
+                "error": "Internal Server Error",
+                "message": f"An error occurred while preparing the paths: {str(e)}",
+            }
 
-        try:
-            svg_string: str = self._svg_service.generate_multiple_line_paths_svg(
-                data.paths,
+        if self._accepts_svg_stream():
+            chunks = self._svg_service.stream_multiple_line_paths_svg(
+                paths,
                 data.size,
                 data.viewbox,
                 data.is_closed_path,
                 data.stroke,
                 data.stroke_width,
+                data.precision,
+                data.compact,
+                data.curve_tolerance,
+            )
+            return self._stream_svg(
+                self._cache_svg_chunks(key, chunks, statistics), statistics, key
+            )
+
+        try:
+            with time_stage("generate"):
+                svg_string: str = self._svg_service.generate_multiple_line_paths_svg(
+                    paths,
+                    data.size,
+                    data.viewbox,
+                    data.is_closed_path,
+                    data.stroke,
+                    data.stroke_width,
+                    data.precision,
+                    data.compact,
+                    data.curve_tolerance,
+                )
+        except Exception as e:
+            response.status = 500
+            return {
+                "error": "Internal Server Error",
+                "message": f"An error occurred while generating the SVG: {str(e)}",
+            }
+
+        return self._cache_result(key, {"svg": svg_string, **statistics})
+
+    def _options_generate_batch(self) -> None:
+        """Handle an OPTIONS request for the /generate-batch endpoint."""
+        response.status = 204
+        response.headers["Access-Control-Allow-Methods"] = "OPTIONS, POST"
+
+    def generate_batch(self) -> dict[str, str] | Iterator[bytes]:
+        """
+        Handle a POST request to generate the SVGs of several drawings.
+
+        Expects a form-urlencoded payload with the following field:
+            {
+                "drawings": [{...}, {...}, ...]
+            }
+        where each drawing has the fields of /generate-single-path, or of /generate-multiple-paths if it has "paths".
+
+        The results are streamed as NDJSON, one line per drawing in the order of the drawings:
+            {"index": int, "svg": "<SVG_STRING>", ...statistics} or {"index": int, "error": "...", "message": "..."}
+        so an invalid drawing does not fail the others. With the query parameter "format=zip",
+        they are streamed as a zip archive (see _zip_results).
+
+        Returns:
+            dict[str, str] | Iterator[bytes]: The encoded results, or a JSON response if the batch itself is invalid.
+        """
+        response.content_type = "application/json"
+
+        if request.content_type != self.FORM_CONTENT_TYPE:
+            response.status = 415
+            return {
+                "error": "Unsupported Media Type",
+                "message": f"The content type must be '{self.FORM_CONTENT_TYPE}'.",
+            }
+
+        try:
+            with time_stage("parse"):
+                forms = request.forms
+            with time_stage("validate"):
+                data = BatchRequest.model_validate(forms)
+        except ValidationError as e:
+            response.status = 400
+            return {
+                "error": "Invalid request data",
+                "message": generate_validation_error_message(e),
+            }
+
+        results = self._generate_batch_results(data)
+        if request.query.get("format") == "zip":
+            response.content_type = self.ZIP_CONTENT_TYPE
+            return self._zip_results(results)
+
+        response.content_type = f"{self.NDJSON_CONTENT_TYPE}; charset=utf-8"
+        response.headers["Vary"] = "Accept-Encoding"
+        lines = (json.dumps(result) + "\n" for result in results)
+        if self._accepts_gzip():
+            response.headers["Content-Encoding"] = "gzip"
+            return self._gzip_chunks(lines)
+        return (line.encode("utf-8") for line in lines)
+
+    def _generate_batch_results(self, data: BatchRequest) -> Iterator[dict[str, Any]]:
+        """
+        Validate the drawings of a batch, then prepare their paths and generate their SVGs with the service,
+        in its worker processes if it has several.
+
+        Args:
+            data (BatchRequest): The batch request.
+
+        Returns:
+            Iterator[dict[str, Any]]: For each drawing, in order, its index with the SVG string and the statistics
+                of the processing stages, or with the error.
+        """
+        drawings: list[dict[str, Any]] = []
+        errors: dict[int, dict[str, str]] = {}
+        for index in range(len(data.drawings)):
+            try:
+                drawing = data.validate_drawing(index)
+            except ValidationError as e:
+                errors[index] = {
+                    "error": "Invalid request data",
+                    "message": generate_validation_error_message(e),
+                }
+                continue
+            drawings.append(
+                {
+                    "paths": (
+                        drawing.paths
+                        if isinstance(drawing, MultiplePathsRequest)
+                        else [drawing.points]
+                    ),
+                    **self._get_preparation_stages(drawing),
+                    "size": drawing.size,
+                    "viewbox": drawing.viewbox,
+                    "is_closed_path": drawing.is_closed_path,
+                    "stroke": drawing.stroke,
+                    "stroke_width": drawing.stroke_width,
+                    "precision": drawing.precision,
+                    "compact": drawing.compact,
+                    "curve_tolerance": drawing.curve_tolerance,
+                }
+            )
+
+        results = self._svg_service.generate_svgs(drawings)
+        for index in range(len(data.drawings)):
+            yield {"index": index, **(errors.get(index) or next(results))}
+
+    @staticmethod
+    def _zip_results(results: Iterator[dict[str, Any]]) -> Iterator[bytes]:
+        """
+        Stream the results of a batch as a zip archive, written as the SVGs are generated.
+
+        The archive holds the SVG of each drawing as "drawing-<index>.svg", and "results.json"
+        with the results without their SVG string (the file name, the statistics or the error).
+
+        Args:
+            results (Iterator[dict[str, Any]]): Results of the drawings.
+
+        Returns:
+            Iterator[bytes]: Chunks of the zip archive.
+        """
+        output = _ChunkOutput()
+        summaries = []
+        with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+            for result in results:
+                if "svg" in result:
+                    file_name = f"drawing-{result['index']}.svg"
+                    archive.writestr(file_name, result.pop("svg"))
+                    result = {"file": file_name, **result}
+                summaries.append(result)
+                yield output.pop()
+            archive.writestr("results.json", json.dumps(summaries))
+        yield output.pop()
+
+    def get_cache_statistics(self) -> dict[str, int]:
+        """
+        Handle a GET request for the counters of the result cache.
+
+        Returns:
+            dict[str, int]: A JSON response with the counters of the cache (see ResultCache.get_statistics).
+        """
+        return self._cache.get_statistics()
+
+    def get_metrics(self) -> str:
+        """
+        Handle a GET request for the metrics of the requests, in the Prometheus text format.
+
+        Returns:
+            str: The metrics (see RequestMetrics.render).
+        """
+        response.content_type = RequestMetrics.CONTENT_TYPE
+        return self._metrics.render()
+
+    def _get_request_key(
+        self,
+        paths: list[list[list[int]]] | list[np.ndarray],
+        data: SinglePathRequest | MultiplePathsRequest | BinaryPathRequest,
+        kind: str,
+    ) -> str:
+        """
+        Compute the key of a request, a hash of its fields and of its points, whatever the format of the request.
+
+        Args:
+            paths (list[list[list[int]]] | list[np.ndarray]): Paths of the request.
+            data (SinglePathRequest | MultiplePathsRequest | BinaryPathRequest): The request.
+            kind (str): Kind of the request (e.g. "single-path"), as the same fields give different SVGs for each kind.
+
+        Returns:
+            str: The hexadecimal key of the request.
+        """
+        fields = data.model_dump(exclude={"points", "paths", "dtype", "path_lengths"})
+        digest = hashlib.sha256(
+            json.dumps([self.REQUEST_KEY_VERSION, kind, fields], sort_keys=True).encode(
+                "utf-8"
             )
+        )
+        arrays = [np.asarray(path) for path in paths]
+        digest.update(
+            np.array([len(array) for array in arrays], dtype=np.int64).tobytes()
+        )
+        for array in arrays:
+            # Integer and float coordinates are written differently in the path data
+            digest.update(array.dtype.kind.encode("utf-8"))
+            digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def _get_etag(self, key: str) -> str:
+        """
+        Get the ETag of the response to a request, different for the JSON responses and the SVG streams.
+
+        Args:
+            key (str): Key of the request.
+
+        Returns:
+            str: The ETag, weak as the same SVG can be sent compressed or not.
+        """
+        representation = "svg" if self._accepts_svg_stream() else "json"
+        return f'W/"{key}-{representation}"'
+
+    def _send_etag(self, key: str) -> None:
+        """
+        Send the ETag of the response to a request, with the Vary header listing the request headers it depends on,
+        so that caches do not send a JSON response to a client accepting an SVG stream or the other way around.
+
+        Args:
+            key (str): Key of the request.
+        """
+        response.headers["ETag"] = self._get_etag(key)
+        response.headers["Vary"] = (
+            "Accept, Accept-Encoding" if self._accepts_svg_stream() else "Accept"
+        )
+
+    def _get_cached_response(
+        self, key: str
+    ) -> str | bytes | dict[str, str] | Iterator[bytes] | None:
+        """
+        Respond to a request without generating the SVG, if possible.
+
+        Responds with 304 Not Modified if the ETag of the response is in the If-None-Match header of the request,
+        as the same request always gets the same SVG, or with the cached result if any.
+
+        Args:
+            key (str): Key of the request.
+
+        Returns:
+            str | bytes | dict[str, str] | Iterator[bytes] | None: The response, or None if the SVG must be generated.
+        """
+        etag = self._get_etag(key)
+        if_none_match = request.get_header("If-None-Match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")):
+            response.status = 304
+            self._send_etag(key)
+            return ""
+
+        if self._cache is None:
+            return None
+        cached_result = self._cache.get(key)
+        if cached_result is None:
+            return None
+        if self._accepts_svg_stream():
+            result = json.loads(cached_result)
+            return self._stream_svg(iter([result.pop("svg")]), result, key)
+        self._send_etag(key)
+        # Already the JSON response
+        return cached_result
+
+    def _cache_result(
+        self, key: str, result: dict[str, str | int | float]
+    ) -> dict[str, str | int | float]:
+        """
+        Add the result of a request to the cache, if any, and send its ETag.
+
+        Args:
+            key (str): Key of the request.
+            result (dict[str, str | int | float]): The SVG string mapped to "svg", with the statistics.
+
+        Returns:
+            dict[str, str | int | float]: The result.
+        """
+        self._send_etag(key)
+        if self._cache is not None:
+            self._cache.put(key, json.dumps(result).encode("utf-8"))
+        return result
+
+    def _cache_svg_chunks(
+        self, key: str, chunks: Iterator[str], statistics: dict[str, int | float]
+    ) -> Iterator[str]:
+        """
+        Pass the chunks of a streamed SVG through, and add the SVG to the cache once it is complete,
+        unless it is larger than the memory of the cache and the cache has no on-disk tier.
+
+        Args:
+            key (str): Key of the request.
+            chunks (Iterator[str]): Chunks of the SVG.
+            statistics (dict[str, int | float]): Statistics of the processing stages.
+
+        Returns:
+            Iterator[str]: The chunks of the SVG.
+        """
+        if self._cache is None:
+            yield from chunks
+            return
+
+        kept_chunks: list[str] | None = []
+        kept_size = 0
+        for chunk in chunks:
+            yield chunk
+            if kept_chunks is not None:
+                kept_chunks.append(chunk)
+                kept_size += len(chunk)
+                if kept_size > self._cache.max_bytes and self._cache.directory is None:
+                    kept_chunks = None
+        if kept_chunks is not None:
+            result = {"svg": "".join(kept_chunks), **statistics}
+            self._cache.put(key, json.dumps(result).encode("utf-8"))
+
+    def _prepare_paths(
+        self,
+        paths: list[list[list[int]]] | list[np.ndarray],
+        data: SinglePathRequest | MultiplePathsRequest | BinaryPathRequest,
+    ) -> tuple[list[list[list[int]]] | list[np.ndarray], dict[str, int | float]]:
+        """
+        Apply the optional processing stages requested to the paths, before generating the SVG.
+
+        Args:
+            paths (list[list[list[int]]] | list[np.ndarray]): Paths of the request.
+            data (SinglePathRequest | MultiplePathsRequest | BinaryPathRequest): The request.
+
+        Raises:
+            ValueError: If a path is not a list of points.
+
+        Returns:
+            tuple[list[list[list[int]]] | list[np.ndarray], dict[str, int | float]]: The processed paths,
+                and the statistics of the stages to add to the response.
+        """
+        return self._svg_service.prepare_paths(
+            paths, data.is_closed_path, **self._get_preparation_stages(data)
+        )
+
+    @staticmethod
+    def _get_preparation_stages(
+        data: SinglePathRequest | MultiplePathsRequest | BinaryPathRequest,
+    ) -> dict[str, Any]:
+        """
+        Get the optional processing stages requested, as keyword arguments of PathToSVGService.prepare_paths.
+
+        Args:
+            data (SinglePathRequest | MultiplePathsRequest | BinaryPathRequest): The request.
+
+        Returns:
+            dict[str, Any]: The tolerances of the merging and of the simplification, and whether to order the paths.
+        """
+        # Single path requests have no paths to merge or reorder
+        return {
+            "merge_tolerance": getattr(data, "merge_tolerance", None),
+            "simplify_tolerance": data.simplify_tolerance,
+            "optimize_pen_travel": getattr(data, "optimize_pen_travel", False),
+        }
+
+    def _accepts_svg_stream(self) -> bool:
+        """
+        Check whether the client asked for the SVG itself rather than a JSON response.
+
+        Returns:
+            bool: True with the query parameter "format=svg" or an Accept header with "image/svg+xml".
+        """
+        is_svg_format = request.query.get("format") == "svg"
+        return is_svg_format or self.SVG_CONTENT_TYPE in request.get_header(
+            "Accept", ""
+        )
+
+    def _stream_svg(
+        self,
+        chunks: Iterator[str],
+        statistics: dict[str, int | float],
+        key: str | None = None,
+    ) -> dict[str, str] | Iterator[bytes]:
+        """
+        Stream the chunks of an SVG as they are generated, compressed with gzip if the client accepts it.
+
+        Without a Content-Length, HTTP/1.1 servers send the chunks with the chunked transfer encoding.
+        The first chunk is generated before the response starts, so most errors still get a JSON response,
+        but an error in a later chunk can only interrupt the response.
+
+        The statistics of the processing stages are sent as headers, e.g. "X-Removed-Points" for "removed_points".
+
+        Args:
+            chunks (Iterator[str]): Chunks of the SVG.
+            statistics (dict[str, int | float]): Statistics of the processing stages.
+            key (str | None): Key of the request, sent as an ETag. Defaults to None (no ETag).
+
+        Returns:
+            dict[str, str] | Iterator[bytes]: The encoded chunks of the SVG, or a JSON response if the generation failed.
+        """
+        try:
+            first_chunk = next(chunks)
         except Exception as e:
             response.status = 500
             return {
@@ -162,4 +735,100 @@ class PathToSVGController:
                 "message": f"An error occurred while generating the SVG: {str(e)}",
             }
 
-        return {"svg": svg_string}
+        response.content_type = f"{self.SVG_CONTENT_TYPE}; charset=utf-8"
+        response.headers["Vary"] = "Accept, Accept-Encoding"
+        if key is not None:
+            response.headers["ETag"] = self._get_etag(key)
+        for name, value in statistics.items():
+            response.headers["X-" + name.title().replace("_", "-")] = str(value)
+        chunks = itertools.chain([first_chunk], chunks)
+        if self._accepts_gzip():
+            response.headers["Content-Encoding"] = "gzip"
+            return self._gzip_chunks(chunks)
+        return (chunk.encode("utf-8") for chunk in chunks)
+
+    @staticmethod
+    def _accepts_gzip() -> bool:
+        """
+        Check whether the client accepts gzip, from the quality values of its Accept-Encoding header.
+
+        Returns:
+            bool: True if gzip, or "*" without an entry for gzip, has a quality value above 0.
+        """
+        qualities = {}
+        for entry in request.get_header("Accept-Encoding", "").split(","):
+            coding, *parameters = entry.split(";")
+            quality = 1.0
+            for parameter in parameters:
+                name, _, value = parameter.partition("=")
+                if name.strip().lower() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            qualities[coding.strip().lower()] = quality
+        return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0))) > 0
+
+    @staticmethod
+    def _gzip_chunks(chunks: Iterator[str]) -> Iterator[bytes]:
+        """
+        Compress chunks with gzip, each compressed chunk being decodable as soon as it is received.
+
+        Args:
+            chunks (Iterator[str]): Chunks to compress.
+
+        Returns:
+            Iterator[bytes]: Compressed chunks, forming a single gzip stream.
+        """
+        # 31 selects the gzip container with the largest window
+        compressor = zlib.compressobj(wbits=31)
+        for chunk in chunks:
+            yield compressor.compress(chunk.encode("utf-8")) + compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+        yield compressor.flush()
+
+
+class _ChunkOutput(io.RawIOBase):
+    """Unseekable binary output keeping what is written until it is popped.
+
+    Being unseekable, zipfile writes the archive sequentially, with the sizes after the data of each file.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a new _ChunkOutput object."""
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        """
+        Return whether the output is writable.
+
+        Returns:
+            bool: Always True.
+        """
+        return True
+
+    def write(self, data: bytes) -> int:
+        """
+        Keep written data.
+
+        Args:
+            data (bytes): The data.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        """
+        Return the data written since the previous call.
+
+        Returns:
+            bytes: The data.
+        """
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
@@ -0,0 +1,85 @@
+from typing import Any
+
+from bottle import Bottle, HTTPResponse, request, response, static_file
+from utils import RequestProfiler
+
+
+class ProfilerController:
+    """Controller class to list and download the profiles of the requests, and to profile the next requests."""
+
+    def __init__(self, profiler: RequestProfiler):
+        """
+        Initialize a new ProfilerController object.
+
+        Args:
+            profiler (RequestProfiler): Profiler of the requests.
+        """
+        self._app: Bottle = Bottle()
+        self._profiler: RequestProfiler = profiler
+
+        self._register_routes()
+
+    @property
+    def app(self) -> Bottle:
+        """
+        Returns the Bottle app for this controller.
+
+        Returns:
+            Bottle: The Bottle app.
+        """
+        return self._app
+
+    def _register_routes(self) -> None:
+        """Register routes for the controller."""
+        self._app.get("/", callback=self.list_profiles)
+        self._app.post("/", callback=self.arm_profiler)
+        self._app.get("/<name>", callback=self.get_profile)
+
+    def list_profiles(self) -> dict[str, Any]:
+        """
+        Handle a GET request for the list of the saved profiles.
+
+        Returns:
+            dict[str, Any]: A JSON response with the number of next requests that will be profiled
+                mapped to "remaining_requests", and the profiles (see RequestProfiler.list_profiles) to "profiles".
+        """
+        return {
+            "remaining_requests": self._profiler.get_remaining_count(),
+            "profiles": self._profiler.list_profiles(),
+        }
+
+    def arm_profiler(self) -> dict[str, Any]:
+        """
+        Handle a POST request to profile the next requests.
+
+        Expects the number of requests in the "count" query parameter or form field (default 1).
+
+        Returns:
+            dict[str, Any]: A JSON response with the number of next requests that will be profiled
+                mapped to "remaining_requests".
+        """
+        try:
+            count = int(request.params.get("count", "1"))
+            remaining_count = self._profiler.arm(count)
+        except ValueError as e:
+            response.status = 400
+            return {"error": "Invalid request data", "message": str(e)}
+
+        return {"remaining_requests": remaining_count}
+
+    def get_profile(self, name: str) -> HTTPResponse:
+        """
+        Handle a GET request to download a profile.
+
+        Args:
+            name (str): Name of the profile.
+
+        Returns:
+            HTTPResponse: The file, or a 404 error.
+        """
+        return static_file(
+            name,
+            root=self._profiler.directory,
+            mimetype="application/octet-stream",
+            download=True,
+        )
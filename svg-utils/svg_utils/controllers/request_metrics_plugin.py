@@ -0,0 +1,114 @@
+import functools
+import json
+from typing import Any, Callable, Iterable, Iterator
+
+from bottle import HTTPResponse, Route, request, response
+from utils import RequestMetrics, RequestTimer, activate_timer
+
+
+class RequestMetricsPlugin:
+    """Bottle plugin timing the requests of the routes it is installed on.
+
+    A timer is activated for each request, so that the stages timed by the controller and the services
+    with time_stage are recorded. The JSON responses are serialized by the plugin, as the "serialize" stage,
+    and the streamed responses are timed until their last chunk, as the "stream" stage.
+    The stages are sent in a Server-Timing header (for streamed responses, only those before the first chunk)
+    and the finished requests are recorded in the metrics, those failing with an error with the status 500.
+    """
+
+    name = "request_metrics"
+    api = 2
+
+    def __init__(
+        self, metrics: RequestMetrics | None = None, server_timing: bool = False
+    ) -> None:
+        """
+        Initializes a new RequestMetricsPlugin object.
+
+        Args:
+            metrics (RequestMetrics | None): Metrics the finished requests are recorded in. Defaults to None (not recorded).
+            server_timing (bool): Whether to send the durations of the stages in a Server-Timing header. Defaults to False.
+        """
+        self._metrics: RequestMetrics | None = metrics
+        self._server_timing: bool = server_timing
+
+    def apply(self, callback: Callable, route: Route) -> Callable:
+        """
+        Wraps the callback of a route to time its requests.
+
+        Args:
+            callback (Callable): Callback of the route.
+            route (Route): The route.
+
+        Returns:
+            Callable: The wrapped callback.
+        """
+
+        @functools.wraps(callback)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timer = RequestTimer()
+            timer.payload_bytes = max(request.content_length, 0)
+            try:
+                with activate_timer(timer):
+                    result = callback(*args, **kwargs)
+                    if isinstance(result, dict):
+                        with timer.stage("serialize"):
+                            result = json.dumps(result)
+                        response.content_type = "application/json"
+            except HTTPResponse as e:
+                self._finish(route.rule, e.status_code, timer)
+                raise
+            except BaseException:
+                # Bottle responds to the unexpected errors with a 500 error
+                self._finish(route.rule, 500, timer)
+                raise
+
+            if self._server_timing and timer.stage_durations:
+                response.headers["Server-Timing"] = timer.get_server_timing()
+            if isinstance(result, (str, bytes)) or not isinstance(result, Iterable):
+                self._finish(route.rule, response.status_code, timer)
+                return result
+            return self._time_stream(route.rule, response.status_code, result, timer)
+
+        return wrapper
+
+    def _time_stream(
+        self, route: str, status: int, chunks: Iterable, timer: RequestTimer
+    ) -> Iterator:
+        """
+        Times a streamed response, with the timer active while each chunk is generated.
+        The request is recorded once the stream is exhausted or closed (e.g. when the client disconnects).
+
+        Args:
+            route (str): Route of the request.
+            status (int): Status code of the response.
+            chunks (Iterable): Chunks of the response.
+            timer (RequestTimer): Timer of the request.
+
+        Returns:
+            Iterator: The chunks of the response.
+        """
+        iterator = iter(chunks)
+        try:
+            while True:
+                with activate_timer(timer), timer.stage("stream"):
+                    chunk = next(iterator, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+            self._finish(route, status, timer)
+
+    def _finish(self, route: str, status: int, timer: RequestTimer) -> None:
+        """
+        Records a finished request in the metrics, if any.
+
+        Args:
+            route (str): Route of the request.
+            status (int): Status code of the response.
+            timer (RequestTimer): Timer of the request.
+        """
+        if self._metrics is not None:
+            self._metrics.observe(route, status, timer)
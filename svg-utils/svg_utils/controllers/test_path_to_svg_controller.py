@@ -0,0 +1,310 @@
+import gzip
+import io
+import json
+import struct
+import zipfile
+from pathlib import Path
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+import numpy as np
+import pytest
+from bottle import Bottle
+from controllers import PathToSVGController
+from services import PathToSVGService
+from utils import ResultCache
+
+PATHS = [
+    [[0, 0], [10, 0], [20, 1], [30, 0]],
+    [[31, 0], [40, 10], [50, 20]],
+    [[100, 100], [110, 100]],
+]
+
+
+def encode_binary_request(points: list[list[int]], header: dict) -> bytes:
+    """Encode a request body in the binary format of BinaryPathRequest."""
+    encoded_header = json.dumps(header).encode()
+    return (
+        struct.pack("<I", len(encoded_header))
+        + encoded_header
+        + np.array(points, dtype="<i4").tobytes()
+    )
+
+
+def call(
+    app: Bottle,
+    path: str,
+    fields: dict[str, object] | bytes,
+    headers: dict[str, str] | None = None,
+) -> tuple[str, dict[str, str], bytes]:
+    """Send a form (or binary) POST request to a WSGI app, without a server, and get the response with lowercase header names."""
+    if isinstance(fields, bytes):
+        body, content_type = fields, PathToSVGController.BINARY_CONTENT_TYPE
+    else:
+        body = urlencode(
+            {name: json.dumps(value) for name, value in fields.items()}
+        ).encode()
+        content_type = PathToSVGController.FORM_CONTENT_TYPE
+    path, _, query = path.partition("?")
+    environ: dict = {}
+    setup_testing_defaults(environ)
+    environ.update(
+        {
+            "REQUEST_METHOD": "POST",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "CONTENT_TYPE": content_type,
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        }
+    )
+    for name, value in (headers or {}).items():
+        environ["HTTP_" + name.upper().replace("-", "_")] = value
+    statuses = []
+    response_body = b"".join(
+        app(
+            environ,
+            lambda status, headers, exc_info=None: statuses.append((status, headers)),
+        )
+    )
+    status, response_headers = statuses[0]
+    return (
+        status,
+        {name.lower(): value for name, value in response_headers},
+        response_body,
+    )
+
+
+class TestPathToSVGController:
+    """Test for the PathToSVGController class, through its WSGI app."""
+
+    def test_json_response(self) -> None:
+        """Test that the SVG is sent in a JSON response by default."""
+        app = PathToSVGController().app
+
+        status, headers, body = call(
+            app, "/generate-single-path", {"points": PATHS[0], "size": [200, 200]}
+        )
+
+        assert status == "200 OK"
+        assert headers["content-type"] == "application/json"
+        assert json.loads(body)["svg"].startswith("<svg")
+
+    @pytest.mark.parametrize(
+        "path, headers",
+        [
+            ("/generate-single-path?format=svg", {}),
+            ("/generate-single-path", {"Accept": "text/html, image/svg+xml;q=0.9"}),
+        ],
+    )
+    def test_svg_stream(self, path: str, headers: dict[str, str]) -> None:
+        """Test that the SVG itself is streamed with the format query parameter or the Accept header."""
+        app = PathToSVGController().app
+        fields = {"points": PATHS[0], "size": [200, 200]}
+        _, _, json_body = call(app, "/generate-single-path", fields)
+
+        status, response_headers, body = call(app, path, fields, headers)
+
+        assert status == "200 OK"
+        assert response_headers["content-type"] == "image/svg+xml; charset=utf-8"
+        assert "content-encoding" not in response_headers
+        assert body.decode("utf-8") == json.loads(json_body)["svg"]
+
+    @pytest.mark.parametrize(
+        "accept_encoding, is_gzip",
+        [
+            ("gzip", True),
+            ("deflate, GZIP;Q=0.5", True),
+            ("x-gzip", True),
+            ("*", True),
+            ("gzip;q=0", False),
+            ("gzip;q=0.0, *", False),
+            ("*;q=0", False),
+            ("gzip;q=invalid", False),
+            ("identity, deflate", False),
+        ],
+    )
+    def test_svg_stream_gzip(self, accept_encoding: str, is_gzip: bool) -> None:
+        """Test that the streamed SVG is compressed only if gzip has a quality value above 0."""
+        app = PathToSVGController().app
+        fields = {"points": PATHS[0], "size": [200, 200]}
+        _, _, json_body = call(app, "/generate-single-path", fields)
+
+        _, headers, body = call(
+            app,
+            "/generate-single-path?format=svg",
+            fields,
+            {"Accept-Encoding": accept_encoding},
+        )
+
+        assert (headers.get("content-encoding") == "gzip") == is_gzip
+        assert "Accept-Encoding" in headers["vary"]
+        svg = gzip.decompress(body) if is_gzip else body
+        assert svg.decode("utf-8") == json.loads(json_body)["svg"]
+
+    def test_svg_stream_statistics(self) -> None:
+        """Test that the statistics of the processing stages are sent as headers with a streamed SVG."""
+        app = PathToSVGController().app
+        fields = {
+            "paths": PATHS,
+            "size": [200, 200],
+            "merge_tolerance": 2,
+            "simplify_tolerance": 2,
+            "optimize_pen_travel": True,
+        }
+        _, _, json_body = call(app, "/generate-multiple-paths", fields)
+        result = json.loads(json_body)
+
+        _, headers, body = call(app, "/generate-multiple-paths?format=svg", fields)
+
+        assert body.decode("utf-8") == result["svg"]
+        assert headers["x-merged-paths"] == str(result["merged_paths"]) == "1"
+        assert headers["x-removed-points"] == str(result["removed_points"])
+        assert result["removed_points"] > 0
+        assert headers["x-pen-travel-before"] == str(result["pen_travel_before"])
+        assert headers["x-pen-travel-after"] == str(result["pen_travel_after"])
+
+    @pytest.mark.parametrize(
+        "path, representation, vary",
+        [
+            ("/generate-single-path", "json", "Accept"),
+            ("/generate-single-path?format=svg", "svg", "Accept, Accept-Encoding"),
+        ],
+    )
+    def test_etag(self, path: str, representation: str, vary: str) -> None:
+        """Test that a request with the ETag of its response gets 304 Not Modified, for JSON responses and streams."""
+        app = PathToSVGController().app
+        fields = {"points": PATHS[0], "size": [200, 200]}
+
+        _, headers, _ = call(app, path, fields)
+        etag = headers["etag"]
+        status, not_modified_headers, body = call(
+            app, path, fields, {"If-None-Match": f'W/"other", {etag}'}
+        )
+
+        assert etag.startswith('W/"') and etag.endswith(f'-{representation}"')
+        assert headers["vary"] == vary
+        assert status == "304 Not Modified"
+        assert body == b""
+        assert not_modified_headers["etag"] == etag
+        assert not_modified_headers["vary"] == vary
+
+    def test_etag_other_representation(self) -> None:
+        """Test that the ETag of a JSON response does not match the SVG stream of the same request."""
+        app = PathToSVGController().app
+        fields = {"points": PATHS[0], "size": [200, 200]}
+        _, headers, _ = call(app, "/generate-single-path", fields)
+
+        status, stream_headers, body = call(
+            app,
+            "/generate-single-path?format=svg",
+            fields,
+            {"If-None-Match": headers["etag"]},
+        )
+
+        assert status == "200 OK"
+        assert stream_headers["etag"] != headers["etag"]
+        assert body.startswith(b"<svg")
+
+    def test_cached_response(self) -> None:
+        """Test that a repeated request gets the cached result, as a JSON response or as a stream."""
+        cache = ResultCache(1_000_000)
+        app = PathToSVGController(cache=cache).app
+        fields = {"paths": PATHS, "size": [200, 200], "simplify_tolerance": 2}
+
+        _, headers, body = call(app, "/generate-multiple-paths", fields)
+        _, cached_headers, cached_body = call(app, "/generate-multiple-paths", fields)
+        _, stream_headers, stream_body = call(
+            app, "/generate-multiple-paths?format=svg", fields
+        )
+
+        result = json.loads(body)
+        assert cache.get_statistics()["misses"] == 1
+        assert cache.get_statistics()["hits"] == 2
+        assert json.loads(cached_body) == result
+        assert cached_headers["etag"] == headers["etag"]
+        assert stream_body.decode("utf-8") == result["svg"]
+        assert stream_headers["x-removed-points"] == str(result["removed_points"])
+        assert stream_headers["etag"].endswith('-svg"')
+
+    @pytest.mark.parametrize("max_bytes", [1_000_000, 0])
+    def test_cached_svg_stream(self, tmp_path: Path, max_bytes: int) -> None:
+        """Test that a streamed SVG is cached once complete, in memory or else on the disk only."""
+        cache = ResultCache(max_bytes, str(tmp_path))
+        app = PathToSVGController(cache=cache).app
+        fields = {"paths": PATHS, "size": [200, 200], "merge_tolerance": 2}
+
+        _, _, stream_body = call(app, "/generate-multiple-paths?format=svg", fields)
+        _, _, body = call(app, "/generate-multiple-paths", fields)
+
+        result = json.loads(body)
+        assert result["svg"] == stream_body.decode("utf-8")
+        assert result["merged_paths"] == 1
+        assert cache.get_statistics()["hits"] == 1
+        assert cache.get_statistics()["disk_hits"] == (0 if max_bytes else 1)
+        assert len(list(tmp_path.glob("*/*"))) == 1
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_generate_batch(self, max_workers: int) -> None:
+        """Test that the results of a batch are streamed as NDJSON in order, with the error of an invalid drawing."""
+        service = PathToSVGService(max_workers=max_workers)
+        app = PathToSVGController(service).app
+        drawings = [
+            {"points": PATHS[0], "size": [200, 200]},
+            {"points": PATHS[0]},
+            {"paths": PATHS, "size": [200, 200], "merge_tolerance": 2},
+        ]
+        try:
+            status, headers, body = call(app, "/generate-batch", {"drawings": drawings})
+        finally:
+            service.close()
+
+        results = [json.loads(line) for line in body.decode("utf-8").splitlines()]
+        assert status == "200 OK"
+        assert headers["content-type"] == "application/x-ndjson; charset=utf-8"
+        assert [result["index"] for result in results] == [0, 1, 2]
+        assert results[0]["svg"].startswith("<svg")
+        assert results[1]["error"] == "Invalid request data"
+        assert "svg" not in results[1]
+        assert results[2]["merged_paths"] == 1
+
+    def test_generate_batch_zip(self) -> None:
+        """Test that the results of a batch are streamed as a zip archive with the format query parameter."""
+        app = PathToSVGController().app
+        drawings = [
+            {"points": PATHS[0], "size": [200, 200]},
+            {"points": PATHS[0]},
+        ]
+
+        _, headers, body = call(
+            app, "/generate-batch?format=zip", {"drawings": drawings}
+        )
+
+        assert headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(body)) as archive:
+            assert archive.namelist() == ["drawing-0.svg", "results.json"]
+            summaries = json.loads(archive.read("results.json"))
+            assert archive.read("drawing-0.svg").startswith(b"<svg")
+        assert summaries[0] == {"file": "drawing-0.svg", "index": 0}
+        assert summaries[1]["error"] == "Invalid request data"
+
+    def test_binary_single_path_with_path_lengths(self) -> None:
+        """Test that a binary single path request with path lengths is rejected rather than drawn as one path."""
+        app = PathToSVGController().app
+        points = PATHS[0] + PATHS[1]
+
+        status, _, body = call(
+            app,
+            "/generate-single-path",
+            encode_binary_request(points, {"size": [200, 200], "path_lengths": [4, 3]}),
+        )
+        _, _, single_path_body = call(
+            app,
+            "/generate-single-path",
+            encode_binary_request(points, {"size": [200, 200]}),
+        )
+
+        assert status == "400 Bad Request"
+        assert json.loads(body)["error"] == "Invalid request data"
+        assert "/generate-multiple-paths" in json.loads(body)["message"]
+        assert json.loads(single_path_body)["svg"].startswith("<svg")
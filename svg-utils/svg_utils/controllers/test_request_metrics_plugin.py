@@ -0,0 +1,124 @@
+import io
+from typing import Iterator
+from wsgiref.util import setup_testing_defaults
+
+from bottle import Bottle, response
+from controllers import RequestMetricsPlugin
+from utils import RequestMetrics, record_point_count, time_stage
+
+
+def call(app: Bottle, path: str) -> tuple[str, dict[str, str], bytes]:
+    """Send a GET request to a WSGI app, without a server."""
+    environ: dict = {}
+    setup_testing_defaults(environ)
+    environ.update({"PATH_INFO": path, "wsgi.input": io.BytesIO()})
+    statuses = []
+    body = b"".join(
+        app(
+            environ,
+            lambda status, headers, exc_info=None: statuses.append((status, headers)),
+        )
+    )
+    return statuses[0][0], dict(statuses[0][1]), body
+
+
+class TestRequestMetricsPlugin:
+    """Test for the RequestMetricsPlugin class."""
+
+    def _create_app(self, metrics: RequestMetrics) -> Bottle:
+        """Create an app with a JSON route, a streamed route, an invalid request route and a failing route."""
+        app = Bottle()
+
+        @app.get("/json")
+        def get_json() -> dict[str, int]:
+            with time_stage("generate"):
+                record_point_count(12)
+            return {"value": 1}
+
+        @app.get("/stream")
+        def get_stream() -> Iterator[bytes]:
+            def chunks() -> Iterator[bytes]:
+                for _ in range(3):
+                    with time_stage("encode"):
+                        yield b"chunk"
+
+            with time_stage("parse"):
+                pass
+            return chunks()
+
+        @app.get("/invalid")
+        def get_invalid() -> dict[str, str]:
+            response.status = 400
+            return {"error": "Invalid request data"}
+
+        @app.get("/failing")
+        def get_failing() -> dict[str, str]:
+            with time_stage("generate"):
+                raise RuntimeError("generation failed")
+
+        app.install(RequestMetricsPlugin(metrics, server_timing=True))
+        return app
+
+    def test_json_response(self) -> None:
+        """Test that a JSON response is serialized and timed."""
+        metrics = RequestMetrics("test")
+        app = self._create_app(metrics)
+
+        status, headers, body = call(app, "/json")
+
+        assert status == "200 OK"
+        assert body == b'{"value": 1}'
+        assert headers["Content-Type"] == "application/json"
+        assert [
+            stage.split(";")[0] for stage in headers["Server-Timing"].split(", ")
+        ] == [
+            "generate",
+            "serialize",
+        ]
+        lines = metrics.render().splitlines()
+        assert 'test_requests_total{route="/json",status="200"} 1' in lines
+        assert 'test_request_points_sum{route="/json"} 12' in lines
+
+    def test_streamed_response(self) -> None:
+        """Test that a streamed response is timed until its last chunk, with its stages."""
+        metrics = RequestMetrics("test")
+        app = self._create_app(metrics)
+
+        status, headers, body = call(app, "/stream")
+
+        assert body == b"chunk" * 3
+        assert headers["Server-Timing"].startswith("parse;dur=")
+        lines = metrics.render().splitlines()
+        assert 'test_requests_total{route="/stream",status="200"} 1' in lines
+        for stage in ("parse", "encode", "stream"):
+            assert (
+                f'test_request_stage_duration_seconds_count{{route="/stream",stage="{stage}"}} 1'
+                in lines
+            )
+
+    def test_error_status(self) -> None:
+        """Test that the status of the response is recorded."""
+        metrics = RequestMetrics("test")
+        app = self._create_app(metrics)
+
+        status, _, _ = call(app, "/invalid")
+
+        assert status == "400 Bad Request"
+        assert 'test_requests_total{route="/invalid",status="400"} 1' in (
+            metrics.render().splitlines()
+        )
+
+    def test_unexpected_error(self) -> None:
+        """Test that a request failing with an unexpected error is recorded with the status 500."""
+        metrics = RequestMetrics("test")
+        app = self._create_app(metrics)
+
+        status, _, _ = call(app, "/failing")
+
+        assert status == "500 Internal Server Error"
+        lines = metrics.render().splitlines()
+        assert 'test_requests_total{route="/failing",status="500"} 1' in lines
+        assert (
+            'test_request_stage_duration_seconds_count{route="/failing",stage="generate"} 1'
+            in lines
+        )
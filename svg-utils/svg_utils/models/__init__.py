@@ -1,9 +1,13 @@
 from .single_path_request import SinglePathRequest
 from .multiple_path_request import MultiplePathsRequest
+from .binary_path_request import BinaryPathRequest
+from .batch_request import BatchRequest
 from .model_errors import generate_validation_error_message
 
 __all__ = [
     "SinglePathRequest",
     "MultiplePathsRequest",
+    "BinaryPathRequest",
+    "BatchRequest",
     "generate_validation_error_message",
 ]
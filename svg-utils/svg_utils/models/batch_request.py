@@ -0,0 +1,34 @@
+from typing import Any
+
+from pydantic import Field
+
+from .multiple_path_request import MultiplePathsRequest
+from .single_path_request import SinglePathRequest
+from .string_parsing_base_model import StringParsingBaseModel
+
+
+class BatchRequest(StringParsingBaseModel):
+    """Request model for a batch of drawings.
+
+    Each drawing is a JSON object with the fields of a single path request, or of a multiple paths request
+    if it has "paths". The drawings are validated one by one, so an invalid drawing does not fail the batch.
+    """
+
+    drawings: list[dict[str, Any]] = Field(min_length=1)
+
+    def validate_drawing(self, index: int) -> SinglePathRequest | MultiplePathsRequest:
+        """Validate a drawing of the batch.
+
+        Args:
+            index (int): Index of the drawing.
+
+        Raises:
+            ValidationError: If a field of the drawing is invalid.
+
+        Returns:
+            SinglePathRequest | MultiplePathsRequest: The validated drawing.
+        """
+        drawing = self.drawings[index]
+        if "paths" in drawing:
+            return MultiplePathsRequest.model_validate(drawing)
+        return SinglePathRequest.model_validate(drawing)
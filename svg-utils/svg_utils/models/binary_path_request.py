@@ -0,0 +1,149 @@
+import json
+import struct
+from typing import Literal
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, ValidationInfo, field_validator
+
+# Little-endian unsigned 32-bit length of the JSON header, at the start of the body
+_HEADER_LENGTH_FORMAT = "<I"
+
+
+class BinaryPathRequest(BaseModel):
+    """Request model for a path request sent in the binary format.
+
+    The body is made of:
+        - the length in bytes of the header, as a little-endian unsigned 32-bit integer,
+        - the header, a UTF-8 JSON object with the fields of the model (except "points"),
+        - the coordinates of all points (x1, y1, x2, y2, ...), as little-endian int32 or float32 numbers.
+
+    The coordinates are read as an array of shape (N, 2) without copy and without validating each number.
+    For several paths, the points of all paths are concatenated and "path_lengths" gives the number of points of each path.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    points: np.ndarray
+    size: list[int]
+    viewbox: list[int] | None = None
+    is_closed_path: bool = False
+    stroke: str = "black"
+    stroke_width: int = 1
+    precision: int | None = Field(default=None, ge=0, le=10)
+    compact: bool = False
+    curve_tolerance: float | None = Field(default=None, gt=0)
+    merge_tolerance: float | None = Field(default=None, ge=0)
+    simplify_tolerance: float | None = Field(default=None, ge=0)
+    optimize_pen_travel: bool = False
+    dtype: Literal["<i4", "<f4"] = "<i4"
+    path_lengths: list[int] | None = None
+
+    @field_validator("points")
+    @classmethod
+    def check_points(cls, value: np.ndarray) -> np.ndarray:
+        """Check that the points are finite, without looking at each number with Python.
+
+        Args:
+            value (np.ndarray): The points.
+
+        Raises:
+            ValueError: If a coordinate is not finite.
+
+        Returns:
+            np.ndarray: The points.
+        """
+        if np.issubdtype(value.dtype, np.floating) and not np.all(np.isfinite(value)):
+            raise ValueError("The points must have finite coordinates.")
+        return value
+
+    @field_validator("path_lengths")
+    @classmethod
+    def check_path_lengths(
+        cls, value: list[int] | None, info: ValidationInfo
+    ) -> list[int] | None:
+        """Check that the path lengths split all the points.
+
+        Args:
+            value (list[int] | None): The number of points of each path.
+            info (ValidationInfo): The validation information which includes the points.
+
+        Raises:
+            ValueError: If a length is negative or if the lengths do not add up to the number of points.
+
+        Returns:
+            list[int] | None: The number of points of each path.
+        """
+        if value is None or "points" not in info.data:
+            return value
+        if any(length < 0 for length in value):
+            raise ValueError("The path lengths must not be negative.")
+        point_count = info.data["points"].shape[0]
+        if sum(value) != point_count:
+            raise ValueError(
+                f"The path lengths add up to {sum(value)} points, but the body contains {point_count} points."
+            )
+        return value
+
+    @classmethod
+    def from_bytes(cls, body: bytes) -> "BinaryPathRequest":
+        """Parse a request body in the binary format.
+
+        Args:
+            body (bytes): The request body.
+
+        Raises:
+            ValueError: If the body is not framed correctly.
+            ValidationError: If a field of the header is invalid.
+
+        Returns:
+            BinaryPathRequest: The parsed request.
+        """
+        header_offset = struct.calcsize(_HEADER_LENGTH_FORMAT)
+        if len(body) < header_offset:
+            raise ValueError("The body is too short to contain the header length.")
+        (header_length,) = struct.unpack_from(_HEADER_LENGTH_FORMAT, body)
+        points_offset = header_offset + header_length
+        if len(body) < points_offset:
+            raise ValueError("The body is too short to contain the header.")
+
+        try:
+            header = json.loads(body[header_offset:points_offset].decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError("The header is not a valid UTF-8 JSON object.") from e
+        if not isinstance(header, dict):
+            raise ValueError("The header is not a valid UTF-8 JSON object.")
+        if "points" in header:
+            raise ValueError("The points must be sent after the header, not in it.")
+
+        dtype_name = header.get("dtype", "<i4")
+        if dtype_name not in ("<i4", "<f4"):
+            raise ValueError(f"The dtype must be '<i4' or '<f4', got '{dtype_name}'.")
+        dtype = np.dtype(dtype_name)
+        points_size = len(body) - points_offset
+        if points_size % (2 * dtype.itemsize) != 0:
+            raise ValueError(
+                f"The size of the points ({points_size} bytes) is not a multiple of the size of a point ({2 * dtype.itemsize} bytes)."
+            )
+        # A read-only view on the body, nothing is copied
+        points = np.frombuffer(memoryview(body)[points_offset:], dtype=dtype).reshape(
+            -1, 2
+        )
+
+        return cls.model_validate({**header, "points": points})
+
+    def get_paths(self) -> list[np.ndarray]:
+        """Split the points into paths, following the path lengths.
+
+        Raises:
+            ValueError: If the path lengths are missing.
+
+        Returns:
+            list[np.ndarray]: Points of each path, as views on the points.
+        """
+        if self.path_lengths is None:
+            raise ValueError(
+                "The path lengths are required to send several paths in the binary format."
+            )
+        if not self.path_lengths:
+            return []
+        return np.split(self.points, np.cumsum(self.path_lengths)[:-1])
@@ -1,3 +1,5 @@
+from pydantic import Field
+
 from .string_parsing_base_model import StringParsingBaseModel
 
 
@@ -10,3 +12,9 @@ class MultiplePathsRequest(StringParsingBaseModel):
     is_closed_path: bool = False
     stroke: str = "black"
     stroke_width: int = 1
+    precision: int | None = Field(default=None, ge=0, le=10)
+    compact: bool = False
+    curve_tolerance: float | None = Field(default=None, gt=0)
+    merge_tolerance: float | None = Field(default=None, ge=0)
+    simplify_tolerance: float | None = Field(default=None, ge=0)
+    optimize_pen_travel: bool = False
@@ -0,0 +1,147 @@
+from typing import Any
+
+import numpy as np
+
+# Class of each ASCII character: invalid, JSON whitespace, part of a number or structure
+_INVALID, _WHITESPACE, _NUMBER, _STRUCTURE = range(4)
+_CHARACTER_CLASSES = np.full(128, _INVALID, dtype=np.uint8)
+_CHARACTER_CLASSES[list(b" \t\n\r")] = _WHITESPACE
+_CHARACTER_CLASSES[list(b"-0123456789")] = _NUMBER
+_CHARACTER_CLASSES[list(b"[],")] = _STRUCTURE
+# Numbers with more digits could overflow an int64, they are left to the JSON parser
+_MAX_DIGITS = 18
+
+
+def parse_point_arrays_json(value: str, depth: int) -> np.ndarray | list | None:
+    """
+    Parse a JSON string of points (depth 2) or of lists of points (depth 3) with vectorized operations,
+    without creating a Python object for each number.
+
+    Only JSON strings made of integers, brackets and commas, with exactly two numbers per point, are parsed.
+    For other strings, None is returned and the string should be parsed by the JSON parser.
+
+    Args:
+        value (str): JSON string.
+        depth (int): List depth of the value (2 for points, 3 for lists of points).
+
+    Returns:
+        np.ndarray | list | None: An integer array of shape (N, 2) for depth 2, a list of such arrays
+            for depth 3, or None if the string cannot be parsed this way.
+    """
+    try:
+        buffer = np.frombuffer(value.encode("ascii"), dtype=np.uint8)
+    except UnicodeEncodeError:
+        return None
+    character_classes = _CHARACTER_CLASSES[buffer]
+    if np.any(character_classes == _INVALID):
+        return None
+    is_kept = character_classes != _WHITESPACE
+    buffer = buffer[is_kept]
+    is_number = character_classes[is_kept] == _NUMBER
+    is_minus = buffer == ord("-")
+
+    # Each number is a run of digits, optionally preceded by a minus sign, without leading zeros
+    is_run_start = is_number & ~np.concatenate(([False], is_number[:-1]))
+    is_run_end = is_number & ~np.concatenate((is_number[1:], [False]))
+    if np.any(is_minus & (~is_run_start | is_run_end)):
+        return None
+    run_starts = np.flatnonzero(is_run_start)
+    run_ends = np.flatnonzero(is_run_end)
+    digit_starts = run_starts + is_minus[run_starts]
+    if np.any(run_ends - digit_starts + 1 > _MAX_DIGITS) or np.any(
+        (buffer[digit_starts] == ord("0")) & (digit_starts < run_ends)
+    ):
+        return None
+
+    # The structure is checked by comparing it with the expected structure, each number replaced by "n"
+    structure = np.where(is_number, ord("n"), buffer)[~is_number | is_run_start]
+    if depth == 2:
+        path_lengths = None
+        expected_structure = _get_points_structure(len(run_starts) // 2)
+    else:
+        level = np.cumsum(
+            (structure == ord("[")).astype(np.int64) - (structure == ord("]"))
+        )
+        is_path_start = (structure == ord("[")) & (level == 2)
+        is_point_start = (structure == ord("[")) & (level == 3)
+        point_path_indices = np.cumsum(is_path_start)[is_point_start] - 1
+        if np.any(point_path_indices < 0):
+            return None
+        path_lengths = np.bincount(
+            point_path_indices, minlength=int(is_path_start.sum())
+        )
+        expected_structure = (
+            b"["
+            + b",".join(_get_points_structure(length) for length in path_lengths)
+            + b"]"
+        )
+    if structure.tobytes() != expected_structure:
+        return None
+
+    if run_starts.size == 0:
+        points = np.empty((0, 2), dtype=np.int64)
+    else:
+        numbers = buffer.copy()
+        numbers[~is_number] = ord(" ")
+        points = np.fromstring(numbers.tobytes(), dtype=np.int64, sep=" ").reshape(
+            -1, 2
+        )
+    if path_lengths is None:
+        return points
+    if path_lengths.size == 0:
+        return []
+    return np.split(points, np.cumsum(path_lengths)[:-1])
+
+
+def to_point_arrays(value: Any, depth: int) -> np.ndarray | list | None:
+    """
+    Convert parsed points (depth 2) or lists of points (depth 3) to arrays, if they are valid,
+    with a vectorized check of the shape and type of the arrays.
+
+    Args:
+        value (Any): Parsed value.
+        depth (int): List depth of the value (2 for points, 3 for lists of points).
+
+    Returns:
+        np.ndarray | list | None: An integer array of shape (N, 2) for depth 2, a list of such arrays
+            for depth 3, or None if the value cannot be checked this way.
+    """
+    if depth == 3:
+        if not isinstance(value, list):
+            return None
+        arrays = [to_point_arrays(points, 2) for points in value]
+        return None if any(array is None for array in arrays) else arrays
+
+    if isinstance(value, np.ndarray):
+        array = value
+    elif not isinstance(value, list):
+        return None
+    elif not value:
+        return np.empty((0, 2), dtype=np.int64)
+    else:
+        try:
+            array = np.array(value)
+        except (ValueError, OverflowError):
+            # Ragged nested lists
+            return None
+    # Other types (floats, strings, large integers as objects...) are left to pydantic
+    if (
+        array.ndim != 2
+        or array.shape[1] != 2
+        or not np.issubdtype(array.dtype, np.integer)
+    ):
+        return None
+    return array
+
+
+def _get_points_structure(point_count: int) -> bytes:
+    """
+    Get the JSON structure of a list of points, with each number replaced by "n".
+
+    Args:
+        point_count (int): Number of points.
+
+    Returns:
+        bytes: The structure, e.g. b"[[n,n],[n,n]]" for 2 points.
+    """
+    return b"[" + (b"[n,n]," * point_count)[:-1] + b"]"
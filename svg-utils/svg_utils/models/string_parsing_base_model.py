@@ -1,20 +1,60 @@
 import json
+from functools import cache
 from types import UnionType
 from typing import Any, Union, get_args, get_origin
 
-from pydantic import BaseModel, ValidationInfo, field_validator
+from pydantic import (
+    BaseModel,
+    ValidationInfo,
+    ValidatorFunctionWrapHandler,
+    field_validator,
+)
+
+from .point_arrays import parse_point_arrays_json, to_point_arrays
 
 
 class StringParsingBaseModel(BaseModel):
-    """Base model with automatic parsing of string inputs."""
+    """Base model with automatic parsing of string inputs.
+
+    The type checks needed to parse each field are done once per model class.
+    Fields of points (`list[list[int]]`) and of lists of points (`list[list[list[int]]]`) are checked
+    as NumPy arrays and stored as arrays of shape (N, 2), instead of being validated number by number.
+    """
+
+    # Defined before parse_string_field, so it receives the parsed value
+    @field_validator("*", mode="wrap")
+    @classmethod
+    def validate_point_arrays(
+        cls, value: Any, handler: ValidatorFunctionWrapHandler, info: ValidationInfo
+    ) -> Any:
+        """Validate a field of points with a vectorized check of the shape and type of its arrays.
+
+        Values that do not pass the vectorized check are validated by pydantic as usual,
+        so invalid values get the same errors.
+
+        Args:
+            value (Any): The parsed value.
+            handler (ValidatorFunctionWrapHandler): The pydantic validation of the field.
+            info (ValidationInfo): The validation information which includes the field name.
+
+        Returns:
+            Any: The validated value, with arrays of shape (N, 2) in place of the lists of points.
+        """
+        depth = cls._get_point_array_depths().get(info.field_name)
+        if depth is not None:
+            arrays = to_point_arrays(value, depth)
+            if arrays is not None:
+                return arrays
+        return handler(value)
 
     @field_validator("*", mode="before")
     @classmethod
-    def parse_string_field(cls, value: str, info: ValidationInfo) -> Any:
+    def parse_string_field(cls, value: Any, info: ValidationInfo) -> Any:
         """Parse a string field into the correct type.
+        Values that are not strings (e.g. from a JSON object) are already parsed and are returned as they are.
 
         Args:
-            value (str): The string value to be parsed.
+            value (Any): The string value to be parsed.
             info (ValidationInfo): The validation information which includes the field name.
 
         Raises:
@@ -23,12 +63,18 @@ class StringParsingBaseModel(BaseModel):
         Returns:
             Any: The parsed value.
         """
+        if not isinstance(value, str):
+            return value
 
-        field_type = cls.model_fields[info.field_name].annotation
-        is_string = cls._is_string_like(field_type)
-        if is_string:
+        if info.field_name in cls._get_string_like_fields():
             return cls._remove_quotes(value)
 
+        depth = cls._get_point_array_depths().get(info.field_name)
+        if depth is not None and isinstance(value, str):
+            arrays = parse_point_arrays_json(value, depth)
+            if arrays is not None:
+                return arrays
+
         try:
             return json.loads(value)
         except json.JSONDecodeError as e:
@@ -36,6 +82,41 @@ class StringParsingBaseModel(BaseModel):
                 f"Invalid JSON value: '{value}' is not a valid JSON format."
             ) from e
 
+    @classmethod
+    @cache
+    def _get_string_like_fields(cls) -> frozenset[str]:
+        """Get the names of the string-like fields of the model, computed once per model class.
+
+        Returns:
+            frozenset[str]: The names of the string-like fields.
+        """
+        return frozenset(
+            name
+            for name, field in cls.model_fields.items()
+            if cls._is_string_like(field.annotation)
+        )
+
+    @classmethod
+    @cache
+    def _get_point_array_depths(cls) -> dict[str, int]:
+        """Get the fields of points of the model with their list depth, computed once per model class.
+
+        A field of points is a `list[list[int]]` (depth 2) or a `list[list[list[int]]]` (depth 3).
+
+        Returns:
+            dict[str, int]: The depth of each field of points.
+        """
+        depths = {}
+        for name, field in cls.model_fields.items():
+            depth = 0
+            field_type = field.annotation
+            while get_origin(field_type) is list:
+                depth += 1
+                (field_type,) = get_args(field_type)
+            if field_type is int and depth in (2, 3):
+                depths[name] = depth
+        return depths
+
     @staticmethod
     def _is_string_like(field_type: Any) -> bool:
         """Check if the given field type is a string, a subtype of string, or a Union with a string type.
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+from pydantic import ValidationError
+from svg_utils.models import BatchRequest, MultiplePathsRequest, SinglePathRequest
+
+
+class TestBatchRequest:
+    """Test for the BatchRequest class."""
+
+    def test_validate_drawing(self) -> None:
+        """Test that each drawing is validated as a single path or a multiple paths request, on demand."""
+        drawings = [
+            {"points": [[1, 2], [3, 4]], "size": [10, 10], "stroke": "red"},
+            {"paths": [[[1, 2]], []], "size": [10, 10], "is_closed_path": True},
+            {"points": [[1, 2]], "size": "big"},
+        ]
+
+        request = BatchRequest.model_validate({"drawings": json.dumps(drawings)})
+
+        single_path_request = request.validate_drawing(0)
+        assert isinstance(single_path_request, SinglePathRequest)
+        assert single_path_request.points.tolist() == [[1, 2], [3, 4]]
+        assert single_path_request.stroke == "red"
+        multiple_paths_request = request.validate_drawing(1)
+        assert isinstance(multiple_paths_request, MultiplePathsRequest)
+        assert [path.tolist() for path in multiple_paths_request.paths] == [
+            [[1, 2]],
+            [],
+        ]
+        assert multiple_paths_request.is_closed_path
+        with pytest.raises(ValidationError):
+            request.validate_drawing(2)
+
+    @pytest.mark.parametrize("drawings", ["[]", "{}", "[1]", "not json"])
+    def test_invalid(self, drawings: str) -> None:
+        """Test that a drawings field that is not a non-empty JSON list of objects raises a ValidationError."""
+        with pytest.raises(ValidationError):
+            BatchRequest.model_validate({"drawings": drawings})
@@ -0,0 +1,93 @@
+import json
+import struct
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from svg_utils.models.binary_path_request import BinaryPathRequest
+
+
+def build_body(header: dict, points: list[list[float]], dtype: str = "<i4") -> bytes:
+    """Build a request body in the binary format."""
+    encoded_header = json.dumps(header).encode("utf-8")
+    return (
+        struct.pack("<I", len(encoded_header))
+        + encoded_header
+        + np.asarray(points, dtype=dtype).tobytes()
+    )
+
+
+class TestBinaryPathRequest:
+    """Test for the BinaryPathRequest class."""
+
+    def test_from_bytes(self) -> None:
+        """Test that a body in the binary format is parsed into the header fields and the points."""
+        body = build_body(
+            {"size": [400, 400], "stroke": "red", "is_closed_path": True},
+            [[300, 200], [231, 295], [-119, 259]],
+        )
+
+        request = BinaryPathRequest.from_bytes(body)
+
+        assert request.size == [400, 400]
+        assert request.stroke == "red"
+        assert request.is_closed_path
+        assert request.points.dtype == np.dtype("<i4")
+        assert request.points.tolist() == [[300, 200], [231, 295], [-119, 259]]
+
+    def test_from_bytes_float32(self) -> None:
+        """Test that the points are parsed with the dtype of the header."""
+        body = build_body({"size": [1, 1], "dtype": "<f4"}, [[0.5, 1.5]], "<f4")
+
+        request = BinaryPathRequest.from_bytes(body)
+
+        assert request.points.dtype == np.dtype("<f4")
+        assert request.points.tolist() == [[0.5, 1.5]]
+
+    def test_get_paths(self) -> None:
+        """Test that the points are split into paths by the path lengths, including empty paths."""
+        body = build_body(
+            {"size": [1, 1], "path_lengths": [1, 0, 2]}, [[1, 2], [3, 4], [5, 6]]
+        )
+
+        paths = BinaryPathRequest.from_bytes(body).get_paths()
+
+        assert [path.tolist() for path in paths] == [[[1, 2]], [], [[3, 4], [5, 6]]]
+
+    def test_get_paths_without_lengths(self) -> None:
+        """Test that splitting the points into paths without path lengths raises an error."""
+        request = BinaryPathRequest.from_bytes(build_body({"size": [1, 1]}, [[1, 2]]))
+
+        with pytest.raises(ValueError):
+            request.get_paths()
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            b"\x01",
+            struct.pack("<I", 100) + b"{}",
+            struct.pack("<I", 2) + b"[]",
+            build_body({"size": [1, 1], "dtype": "<f8"}, [[1, 2]], "<f8"),
+            build_body({"size": [1, 1]}, [[1, 2]])[:-1],
+        ],
+    )
+    def test_from_bytes_invalid_framing(self, body: bytes) -> None:
+        """Test that a truncated or malformed body raises a ValueError."""
+        with pytest.raises(ValueError):
+            BinaryPathRequest.from_bytes(body)
+
+    @pytest.mark.parametrize(
+        "header, points, dtype",
+        [
+            ({"size": "large"}, [[1, 2]], "<i4"),
+            ({"size": [1, 1], "path_lengths": [2]}, [[1, 2]], "<i4"),
+            ({"size": [1, 1], "path_lengths": [2, -1]}, [[1, 2]], "<i4"),
+            ({"size": [1, 1], "dtype": "<f4"}, [[np.nan, 2]], "<f4"),
+        ],
+    )
+    def test_from_bytes_invalid_header(
+        self, header: dict, points: list[list[float]], dtype: str
+    ) -> None:
+        """Test that an invalid header or invalid points raise a ValidationError."""
+        with pytest.raises(ValidationError):
+            BinaryPathRequest.from_bytes(build_body(header, points, dtype))
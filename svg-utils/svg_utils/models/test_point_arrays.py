@@ -0,0 +1,125 @@
+import json
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+from svg_utils.models import (
+    MultiplePathsRequest,
+    SinglePathRequest,
+    generate_validation_error_message,
+)
+from svg_utils.models.point_arrays import parse_point_arrays_json, to_point_arrays
+
+
+class TestPointArrays:
+    """Test for the vectorized parsing and validation of points."""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("[[1,2],[3,4]]", [[1, 2], [3, 4]]),
+            (" [ [ -1 , 20 ] ,\n[0, -0] ] ", [[-1, 20], [0, 0]]),
+            ("[]", []),
+        ],
+    )
+    def test_parse_points(self, value: str, expected: list[list[int]]) -> None:
+        """Test that the fast parser reads arrays of points, with any whitespace."""
+        points = parse_point_arrays_json(value, 2)
+
+        assert points.shape == (len(expected), 2)
+        assert points.tolist() == expected
+
+    def test_parse_paths(self) -> None:
+        """Test that the fast parser reads lists of paths, including empty paths."""
+        paths = parse_point_arrays_json("[[[1,2]],[],[[3,4],[5,6]]]", 3)
+
+        assert [path.tolist() for path in paths] == [[[1, 2]], [], [[3, 4], [5, 6]]]
+        assert parse_point_arrays_json("[]", 3) == []
+
+    @pytest.mark.parametrize(
+        "value, depth",
+        [
+            ("[[1,2.5]]", 2),
+            ('[[1,"2"]]', 2),
+            ("[[1,2,3]]", 2),
+            ("[[1,2],[3]]", 2),
+            ("[[1,2]", 2),
+            ("[[1,2]],", 2),
+            ("[[1--2,3]]", 2),
+            ("[[1-,3]]", 2),
+            ("[[01,3]]", 2),
+            ("[[99999999999999999999,3]]", 2),
+            ("[[[1,2]]]", 2),
+            ("[[1,2]]", 3),
+            ("[[[1,2]],[3,4]]", 3),
+            ("[[[1,2]]][[[3,4]]]", 3),
+            ("[[1,2]]é", 2),
+        ],
+    )
+    def test_parse_unsupported(self, value: str, depth: int) -> None:
+        """Test that the fast parser declines the values it does not support, left to pydantic."""
+        assert parse_point_arrays_json(value, depth) is None
+
+    @pytest.mark.parametrize(
+        "value, depth, is_converted",
+        [
+            ([[1, 2], [3, 4]], 2, True),
+            ([], 2, True),
+            ([[1, 2.5]], 2, False),
+            ([[1, 2, 3]], 2, False),
+            ([[1, 2], [3]], 2, False),
+            ([[[1, 2]], [[3, 4], [5, 6]]], 3, True),
+            ([[[1, 2]], [[3, "4"]]], 3, False),
+            ({"a": 1}, 2, False),
+        ],
+    )
+    def test_to_point_arrays(self, value: list, depth: int, is_converted: bool) -> None:
+        """Test that only lists of integer points of the expected depth are converted to arrays."""
+        assert (to_point_arrays(value, depth) is not None) == is_converted
+
+    def test_request_points(self) -> None:
+        """Test that the points of a request are validated into an array."""
+        points = np.random.randint(-1000, 1000, (1000, 2))
+
+        request = SinglePathRequest.model_validate(
+            {"points": json.dumps(points.tolist()), "size": "[100, 100]"}
+        )
+
+        assert isinstance(request.points, np.ndarray)
+        assert np.array_equal(request.points, points)
+
+    @pytest.mark.parametrize(
+        "points, expected_message",
+        [
+            (
+                "[[1,2.5]]",
+                "The parameter 'points:2.5' is invalid: Input should be a valid integer, got a number with a fractional part",
+            ),
+            (
+                "[1,2]",
+                "The parameter 'points:1' is invalid: Input should be a valid list\n"
+                " The parameter 'points:2' is invalid: Input should be a valid list",
+            ),
+            (
+                "[[1,null]]",
+                "The parameter 'points:None' is invalid: Input should be a valid integer",
+            ),
+        ],
+    )
+    def test_request_invalid_points(self, points: str, expected_message: str) -> None:
+        """Test that the invalid points of a request give the error messages of pydantic."""
+        with pytest.raises(ValidationError) as e:
+            SinglePathRequest.model_validate({"points": points, "size": "[1, 1]"})
+
+        assert generate_validation_error_message(e.value) == expected_message
+
+    def test_request_paths(self) -> None:
+        """Test that the paths of a request are validated into arrays."""
+        request = MultiplePathsRequest.model_validate(
+            {"paths": "[[[1, 2]], [[3, 4], [5, 6]]]", "size": "[1, 1]"}
+        )
+
+        assert [path.tolist() for path in request.paths] == [
+            [[1, 2]],
+            [[3, 4], [5, 6]],
+        ]
@@ -1,112 +1,714 @@
-from utils import PathBuilder, SVGBuilder
+import io
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Iterator
+
+import numpy as np
+from utils import (
+    CurveFitter,
+    PathBuilder,
+    PathMerger,
+    PathOrderer,
+    PathSimplifier,
+    StreamingSVGBuilder,
+    record_stage_duration,
+    time_stage,
+)
 
 
 class PathToSVGService:
-    """Service class to generate SVG strings from paths defined by points."""
+    """Service class to generate SVG strings from paths defined by points.
+
+    The builders are created for each call and never shared, so a single instance can be used
+    by several threads at once (e.g. under a multi-threaded WSGI server).
+    With several workers, the path data of large multi-path drawings is built in a pool of processes.
+    """
+
+    # Number of chunks of paths submitted to each worker process, to balance the load
+    CHUNKS_PER_WORKER = 4
+    # Minimum number of characters of the chunks yielded when streaming an SVG
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        parallel_min_points: int = 100_000,
+    ) -> None:
+        """
+        Initialize a new SVGService object.
 
-    def __init__(self) -> None:
-        """Initialize a new SVGService object."""
-        self._path_builder: PathBuilder = PathBuilder()
-        self._svg_builder: SVGBuilder = SVGBuilder()
+        Args:
+            max_workers (int): Number of worker processes building the path data of multi-path drawings.
+                With 1, everything runs in the calling thread. Defaults to 1.
+            parallel_min_points (int): Minimum total number of points of a multi-path drawing to use the worker
+                processes. Smaller drawings are built in the calling thread, where they cost less than the
+                inter-process communication. Defaults to 100000.
+        """
+        self._max_workers: int = max_workers
+        self._parallel_min_points: int = parallel_min_points
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock: threading.Lock = threading.Lock()
 
     def generate_line_path_svg(
         self,
-        points: list[tuple[int, int]],
+        points: list[tuple[int, int]] | np.ndarray,
         size: tuple[int, int],
         viewbox: tuple[int, int, int, int] | None = None,
         is_closed_path: bool = False,
         stroke: str = "black",
         stroke_width: int = 1,
+        precision: int | None = None,
+        compact: bool = False,
+        curve_tolerance: float | None = None,
     ) -> str:
         """
         Generate SVG string with a single path defined by the given points using line segments to connect them.
 
         Args:
-            points (list[tuple[int, int]]): list of points to define the path.
+            points (list[tuple[int, int]] | np.ndarray): list of points to define the path, or array of shape (N, 2).
             size (tuple[int, int]): Size of the SVG image (width, height).
             viewbox (tuple[int, int, int, int] | None): Defines the viewbox for the SVG in the form of a tuple (x, y, width, height). Defaults to None.
             is_closed_path (bool): Whether the path should be closed. Defaults to False.
             stroke (str): Stroke color. Defaults to "black".
             stroke_width (int): Stroke width. Defaults to 1.
+            precision (int | None): Number of decimals of the path coordinates. Defaults to None (coordinates written as given).
+            compact (bool): Whether to use the compact path data syntax. Defaults to False.
+            curve_tolerance (float | None): Maximum distance between the points and the cubic Bézier curves fitted to them.
+                Defaults to None (points connected with line segments).
 
         Returns:
             str: SVG as a string
         """
-        self._initialize_svg(size, viewbox)
-        self._add_path_to_svg(points, is_closed_path, stroke, stroke_width)
-        return self._svg_builder.get_svg_string()
+        return "".join(
+            self.stream_line_path_svg(
+                points,
+                size,
+                viewbox,
+                is_closed_path,
+                stroke,
+                stroke_width,
+                precision,
+                compact,
+                curve_tolerance,
+            )
+        )
 
     def generate_multiple_line_paths_svg(
         self,
-        paths: list[list[tuple[int, int]]],
+        paths: list[list[tuple[int, int]]] | list[np.ndarray],
         size: tuple[int, int],
         viewbox: tuple[int, int, int, int] | None = None,
         is_closed_path: bool = False,
         stroke: str = "black",
         stroke_width: int = 1,
+        precision: int | None = None,
+        compact: bool = False,
+        curve_tolerance: float | None = None,
     ) -> str:
         """
         Generate SVG string with multiple paths defined by the given list of paths using line segments to connect the points.
 
         Args:
-            paths (list[list[tuple[int, int]]): list of paths, where each path is a list of points.
+            paths (list[list[tuple[int, int]]] | list[np.ndarray]): list of paths, where each path is a list of points or an array of shape (N, 2).
             size (tuple[int, int]): Size of the SVG image (width, height).
             viewbox (tuple[int, int, int, int] | None): Defines the viewbox for the SVG in the form of a tuple (x, y, width, height). Defaults to None.
             is_closed_path (bool): Whether the paths should be closed. Defaults to False.
             stroke (str): Stroke color. Defaults to "black".
             stroke_width (int): Stroke width. Defaults to 1.
+            precision (int | None): Number of decimals of the path coordinates. Defaults to None (coordinates written as given).
+            compact (bool): Whether to use the compact path data syntax. Defaults to False.
+            curve_tolerance (float | None): Maximum distance between the points and the cubic Bézier curves fitted to them.
+                Defaults to None (points connected with line segments).
 
         Returns:
             str: SVG as a string
         """
-        self._initialize_svg(size, viewbox)
-        for path in paths:
-            self._add_path_to_svg(path, is_closed_path, stroke, stroke_width)
-        return self._svg_builder.get_svg_string()
+        return "".join(
+            self.stream_multiple_line_paths_svg(
+                paths,
+                size,
+                viewbox,
+                is_closed_path,
+                stroke,
+                stroke_width,
+                precision,
+                compact,
+                curve_tolerance,
+            )
+        )
 
-    def _initialize_svg(
+    def stream_line_path_svg(
         self,
+        points: list[tuple[int, int]] | np.ndarray,
         size: tuple[int, int],
         viewbox: tuple[int, int, int, int] | None = None,
-    ) -> None:
+        is_closed_path: bool = False,
+        stroke: str = "black",
+        stroke_width: int = 1,
+        precision: int | None = None,
+        compact: bool = False,
+        curve_tolerance: float | None = None,
+    ) -> Iterator[str]:
+        """
+        Generate the SVG of generate_line_path_svg in chunks, as it is written.
+
+        Args:
+            points (list[tuple[int, int]] | np.ndarray): list of points to define the path, or array of shape (N, 2).
+            size (tuple[int, int]): Size of the SVG image (width, height).
+            viewbox (tuple[int, int, int, int] | None): Defines the viewbox for the SVG in the form of a tuple (x, y, width, height). Defaults to None.
+            is_closed_path (bool): Whether the path should be closed. Defaults to False.
+            stroke (str): Stroke color. Defaults to "black".
+            stroke_width (int): Stroke width. Defaults to 1.
+            precision (int | None): Number of decimals of the path coordinates. Defaults to None (coordinates written as given).
+            compact (bool): Whether to use the compact path data syntax. Defaults to False.
+            curve_tolerance (float | None): Maximum distance between the points and the cubic Bézier curves fitted to them.
+                Defaults to None (points connected with line segments).
+
+        Returns:
+            Iterator[str]: Chunks of the SVG string.
+        """
+        buffer = io.StringIO()
+        svg_builder = self._create_svg_builder(size, viewbox, buffer)
+        self._add_path_to_svg(
+            svg_builder,
+            points,
+            is_closed_path,
+            stroke,
+            stroke_width,
+            precision,
+            compact,
+            curve_tolerance,
+        )
+        svg_builder.close()
+        yield self._pop_buffer(buffer)
+
+    def stream_multiple_line_paths_svg(
+        self,
+        paths: list[list[tuple[int, int]]] | list[np.ndarray],
+        size: tuple[int, int],
+        viewbox: tuple[int, int, int, int] | None = None,
+        is_closed_path: bool = False,
+        stroke: str = "black",
+        stroke_width: int = 1,
+        precision: int | None = None,
+        compact: bool = False,
+        curve_tolerance: float | None = None,
+    ) -> Iterator[str]:
+        """
+        Generate the SVG of generate_multiple_line_paths_svg in chunks, as the paths are written.
+
+        A chunk is yielded as soon as the paths written since the previous chunk reach STREAM_CHUNK_SIZE characters,
+        so the whole SVG is never held in memory.
+
+        Args:
+            paths (list[list[tuple[int, int]]] | list[np.ndarray]): list of paths, where each path is a list of points or an array of shape (N, 2).
+            size (tuple[int, int]): Size of the SVG image (width, height).
+            viewbox (tuple[int, int, int, int] | None): Defines the viewbox for the SVG in the form of a tuple (x, y, width, height). Defaults to None.
+            is_closed_path (bool): Whether the paths should be closed. Defaults to False.
+            stroke (str): Stroke color. Defaults to "black".
+            stroke_width (int): Stroke width. Defaults to 1.
+            precision (int | None): Number of decimals of the path coordinates. Defaults to None (coordinates written as given).
+            compact (bool): Whether to use the compact path data syntax. Defaults to False.
+            curve_tolerance (float | None): Maximum distance between the points and the cubic Bézier curves fitted to them.
+                Defaults to None (points connected with line segments).
+
+        Returns:
+            Iterator[str]: Chunks of the SVG string.
+        """
+        buffer = io.StringIO()
+        svg_builder = self._create_svg_builder(size, viewbox, buffer)
+        for path_data in self._build_paths_data(
+            paths, is_closed_path, precision, compact, curve_tolerance
+        ):
+            svg_builder.add_path(
+                path_data, fill="none", stroke=stroke, stroke_width=stroke_width
+            )
+            if buffer.tell() >= self.STREAM_CHUNK_SIZE:
+                yield self._pop_buffer(buffer)
+        svg_builder.close()
+        yield self._pop_buffer(buffer)
+
+    def generate_svgs(self, drawings: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """
+        Prepare the paths of several drawings and generate their SVGs, in the worker processes if there are
+        several workers.
+
+        Args:
+            drawings (list[dict[str, Any]]): Keyword arguments of generate_multiple_line_paths_svg for each drawing,
+                with the optional processing stages of prepare_paths ("merge_tolerance", "simplify_tolerance"
+                and "optimize_pen_travel").
+
+        Returns:
+            Iterator[dict[str, Any]]: For each drawing, in order, the SVG string as "svg" with the statistics
+                of the processing stages, or the "error" and its "message".
+        """
+        if self._max_workers <= 1 or len(drawings) < 2:
+            for drawing in drawings:
+                yield self._generate_drawing_svg(drawing)
+            return
+
+        # Several drawings per task, so that small drawings do not cost more to send than to generate
+        chunk_size = max(
+            1, len(drawings) // (self._max_workers * self.CHUNKS_PER_WORKER)
+        )
+        executor = self._get_executor()
+        result_count = 0
+        try:
+            for result in executor.map(
+                self._generate_drawing_svg, drawings, chunksize=chunk_size
+            ):
+                yield result
+                result_count += 1
+        except Exception as e:
+            # A worker process failed (e.g. it was killed), the drawings left get an error instead of no result
+            if isinstance(e, BrokenProcessPool):
+                self._discard_executor(executor)
+            for _ in range(result_count, len(drawings)):
+                yield {
+                    "error": "Internal Server Error",
+                    "message": f"An error occurred while generating the SVG: {str(e)}",
+                }
+
+    @staticmethod
+    def prepare_paths(
+        paths: list[list[tuple[int, int]]] | list[np.ndarray],
+        is_closed_path: bool = False,
+        merge_tolerance: float | None = None,
+        simplify_tolerance: float | None = None,
+        optimize_pen_travel: bool = False,
+    ) -> tuple[list[list[tuple[int, int]]] | list[np.ndarray], dict[str, int | float]]:
+        """
+        Apply the optional processing stages to paths before generating their SVG: merging, simplifying and ordering.
+
+        Args:
+            paths (list[list[tuple[int, int]]] | list[np.ndarray]): list of paths, where each path is a list of points or an array of shape (N, 2).
+            is_closed_path (bool): Whether the paths are closed. Defaults to False.
+            merge_tolerance (float | None): Tolerance of merge_paths. Defaults to None (no merging).
+            simplify_tolerance (float | None): Tolerance of simplify_paths. Defaults to None (no simplification).
+            optimize_pen_travel (bool): Whether to reorder the paths with order_paths. Defaults to False.
+
+        Raises:
+            ValueError: If a path is not a list of points.
+
+        Returns:
+            tuple[list[list[tuple[int, int]]] | list[np.ndarray], dict[str, int | float]]: The processed paths,
+                and the statistics of the stages.
+        """
+        statistics: dict[str, int | float] = {}
+        # Each closed path has its own closing segment, which joining the paths would lose
+        if merge_tolerance is not None and not is_closed_path and len(paths) > 1:
+            paths, statistics["merged_paths"] = PathToSVGService.merge_paths(
+                paths, merge_tolerance
+            )
+        if simplify_tolerance is not None:
+            paths, statistics["removed_points"] = PathToSVGService.simplify_paths(
+                paths, simplify_tolerance
+            )
+        if optimize_pen_travel and len(paths) > 1:
+            paths, travel_before, travel_after = PathToSVGService.order_paths(
+                paths, is_closed_path
+            )
+            statistics["pen_travel_before"] = round(travel_before, 3)
+            statistics["pen_travel_after"] = round(travel_after, 3)
+        return paths, statistics
+
+    @staticmethod
+    def merge_paths(
+        paths: list[list[tuple[int, int]]] | list[np.ndarray],
+        tolerance: float = 0,
+    ) -> tuple[list[np.ndarray], int]:
+        """
+        Join the paths whose ends meet into continuous paths, reversing some of them where needed.
+
+        Args:
+            paths (list[list[tuple[int, int]]] | list[np.ndarray]): list of paths, where each path is a list of points or an array of shape (N, 2).
+            tolerance (float): Maximum distance, in SVG user units, between two path ends that are joined. Defaults to 0.
+
+        Raises:
+            ValueError: If a path is not a list of points.
+
+        Returns:
+            tuple[list[np.ndarray], int]: The joined paths and the number of paths removed by joining them.
+        """
+        merged_paths = PathMerger(tolerance).merge_paths(paths)
+        return merged_paths, len(paths) - len(merged_paths)
+
+    @staticmethod
+    def simplify_paths(
+        paths: list[list[tuple[int, int]]] | list[np.ndarray],
+        tolerance: float,
+    ) -> tuple[list[np.ndarray], int]:
+        """
+        Remove the points that are not needed to draw the paths within a tolerance (Ramer–Douglas–Peucker algorithm).
+
+        Args:
+            paths (list[list[tuple[int, int]]] | list[np.ndarray]): list of paths, where each path is a list of points or an array of shape (N, 2).
+            tolerance (float): Maximum distance, in SVG user units, between a removed point and the simplified path.
+
+        Raises:
+            ValueError: If a path is not a list of points.
+
+        Returns:
+            tuple[list[np.ndarray], int]: The simplified paths and the number of removed points.
+        """
+        simplified_paths = PathSimplifier(tolerance).simplify_paths(paths)
+        removed_point_count = sum(len(path) for path in paths) - sum(
+            len(path) for path in simplified_paths
+        )
+        return simplified_paths, removed_point_count
+
+    @staticmethod
+    def order_paths(
+        paths: list[list[tuple[int, int]]] | list[np.ndarray],
+        is_closed_path: bool = False,
+    ) -> tuple[list[np.ndarray], float, float]:
+        """
+        Reorder the paths and reverse some of them to reduce the pen-up travel between them, starting from (0, 0).
+
+        The order is built greedily from the nearest path endpoint, then improved with 2-opt moves.
+
+        Args:
+            paths (list[list[tuple[int, int]]] | list[np.ndarray]): list of paths, where each path is a list of points or an array of shape (N, 2).
+            is_closed_path (bool): Whether the paths are closed, so that the pen ends each of them at its first point. Defaults to False.
+
+        Returns:
+            tuple[list[np.ndarray], float, float]: The reordered paths, and the pen-up travel in SVG user units
+                before and after reordering.
+        """
+        paths = [np.asarray(path).reshape(-1, 2) for path in paths]
+        path_orderer = PathOrderer()
+        ordered_paths = path_orderer.order_paths(paths, is_closed_path)
+        return (
+            ordered_paths,
+            path_orderer.get_travel(paths, is_closed_path),
+            path_orderer.get_travel(ordered_paths, is_closed_path),
+        )
+
+    def close(self) -> None:
+        """Shut down the worker processes, if they have been started."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+    @staticmethod
+    def _create_svg_builder(
+        size: tuple[int, int],
+        viewbox: tuple[int, int, int, int] | None = None,
+        output: io.StringIO | None = None,
+    ) -> StreamingSVGBuilder:
         """
-        Initialize the SVG with the given size and viewbox.
+        Create a new SVG builder with the given size and viewbox.
 
         Args:
             size (tuple[int, int]): Size of the SVG image (width, height).
             viewbox (tuple[int, int, int, int] | None): Defines the viewbox for the SVG in the form of a tuple (x, y, width, height). Defaults to None.
+            output (io.StringIO | None): Buffer the SVG is written to. Defaults to None (buffer of the builder).
+
+        Returns:
+            StreamingSVGBuilder: The SVG builder.
         """
-        self._svg_builder.clear()
-        self._svg_builder.set_size(size)
+        svg_builder = StreamingSVGBuilder(output, size=size)
         if viewbox:
-            self._svg_builder.set_viewbox(viewbox)
+            svg_builder.set_viewbox(viewbox)
+        return svg_builder
+
+    @staticmethod
+    def _pop_buffer(buffer: io.StringIO) -> str:
+        """
+        Return the content of a buffer and empty it.
+
+        Args:
+            buffer (io.StringIO): The buffer.
+
+        Returns:
+            str: The content of the buffer.
+        """
+        content = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return content
 
     def _add_path_to_svg(
         self,
-        points: list[tuple[int, int]],
+        svg_builder: StreamingSVGBuilder,
+        points: list[tuple[int, int]] | np.ndarray,
         is_closed_path: bool,
         stroke: str,
         stroke_width: int,
+        precision: int | None = None,
+        compact: bool = False,
+        curve_tolerance: float | None = None,
     ) -> None:
         """
-        Add a path to the active SVG.
+        Add a path to the given SVG.
 
         Args:
-            points (list[tuple[int, int]]): list of points to define the path.
+            svg_builder (StreamingSVGBuilder): SVG builder of the SVG being generated.
+            points (list[tuple[int, int]] | np.ndarray): list of points to define the path, or array of shape (N, 2).
             is_closed_path (bool): Whether the path should be closed.
             stroke (str): Stroke color.
             stroke_width (int): Stroke width.
+            precision (int | None): Number of decimals of the path coordinates. Defaults to None.
+            compact (bool): Whether to use the compact path data syntax. Defaults to False.
+            curve_tolerance (float | None): Maximum distance between the points and the cubic Bézier curves fitted to them.
+                Defaults to None (points connected with line segments).
         """
-        self._path_builder.clear()
+        with time_stage("encode"):
+            path_data = self._build_path_data(
+                points, is_closed_path, precision, compact, curve_tolerance
+            )
 
-        self._path_builder.move_to(points[0])
-        for point in points[1:]:
-            self._path_builder.line_to(point)
-        if is_closed_path:
-            self._path_builder.close_path()
+        svg_builder.add_path(
+            path_data, fill="none", stroke=stroke, stroke_width=stroke_width
+        )
 
-        path_data = self._path_builder.get_data()
+    def _build_paths_data(
+        self,
+        paths: list[list[tuple[int, int]]] | list[np.ndarray],
+        is_closed_path: bool,
+        precision: int | None = None,
+        compact: bool = False,
+        curve_tolerance: float | None = None,
+    ) -> Iterator[str]:
+        """
+        Build the path data of several paths, in the worker processes if the drawing is large enough.
 
-        self._svg_builder.add_path(
-            path_data, fill="none", stroke=stroke, stroke_width=stroke_width
+        Args:
+            paths (list[list[tuple[int, int]]] | list[np.ndarray]): list of paths, where each path is a list of points or an array of shape (N, 2).
+            is_closed_path (bool): Whether the paths should be closed.
+            precision (int | None): Number of decimals of the path coordinates. Defaults to None.
+            compact (bool): Whether to use the compact path data syntax. Defaults to False.
+            curve_tolerance (float | None): Maximum distance between the points and the cubic Bézier curves fitted to them.
+                Defaults to None (points connected with line segments).
+
+        Returns:
+            Iterator[str]: Path data strings, in the order of the paths.
+        """
+        path_lengths = np.fromiter((len(path) for path in paths), dtype=np.int64)
+        if (
+            self._max_workers <= 1
+            or len(paths) < 2
+            or path_lengths.sum() < self._parallel_min_points
+        ):
+            # Recorded once per drawing, time_stage would cost about as much as encoding a short path
+            encode_duration = 0.0
+            try:
+                for path in paths:
+                    start = time.perf_counter()
+                    path_data = self._build_path_data(
+                        path, is_closed_path, precision, compact, curve_tolerance
+                    )
+                    encode_duration += time.perf_counter() - start
+                    yield path_data
+            finally:
+                record_stage_duration("encode", encode_duration)
+            return
+
+        # Contiguous chunks with about the same number of points, so the order is kept when joining
+        chunk_count = min(len(paths), self._max_workers * self.CHUNKS_PER_WORKER)
+        cumulative_lengths = np.cumsum(path_lengths)
+        boundaries = np.searchsorted(
+            cumulative_lengths,
+            np.linspace(0, cumulative_lengths[-1], chunk_count + 1)[1:-1],
         )
+        boundaries = np.unique(np.concatenate(([0], boundaries, [len(paths)])))
+        chunks = [
+            paths[start:end] for start, end in zip(boundaries[:-1], boundaries[1:])
+        ]
+
+        executor = self._get_executor()
+        try:
+            for chunk_paths_data in executor.map(
+                self._build_chunk_paths_data,
+                chunks,
+                [is_closed_path] * len(chunks),
+                [precision] * len(chunks),
+                [compact] * len(chunks),
+                [curve_tolerance] * len(chunks),
+            ):
+                yield from chunk_paths_data
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            raise
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Return the pool of worker processes, started on first use.
+
+        Returns:
+            ProcessPoolExecutor: The pool of worker processes.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Discard a pool of worker processes that can no longer be used, so that the next use starts a new one.
+
+        Args:
+            executor (ProcessPoolExecutor): The broken pool of worker processes.
+        """
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    @staticmethod
+    def _generate_drawing_svg(drawing: dict[str, Any]) -> dict[str, Any]:
+        """
+        Prepare the paths of a drawing of a batch and generate its SVG. Runs in a worker process if there are
+        several workers.
+
+        Args:
+            drawing (dict[str, Any]): Keyword arguments of generate_multiple_line_paths_svg,
+                with the optional processing stages of prepare_paths.
+
+        Returns:
+            dict[str, Any]: The SVG string as "svg" with the statistics of the processing stages,
+                or the "error" and its "message".
+        """
+        drawing = dict(drawing)
+        stages = {
+            name: drawing.pop(name)
+            for name in ("merge_tolerance", "simplify_tolerance", "optimize_pen_travel")
+            if name in drawing
+        }
+        try:
+            drawing["paths"], statistics = PathToSVGService.prepare_paths(
+                drawing["paths"], drawing.get("is_closed_path", False), **stages
+            )
+        except ValueError as e:
+            return {"error": "Invalid request data", "message": str(e)}
+        except Exception as e:
+            return {
+                "error": "Internal Server Error",
+                "message": f"An error occurred while preparing the paths: {str(e)}",
+            }
+        try:
+            # Single-process service, the drawings are already spread over the workers
+            svg = PathToSVGService().generate_multiple_line_paths_svg(**drawing)
+        except Exception as e:
+            return {
+                "error": "Internal Server Error",
+                "message": f"An error occurred while generating the SVG: {str(e)}",
+            }
+        return {"svg": svg, **statistics}
+
+    @staticmethod
+    def _build_chunk_paths_data(
+        paths: list[list[tuple[int, int]]] | list[np.ndarray],
+        is_closed_path: bool,
+        precision: int | None = None,
+        compact: bool = False,
+        curve_tolerance: float | None = None,
+    ) -> list[str]:
+        """
+        Build the path data of a chunk of paths. Runs in a worker process.
+
+        Args:
+            paths (list[list[tuple[int, int]]] | list[np.ndarray]): list of paths, where each path is a list of points or an array of shape (N, 2).
+            is_closed_path (bool): Whether the paths should be closed.
+            precision (int | None): Number of decimals of the path coordinates. Defaults to None.
+            compact (bool): Whether to use the compact path data syntax. Defaults to False.
+            curve_tolerance (float | None): Maximum distance between the points and the cubic Bézier curves fitted to them.
+                Defaults to None (points connected with line segments).
+
+        Returns:
+            list[str]: Path data strings, in the order of the paths.
+        """
+        return [
+            PathToSVGService._build_path_data(
+                path, is_closed_path, precision, compact, curve_tolerance
+            )
+            for path in paths
+        ]
+
+    @staticmethod
+    def _build_path_data(
+        points: list[tuple[int, int]] | np.ndarray,
+        is_closed_path: bool,
+        precision: int | None = None,
+        compact: bool = False,
+        curve_tolerance: float | None = None,
+    ) -> str:
+        """
+        Build the path data of a path connecting the given points with line segments.
+
+        Args:
+            points (list[tuple[int, int]] | np.ndarray): list of points to define the path, or array of shape (N, 2).
+            is_closed_path (bool): Whether the path should be closed.
+            precision (int | None): Number of decimals of the path coordinates. Defaults to None.
+            compact (bool): Whether to use the compact path data syntax. Defaults to False.
+            curve_tolerance (float | None): Maximum distance between the points and the cubic Bézier curves fitted to them.
+                Defaults to None (points connected with line segments).
+
+        Returns:
+            str: Path data string.
+        """
+        path_builder = PathBuilder()
+        if curve_tolerance is None:
+            path_builder.polyline_from_array(np.asarray(points))
+        else:
+            PathToSVGService._add_fitted_curves(
+                path_builder, np.asarray(points), curve_tolerance
+            )
+        # An empty path has no current point, "Z" would be invalid path data
+        if is_closed_path and len(points) > 0:
+            path_builder.close_path()
+
+        return path_builder.get_data(precision, compact)
+
+    @staticmethod
+    def _add_fitted_curves(
+        path_builder: PathBuilder,
+        points: np.ndarray,
+        curve_tolerance: float,
+    ) -> None:
+        """
+        Add a path following the given points with fitted cubic Bézier curves.
+
+        The curves are written with the shorthand command when their first control point is the reflection
+        of the previous second control point, and the parts that cannot be fitted are written as lines.
+
+        Args:
+            path_builder (PathBuilder): Builder of the path.
+            points (np.ndarray): Array of points of shape (N, 2).
+            curve_tolerance (float): Maximum distance between the points and the curves.
+        """
+        if len(points) == 0:
+            return
+        end_indices, controls, is_line = CurveFitter(curve_tolerance).fit(points)
+
+        # The points are written as given, so the ends of the curves are exact
+        current_point = tuple(points[0].tolist())
+        path_builder.move_to(current_point)
+        previous_control2 = None
+        for end_index, (control1, control2), is_line_segment in zip(
+            end_indices.tolist(), controls.tolist(), is_line.tolist()
+        ):
+            end_point = tuple(points[end_index].tolist())
+            if is_line_segment:
+                path_builder.line_to(end_point)
+                previous_control2 = None
+            elif previous_control2 is not None and np.allclose(
+                control1,
+                (
+                    2 * current_point[0] - previous_control2[0],
+                    2 * current_point[1] - previous_control2[1],
+                ),
+                rtol=0,
+                atol=1e-9,
+            ):
+                path_builder.extend_cubic_bezier_curve_to(tuple(control2), end_point)
+                previous_control2 = control2
+            else:
+                path_builder.cubic_bezier_curve_to(
+                    tuple(control1), tuple(control2), end_point
+                )
+                previous_control2 = control2
+            current_point = end_point
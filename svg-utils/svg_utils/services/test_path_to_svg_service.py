@@ -1,3 +1,7 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pytest
 from svg_utils.services.path_to_svg_service import PathToSVGService
 
@@ -98,3 +102,257 @@ class TestPathToSVGService:
         assert 'fill="none"' in svg
         assert f'stroke="{stroke}"' in svg
         assert f'stroke-width="{stroke_width}"' in svg
+
+    def test_generate_line_path_svg_compact(
+        self, path_to_svg_service: PathToSVGService
+    ) -> None:
+        """Test the generate_line_path_svg method with the compact path data syntax."""
+        svg = path_to_svg_service.generate_line_path_svg(
+            [(300, 200), (231, 295), (119, 259)],
+            (400, 400),
+            is_closed_path=True,
+            precision=0,
+            compact=True,
+        )
+
+        assert 'd="M300 200l-69 95-112-36Z"' in svg
+
+    def test_generate_multiple_line_paths_svg_empty_closed_path(
+        self, path_to_svg_service: PathToSVGService
+    ) -> None:
+        """Test that an empty closed path gets no close command, invalid without a current point."""
+        svg = path_to_svg_service.generate_multiple_line_paths_svg(
+            [np.array([(1, 2), (3, 4)]), np.empty((0, 2))],
+            (10, 10),
+            is_closed_path=True,
+        )
+
+        assert 'd="M 1 2 L 3 4 Z"' in svg.replace(",", " ")
+        assert 'd="Z"' not in svg
+
+    def test_generate_line_path_svg_curves(
+        self, path_to_svg_service: PathToSVGService
+    ) -> None:
+        """Test the generate_line_path_svg method with cubic Bézier curves fitted to the points."""
+        svg = path_to_svg_service.generate_line_path_svg(
+            [(0, 0), (1, 1), (2, 0), (3, 0), (4, 0), (5, 0), (6, 1), (7, 0)],
+            (400, 400),
+            curve_tolerance=0.1,
+        )
+
+        assert 'd="M 0 0 L 1 1 L 2 0 L 3 0 L 4 0 L 5 0 L 6 1 L 7 0"' in svg
+
+        # Half circle
+        points = [(0, 100), (26, 97), (50, 87), (71, 71), (87, 50), (97, 26), (100, 0)]
+        points += [(x, -y) for x, y in points[-2::-1]]
+        svg = path_to_svg_service.generate_line_path_svg(
+            points, (400, 400), curve_tolerance=2, precision=0, compact=True
+        )
+
+        assert 'd="M0 100l26-3L50 87C126 43 112-75 26-97l-26-3"' in svg
+
+    def test_concurrent_generation(self, path_to_svg_service: PathToSVGService) -> None:
+        """Test that concurrent calls on a shared instance give the same output as sequential calls."""
+        rng = random.Random(0)
+        jobs = [
+            (
+                [
+                    [(rng.randint(0, 400), rng.randint(0, 400)) for _ in range(50)]
+                    for _ in range(rng.randint(1, 5))
+                ],
+                (rng.randint(100, 400), rng.randint(100, 400)),
+                rng.choice([None, (0, 0, 400, 400)]),
+                rng.choice([True, False]),
+                rng.choice(["red", "black", "blue"]),
+            )
+            for _ in range(200)
+        ]
+
+        def generate(job) -> str:
+            paths, size, viewbox, is_closed_path, stroke = job
+            return path_to_svg_service.generate_multiple_line_paths_svg(
+                paths, size, viewbox, is_closed_path, stroke
+            )
+
+        expected_svgs = [
+            PathToSVGService().generate_multiple_line_paths_svg(*job) for job in jobs
+        ]
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            for _ in range(5):
+                assert list(executor.map(generate, jobs)) == expected_svgs
+
+    def test_parallel_generation(self) -> None:
+        """Test that building the paths in worker processes keeps the output and the order of the paths."""
+        rng = random.Random(0)
+        paths = [
+            [
+                (rng.randint(0, 400), rng.randint(0, 400))
+                for _ in range(rng.randint(2, 50))
+            ]
+            for _ in range(100)
+        ]
+        expected_svg = PathToSVGService().generate_multiple_line_paths_svg(
+            paths, (400, 400), compact=True
+        )
+
+        parallel_service = PathToSVGService(max_workers=2, parallel_min_points=0)
+        try:
+            svg = parallel_service.generate_multiple_line_paths_svg(
+                paths, (400, 400), compact=True
+            )
+        finally:
+            parallel_service.close()
+
+        assert svg == expected_svg
+
+    def test_stream_multiple_line_paths_svg(
+        self, path_to_svg_service: PathToSVGService
+    ) -> None:
+        """Test that the streamed chunks form the generated SVG and are yielded as the paths are written."""
+        paths = [[(i, i), (i + 1, i + 2)] for i in range(200)]
+        path_to_svg_service.STREAM_CHUNK_SIZE = 1000
+
+        chunks = list(
+            path_to_svg_service.stream_multiple_line_paths_svg(paths, (400, 400))
+        )
+
+        assert len(chunks) > 1
+        assert all(len(chunk) < 2000 for chunk in chunks)
+        assert "".join(chunks) == path_to_svg_service.generate_multiple_line_paths_svg(
+            paths, (400, 400)
+        )
+
+    def test_simplify_paths(self, path_to_svg_service: PathToSVGService) -> None:
+        """Test the simplify_paths method."""
+        paths, removed_point_count = path_to_svg_service.simplify_paths(
+            [[(0, 0), (1, 0), (2, 0), (2, 5)], [], [(3, 3), (4, 4), (5, 5)]], 0.1
+        )
+
+        assert [path.tolist() for path in paths] == [
+            [[0, 0], [2, 0], [2, 5]],
+            [],
+            [[3, 3], [5, 5]],
+        ]
+        assert removed_point_count == 2
+
+    def test_order_paths(self, path_to_svg_service: PathToSVGService) -> None:
+        """Test the order_paths method."""
+        paths, travel_before, travel_after = path_to_svg_service.order_paths(
+            [[(10, 0), (12, 0)], [(6, 0), (3, 0)], [(0, 0), (1, 0)]]
+        )
+
+        assert [path.tolist() for path in paths] == [
+            [[0, 0], [1, 0]],
+            [[3, 0], [6, 0]],
+            [[10, 0], [12, 0]],
+        ]
+        assert travel_before == pytest.approx(10 + 6 + 3)
+        assert travel_after == pytest.approx(0 + 2 + 4)
+
+    def test_merge_paths(self, path_to_svg_service: PathToSVGService) -> None:
+        """Test the merge_paths method."""
+        paths, merged_path_count = path_to_svg_service.merge_paths(
+            [[(0, 0), (1, 0)], [(5, 5), (6, 6)], [(2, 2), (1, 0)]]
+        )
+
+        assert [path.tolist() for path in paths] == [
+            [[0, 0], [1, 0], [2, 2]],
+            [[5, 5], [6, 6]],
+        ]
+        assert merged_path_count == 1
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_generate_svgs(self, max_workers: int) -> None:
+        """Test that the SVGs of a batch are generated in order, with the errors of each drawing."""
+        rng = random.Random(0)
+        drawings = [
+            {
+                "paths": [
+                    [(rng.randint(0, 400), rng.randint(0, 400)) for _ in range(5)]
+                ],
+                "size": (400, 400),
+                "stroke": stroke,
+            }
+            for stroke in ("red", "green", "blue", "black")
+        ]
+        drawings[2]["paths"] = [[(0, 0, 0)]]
+        expected_svgs = [
+            PathToSVGService().generate_multiple_line_paths_svg(**drawing)
+            for drawing in drawings[:2] + drawings[3:]
+        ]
+
+        service = PathToSVGService(max_workers=max_workers)
+        try:
+            results = list(service.generate_svgs(drawings))
+        finally:
+            service.close()
+
+        assert [result.get("svg") for result in results] == expected_svgs[:2] + [
+            None
+        ] + expected_svgs[2:]
+        assert ["error" in result for result in results] == [False, False, True, False]
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_generate_svgs_prepare_paths(self, max_workers: int) -> None:
+        """Test that the paths of a batch are merged, simplified and ordered by the workers, with their statistics."""
+        paths = [
+            [(50, 50), (60, 50)],
+            [(0, 0), (10, 0), (20, 0), (30, 0)],
+            [(30, 0), (40, 0)],
+        ]
+        drawings = [
+            {
+                "paths": paths,
+                "size": (100, 100),
+                "merge_tolerance": 0.5,
+                "simplify_tolerance": 0.5,
+                "optimize_pen_travel": True,
+            },
+            {"paths": paths, "size": (100, 100)},
+        ]
+        expected_paths, expected_statistics = PathToSVGService.prepare_paths(
+            paths, False, 0.5, 0.5, True
+        )
+
+        service = PathToSVGService(max_workers=max_workers)
+        try:
+            results = list(service.generate_svgs(drawings))
+        finally:
+            service.close()
+
+        assert results[0] == {
+            "svg": PathToSVGService().generate_multiple_line_paths_svg(
+                expected_paths, (100, 100)
+            ),
+            **expected_statistics,
+        }
+        assert expected_statistics["merged_paths"] == 1
+        assert expected_statistics["removed_points"] == 3
+        assert results[1] == {
+            "svg": PathToSVGService().generate_multiple_line_paths_svg(
+                paths, (100, 100)
+            )
+        }
+
+    def test_generate_svgs_prepare_error(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an unexpected error while preparing the paths of a drawing only fails that drawing."""
+
+        def merge_paths(paths: list, tolerance: float = 0) -> None:
+            """Fail like an unexpected error of the merging."""
+            raise RuntimeError("merge failed")
+
+        monkeypatch.setattr(PathToSVGService, "merge_paths", staticmethod(merge_paths))
+        paths = [[(0, 0), (10, 0)], [(10, 0), (20, 0)]]
+        drawings = [
+            {"paths": paths, "size": (100, 100)},
+            {"paths": paths, "size": (100, 100), "merge_tolerance": 0.5},
+            {"paths": paths, "size": (100, 100)},
+        ]
+
+        results = list(PathToSVGService().generate_svgs(drawings))
+
+        assert ["svg" in result for result in results] == [True, False, True]
+        assert results[1] == {
+            "error": "Internal Server Error",
+            "message": "An error occurred while preparing the paths: merge failed",
+        }
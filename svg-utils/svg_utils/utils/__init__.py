@@ -1,4 +1,46 @@
+from .curve_fitter import CurveFitter
 from .path_builder import PathBuilder
+from .path_merger import PathMerger
+from .path_orderer import PathOrderer
+from .path_simplifier import PathSimplifier
+from .request_metrics import (
+    RequestMetrics,
+    RequestTimer,
+    activate_timer,
+    record_point_count,
+    record_stage_duration,
+    time_stage,
+)
+from .request_profiler import ProfilingMiddleware, RequestProfiler
+from .result_cache import ResultCache
+from .streaming_svg_builder import StreamingSVGBuilder
 from .svg_builder import SVGBuilder
+from .wsgi_server import (
+    RequestSizeLimitMiddleware,
+    WaitressServer,
+    get_server_options,
+    run_server,
+)
 
-__all__ = ["PathBuilder", "SVGBuilder"]
+__all__ = [
+    "CurveFitter",
+    "PathBuilder",
+    "PathMerger",
+    "PathOrderer",
+    "PathSimplifier",
+    "ProfilingMiddleware",
+    "RequestMetrics",
+    "RequestProfiler",
+    "RequestSizeLimitMiddleware",
+    "RequestTimer",
+    "ResultCache",
+    "StreamingSVGBuilder",
+    "SVGBuilder",
+    "WaitressServer",
+    "activate_timer",
+    "get_server_options",
+    "record_point_count",
+    "record_stage_duration",
+    "run_server",
+    "time_stage",
+]
@@ -0,0 +1,364 @@
+import numpy as np
+
+
+class CurveFitter:
+    """Class to fit cubic Bézier curves to polylines, with Schneider's algorithm.
+
+    A single curve is fitted to the points by least squares, with its end tangents taken from the polyline.
+    If a point or the middle of a segment is further than the tolerance from the curve, the parameters of the points are improved
+    with Newton-Raphson iterations, and if that is not enough, the polyline is split at the furthest point
+    with the same tangent on both sides, so the curves join smoothly. Runs of less than MIN_CURVE_POINTS points
+    are kept as lines, and so are the runs left once the fits of the polyline so far are over their budget.
+    """
+
+    # Runs with more points are split at their middle point when they are split.
+    # With some shapes (e.g. spirals) the furthest point is always close to an end of the run,
+    # so the number of fits would grow with the square of the number of points.
+    MIDDLE_SPLIT_MIN_POINTS = 4096
+    # Maximum number of Newton-Raphson iterations on the parameters of the points of a run
+    MAX_REPARAMETERIZATIONS = 4
+    # Minimum number of points of the runs curves are fitted to. Fits cost about the same whatever the number
+    # of points of the runs, and noisy polylines are split into many short runs the curves rarely fit.
+    MIN_CURVE_POINTS = 5
+    # Budget of the fits up to a point of the polyline: MIN_FIT_BUDGET, plus MAX_FITS_PER_POINT for each point
+    # before it. Smooth polylines need much less, noisy ones would need a fit every few points.
+    MAX_FITS_PER_POINT = 0.1
+    MIN_FIT_BUDGET = 32
+    # Distance along the polyline, in tolerances, between the points the tangents are estimated from.
+    # Tangents from neighbouring points are too noisy on points rounded to a grid.
+    TANGENT_DISTANCE = 5
+
+    def __init__(self, tolerance: float) -> None:
+        """
+        Initializes a new CurveFitter object.
+
+        Args:
+            tolerance (float): Maximum distance between a point of the polyline and the fitted curves.
+
+        Raises:
+            ValueError: If the tolerance is not positive.
+        """
+        if tolerance <= 0:
+            raise ValueError(f"The tolerance must be positive, got {tolerance}.")
+        self._tolerance: float = tolerance
+
+    def fit(self, points: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Fits cubic Bézier curves to a polyline. Each curve starts at the end of the previous one (the first at the first point)
+        and ends at a point of the polyline.
+
+        Args:
+            points (np.ndarray): Array of points of shape (N, 2).
+
+        Raises:
+            ValueError: If the array is not of shape (N, 2).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: For each segment, the index of its end point in the polyline,
+                its two control points (array of shape (K, 2, 2)), and whether it is a line (then without control points).
+        """
+        points = np.asarray(points)
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise ValueError(
+                f"The points must be an array of shape (N, 2), got {points.shape}."
+            )
+        # Repeated points have no tangent and no length
+        is_kept = np.ones(points.shape[0], dtype=bool)
+        is_kept[1:] = np.any(points[1:] != points[:-1], axis=1)
+        point_indices = np.flatnonzero(is_kept)
+        points = points[is_kept].astype(np.float64)
+
+        end_indices: list[int] = []
+        controls: list[np.ndarray] = []
+        is_line: list[bool] = []
+        if points.shape[0] < 2:
+            return (
+                np.array(end_indices, dtype=np.int64),
+                np.zeros((0, 2, 2)),
+                np.array(is_line, dtype=bool),
+            )
+
+        lengths = np.concatenate(([0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))))
+        last_index = points.shape[0] - 1
+        # Runs to fit, as indices of their first and last points with their end tangents,
+        # the next run to fit at the end
+        runs = [
+            (
+                0,
+                last_index,
+                self._get_tangent(points, lengths, 0, 0, last_index),
+                -self._get_tangent(points, lengths, last_index, 0, last_index),
+            )
+        ]
+        fit_count = 0
+        while runs:
+            first, last, start_tangent, end_tangent = runs.pop()
+            # The runs are fitted in the order of the polyline, so a noisy part only uses its own budget
+            if (
+                last - first < self.MIN_CURVE_POINTS - 1
+                or fit_count >= self.MIN_FIT_BUDGET + self.MAX_FITS_PER_POINT * last
+            ):
+                line_count = last - first
+                end_indices.extend(range(first + 1, last + 1))
+                controls.extend([np.full((2, 2), np.nan)] * line_count)
+                is_line.extend([True] * line_count)
+                continue
+            fit_count += 1
+
+            run_points = points[first : last + 1]
+            curve, split = self._fit_curve(run_points, start_tangent, end_tangent)
+            if curve is not None:
+                end_indices.append(last)
+                controls.append(curve[1:3])
+                is_line.append(False)
+                continue
+
+            if run_points.shape[0] > self.MIDDLE_SPLIT_MIN_POINTS:
+                split = run_points.shape[0] // 2
+            center_tangent = self._get_tangent(
+                points, lengths, first + split, first, last
+            )
+            runs.append((first + split, last, center_tangent, end_tangent))
+            runs.append((first, first + split, start_tangent, -center_tangent))
+
+        return (
+            point_indices[end_indices],
+            np.array(controls),
+            np.array(is_line, dtype=bool),
+        )
+
+    def _get_tangent(
+        self,
+        points: np.ndarray,
+        lengths: np.ndarray,
+        index: int,
+        first: int,
+        last: int,
+    ) -> np.ndarray:
+        """
+        Estimates the unit tangent of the polyline at a point, from the points at TANGENT_DISTANCE tolerances
+        along the polyline on each side, between the first and last points of a run.
+
+        Args:
+            points (np.ndarray): Points of the polyline, of shape (N, 2).
+            lengths (np.ndarray): Length of the polyline up to each point.
+            index (int): Index of the point.
+            first (int): Index of the first point the tangent can be estimated from.
+            last (int): Index of the last point the tangent can be estimated from.
+
+        Returns:
+            np.ndarray: The unit tangent, in the direction of the polyline.
+        """
+        distance = self.TANGENT_DISTANCE * self._tolerance
+        before_index = max(
+            int(np.searchsorted(lengths, lengths[index] - distance, side="right")) - 1,
+            first,
+        )
+        after_index = min(
+            int(np.searchsorted(lengths, lengths[index] + distance)), last
+        )
+        return self._normalize(points[after_index] - points[before_index])
+
+    def _fit_curve(
+        self,
+        points: np.ndarray,
+        start_tangent: np.ndarray,
+        end_tangent: np.ndarray,
+    ) -> tuple[np.ndarray | None, int]:
+        """
+        Fits a single cubic Bézier curve to a run of at least three points.
+
+        Args:
+            points (np.ndarray): Points of the run, of shape (N, 2).
+            start_tangent (np.ndarray): Unit tangent at the first point, towards the run.
+            end_tangent (np.ndarray): Unit tangent at the last point, towards the run.
+
+        Returns:
+            tuple[np.ndarray | None, int]: The four points of the curve (None if it is further than the tolerance),
+                and the index of the inner point furthest from the curve.
+        """
+        # Chord length parameterization
+        lengths = np.concatenate(([0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))))
+        parameters = lengths / lengths[-1]
+
+        curve = self._solve_curve(points, parameters, start_tangent, end_tangent)
+        error, split = self._get_max_error(points, curve, parameters)
+        # Far curves are not improved enough by the reparameterization to be worth it
+        if self._tolerance < error <= 4 * self._tolerance:
+            for _ in range(self.MAX_REPARAMETERIZATIONS):
+                parameters = self._reparameterize(points, curve, parameters)
+                curve = self._solve_curve(
+                    points, parameters, start_tangent, end_tangent
+                )
+                error, split = self._get_max_error(points, curve, parameters)
+                if error <= self._tolerance:
+                    break
+        return (curve if error <= self._tolerance else None), split
+
+    @staticmethod
+    def _solve_curve(
+        points: np.ndarray,
+        parameters: np.ndarray,
+        start_tangent: np.ndarray,
+        end_tangent: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Finds the distances of the control points along the end tangents that fit the points best, by least squares.
+
+        Args:
+            points (np.ndarray): Points of the run, of shape (N, 2).
+            parameters (np.ndarray): Parameter of each point on the curve, from 0 to 1.
+            start_tangent (np.ndarray): Unit tangent at the first point, towards the run.
+            end_tangent (np.ndarray): Unit tangent at the last point, towards the run.
+
+        Returns:
+            np.ndarray: The four points of the curve, of shape (4, 2).
+        """
+        start, end = points[0], points[-1]
+        complements = 1 - parameters
+        basis0 = complements**3
+        basis1 = 3 * parameters * complements**2
+        basis2 = 3 * parameters**2 * complements
+        basis3 = parameters**3
+        start_terms = basis1[:, np.newaxis] * start_tangent
+        end_terms = basis2[:, np.newaxis] * end_tangent
+        # Offsets of the points from the curve with both control points at the ends
+        offsets = points - (
+            np.outer(basis0 + basis1, start) + np.outer(basis2 + basis3, end)
+        )
+
+        c00 = np.sum(start_terms * start_terms)
+        c01 = np.sum(start_terms * end_terms)
+        c11 = np.sum(end_terms * end_terms)
+        x0 = np.sum(start_terms * offsets)
+        x1 = np.sum(end_terms * offsets)
+        determinant = c00 * c11 - c01 * c01
+
+        chord_length = float(np.hypot(*(end - start)))
+        start_distance = end_distance = chord_length / 3
+        if abs(determinant) > 1e-12 * max(c00 * c11, 1e-300):
+            solved_start_distance = (x0 * c11 - x1 * c01) / determinant
+            solved_end_distance = (c00 * x1 - c01 * x0) / determinant
+            # Control points behind or on the ends give cusps, the heuristic is safer
+            if min(solved_start_distance, solved_end_distance) > 1e-6 * chord_length:
+                start_distance = solved_start_distance
+                end_distance = solved_end_distance
+
+        return np.array(
+            [
+                start,
+                start + start_distance * start_tangent,
+                end + end_distance * end_tangent,
+                end,
+            ]
+        )
+
+    @staticmethod
+    def _evaluate(
+        curve: np.ndarray, parameters: np.ndarray, derivative: int = 0
+    ) -> np.ndarray:
+        """
+        Evaluates a cubic Bézier curve or one of its derivatives.
+
+        Args:
+            curve (np.ndarray): The four points of the curve, of shape (4, 2).
+            parameters (np.ndarray): Parameters from 0 to 1.
+            derivative (int): Order of the derivative, from 0 to 2. Defaults to 0 (the curve).
+
+        Returns:
+            np.ndarray: Points (or derivative vectors) of shape (N, 2).
+        """
+        # The derivatives of a Bézier curve are Bézier curves of lower degree
+        for _ in range(derivative):
+            curve = (curve.shape[0] - 1) * np.diff(curve, axis=0)
+        parameters = parameters[:, np.newaxis]
+        complements = 1 - parameters
+        degree = curve.shape[0] - 1
+        if degree == 3:
+            return (
+                complements**3 * curve[0]
+                + 3 * parameters * complements**2 * curve[1]
+                + 3 * parameters**2 * complements * curve[2]
+                + parameters**3 * curve[3]
+            )
+        if degree == 2:
+            return (
+                complements**2 * curve[0]
+                + 2 * parameters * complements * curve[1]
+                + parameters**2 * curve[2]
+            )
+        return complements * curve[0] + parameters * curve[1]
+
+    def _get_max_error(
+        self, points: np.ndarray, curve: np.ndarray, parameters: np.ndarray
+    ) -> tuple[float, int]:
+        """
+        Finds the largest distance between the run and the curve, at the points and at the middles of the segments.
+        The middles keep the curve from looping between points, e.g. at the corners of runs of three points.
+
+        Args:
+            points (np.ndarray): Points of the run, of shape (N, 2), with N at least 3.
+            curve (np.ndarray): The four points of the curve, of shape (4, 2).
+            parameters (np.ndarray): Parameter of each point on the curve.
+
+        Returns:
+            tuple[float, int]: The largest distance and the index of the inner point to split the run at.
+        """
+        distances = np.hypot(*(self._evaluate(curve, parameters) - points).T)
+        middle_distances = np.hypot(
+            *(
+                self._evaluate(curve, (parameters[:-1] + parameters[1:]) / 2)
+                - (points[:-1] + points[1:]) / 2
+            ).T
+        )
+        split = int(np.argmax(distances[1:-1])) + 1
+        error = float(distances[split])
+        middle_index = int(np.argmax(middle_distances))
+        if middle_distances[middle_index] > error:
+            error = float(middle_distances[middle_index])
+            # The end of the segment that is an inner point
+            split = min(max(middle_index, 1), points.shape[0] - 2)
+        return error, split
+
+    def _reparameterize(
+        self, points: np.ndarray, curve: np.ndarray, parameters: np.ndarray
+    ) -> np.ndarray:
+        """
+        Moves the parameter of each point closer to the nearest position on the curve, with a Newton-Raphson step.
+
+        Args:
+            points (np.ndarray): Points of the run, of shape (N, 2).
+            curve (np.ndarray): The four points of the curve, of shape (4, 2).
+            parameters (np.ndarray): Parameter of each point on the curve.
+
+        Returns:
+            np.ndarray: The new parameters, from 0 to 1.
+        """
+        offsets = self._evaluate(curve, parameters) - points
+        first_derivatives = self._evaluate(curve, parameters, 1)
+        second_derivatives = self._evaluate(curve, parameters, 2)
+        numerators = np.sum(offsets * first_derivatives, axis=1)
+        denominators = np.sum(first_derivatives * first_derivatives, axis=1) + np.sum(
+            offsets * second_derivatives, axis=1
+        )
+        steps = np.divide(
+            numerators,
+            denominators,
+            out=np.zeros_like(numerators),
+            where=denominators != 0,
+        )
+        return np.clip(parameters - steps, 0, 1)
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        """
+        Scales a vector to a length of 1.
+
+        Args:
+            vector (np.ndarray): The vector.
+
+        Returns:
+            np.ndarray: The unit vector, or the zero vector if the vector is zero.
+        """
+        length = float(np.hypot(*vector))
+        return vector / length if length > 0 else np.zeros(2)
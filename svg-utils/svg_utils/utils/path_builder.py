@@ -1,9 +1,17 @@
+import numpy as np
+
+from .path_data_encoder import PathDataEncoder, PathDataPart
+
+# Below this number of commands, formatting an array with Python is faster than the vectorized formatter
+_VECTORIZED_MIN_ROWS = 512
+
+
 class PathBuilder:
     """Class to generate SVG paths with lines, quadratic Bézier curves, cubic Bézier curves and arcs."""
 
     def __init__(self) -> None:
         """Initializes a new PathBuilder object."""
-        self._data_path_parts: list[str] = []
+        self._data_path_parts: list[PathDataPart] = []
         self._subpath_start_position: tuple[float, float] = (0, 0)
         self._current_position: tuple[float, float] = (0, 0)
 
@@ -39,16 +47,7 @@ class PathBuilder:
             command (str): Command for the path data part.
             *parameters (float | tuple[float, float]): Parameters for the path data part (x, y or (x, y), 0 or 1).
         """
-        flat_parameters = [
-            str(p) if isinstance(p, (int, float)) else f"{p[0]} {p[1]}"
-            for p in parameters
-        ]
-
-        if flat_parameters:
-            self._data_path_parts.append(f"{command} {' '.join(flat_parameters)}")
-        else:
-            # Avoids adding a trailing space if there are no parameters
-            self._data_path_parts.append(command)
+        self._data_path_parts.append((command, parameters))
 
     def _update_position(
         self,
@@ -143,6 +142,53 @@ class PathBuilder:
         self._add_data_path_part(command, point)
         self._update_position(point, relative)
 
+    def polyline_from_array(
+        self,
+        points: np.ndarray,
+        relative: bool = False,
+    ) -> None:
+        """
+        Start a new sub-path at the first point and draw straight lines through all the following points.
+        The result is the same as calling `move_to` with the first point and `line_to` with each following point,
+        but the path data is generated in one vectorized pass.
+
+        Args:
+            points (np.ndarray): Array of points of shape (N, 2).
+            relative (bool): If True, each point is relative to the previous position. Defaults to False.
+
+        Raises:
+            ValueError: If the array is not of shape (N, 2) or does not contain numbers.
+        """
+        # Copied, so later changes of the array do not alter the path
+        points = np.array(points)
+        if points.ndim != 2 or points.shape[1] != 2:
+            raise ValueError(
+                f"The points must be an array of shape (N, 2), got {points.shape}."
+            )
+        if not (
+            np.issubdtype(points.dtype, np.integer)
+            or np.issubdtype(points.dtype, np.floating)
+        ):
+            raise ValueError(
+                f"The points must contain numbers, got dtype '{points.dtype}'."
+            )
+        if points.shape[0] == 0:
+            return
+
+        self._data_path_parts.append(("m" if relative else "M", points[:1]))
+        if points.shape[0] > 1:
+            self._data_path_parts.append(("l" if relative else "L", points[1:]))
+
+        start = points[0].tolist()
+        end = points.sum(axis=0).tolist() if relative else points[-1].tolist()
+        if relative:
+            x, y = self._current_position
+            self._subpath_start_position = (x + start[0], y + start[1])
+            self._current_position = (x + end[0], y + end[1])
+        else:
+            self._subpath_start_position = (start[0], start[1])
+            self._current_position = (end[0], end[1])
+
     def horizontal_line_to(
         self,
         x: float,
@@ -280,14 +326,118 @@ class PathBuilder:
         self._add_data_path_part("Z")
         self._current_position = self._subpath_start_position
 
-    def get_data(self) -> str:
+    def get_data(
+        self,
+        precision: int | None = None,
+        compact: bool = False,
+    ) -> str:
         """
         Returns the path data string.
 
+        By default, the parameters are written as given, with explicit commands separated by spaces.
+        With a precision or the compact syntax, the coordinates are rounded and relative coordinates
+        are computed from the rounded absolute coordinates, so the rounding errors do not accumulate.
+
+        Args:
+            precision (int | None): Number of decimals of the coordinates. If None, the coordinates are written
+                as given, or with the smallest exact precision in the compact syntax. Defaults to None.
+            compact (bool): If True, repeated commands are omitted, each command uses absolute or relative
+                coordinates depending on which is shorter, and separators are only written where required
+                (e.g. "M1-2L.5.5 3 4" instead of "M 1 -2 L 0.5 0.5 L 3 4"). Defaults to False.
+
+        Raises:
+            ValueError: If the precision is invalid or a coordinate cannot be encoded with it.
+
         Returns:
             str: Path data string.
         """
-        return " ".join(self._data_path_parts)
+        if precision is not None or compact:
+            encoder = PathDataEncoder(precision, compact)
+            return encoder.encode(self._data_path_parts)
+
+        return " ".join(
+            self._format_data_path_part(command, parameters)
+            for command, parameters in self._data_path_parts
+        )
+
+    @staticmethod
+    def _format_data_path_part(
+        command: str,
+        parameters: tuple[float | tuple[float, float], ...] | np.ndarray,
+    ) -> str:
+        """
+        Formats a path data part with its parameters written as given.
+
+        Args:
+            command (str): Command for the path data part.
+            parameters (tuple[float | tuple[float, float], ...] | np.ndarray): Parameters of the command,
+                or array of shape (N, number of parameters) for N repeated commands.
+
+        Returns:
+            str: Path data string of the part.
+        """
+        if not isinstance(parameters, np.ndarray):
+            flat_parameters = [
+                str(p) if isinstance(p, (int, float)) else f"{p[0]} {p[1]}"
+                for p in parameters
+            ]
+            if flat_parameters:
+                return f"{command} {' '.join(flat_parameters)}"
+            # Avoids adding a trailing space if there are no parameters
+            return command
+
+        if parameters.shape[0] < _VECTORIZED_MIN_ROWS:
+            return PathBuilder._format_rows(command, parameters)
+
+        letters = np.zeros(parameters.shape, dtype=np.uint8)
+        letters[:, 0] = ord(command)
+        has_number = np.ones(parameters.size, dtype=bool)
+
+        if np.issubdtype(parameters.dtype, np.integer):
+            return PathDataEncoder.format_tokens(
+                letters.ravel(), parameters.ravel(), has_number, 0, False
+            )
+
+        # Integral floats are written like Python does ("1.0"), as long as Python does not switch
+        # to the scientific notation (from 1e16) and there is no negative zero.
+        if (
+            np.all(np.isfinite(parameters))
+            and np.all(parameters == np.trunc(parameters))
+            and np.abs(parameters).max() < 1e16
+            and not np.any(np.signbit(parameters) & (parameters == 0))
+        ):
+            return PathDataEncoder.format_tokens(
+                letters.ravel(),
+                (parameters.ravel() * 10).astype(np.int64),
+                has_number,
+                1,
+                False,
+                min_fraction_digits=1,
+            )
+
+        return PathBuilder._format_rows(command, parameters)
+
+    @staticmethod
+    def _format_rows(command: str, parameters: np.ndarray) -> str:
+        """
+        Formats an array of repeated commands with Python.
+
+        Args:
+            command (str): Command repeated on each row.
+            parameters (np.ndarray): Array of shape (N, number of parameters).
+
+        Returns:
+            str: Path data string of the commands.
+        """
+        # Floats of less than 64 bits are written with their shortest repr (0.1, not 0.10000000149011612)
+        if (
+            np.issubdtype(parameters.dtype, np.floating)
+            and parameters.dtype.itemsize < 8
+        ):
+            rows = parameters.astype(str).tolist()
+        else:
+            rows = parameters.tolist()
+        return " ".join(f"{command} {' '.join(map(str, row))}" for row in rows)
 
     def clear(self) -> None:
         """Clears the path data."""
@@ -0,0 +1,481 @@
+import numpy as np
+
+# Axis of each parameter of the path commands: 0 for an x coordinate, 1 for a y coordinate
+# and -1 for a parameter that is not a coordinate (radii, rotation and flags of arcs).
+PARAMETER_AXES: dict[str, tuple[int, ...]] = {
+    "M": (0, 1),
+    "L": (0, 1),
+    "H": (0,),
+    "V": (1,),
+    "C": (0, 1, 0, 1, 0, 1),
+    "S": (0, 1, 0, 1),
+    "Q": (0, 1, 0, 1),
+    "T": (0, 1),
+    "A": (-1, -1, -1, -1, -1, 0, 1),
+    "Z": (),
+}
+
+MAX_PRECISION = 10
+
+# Scaled values must stay exactly representable by a float64
+_MAX_SCALED_VALUE = 2**53
+
+PathDataPart = tuple[str, tuple[float | tuple[float, float], ...] | np.ndarray]
+
+
+class PathDataEncoder:
+    """Class to encode path data parts into a path data string with a fixed precision and an optional compact syntax."""
+
+    def __init__(
+        self,
+        precision: int | None = None,
+        compact: bool = False,
+    ) -> None:
+        """
+        Initializes a new PathDataEncoder object.
+
+        Args:
+            precision (int | None): Number of decimals of the coordinates. If None, the smallest precision
+                (up to MAX_PRECISION) that represents all coordinates exactly is used. Defaults to None.
+            compact (bool): If True, repeated commands are omitted, each command uses absolute or relative
+                coordinates depending on which is shorter, and separators are only written where required.
+                Defaults to False.
+
+        Raises:
+            ValueError: If the precision is not between 0 and MAX_PRECISION.
+        """
+        if precision is not None and not 0 <= precision <= MAX_PRECISION:
+            raise ValueError(
+                f"The precision must be between 0 and {MAX_PRECISION}, got {precision}."
+            )
+        self._precision: int | None = precision
+        self._compact: bool = compact
+
+    def encode(self, parts: list[PathDataPart]) -> str:
+        """
+        Encodes path data parts into a path data string.
+
+        Each part is a command with either the parameters of one command (numbers or (x, y) tuples),
+        or an array of shape (N, number of parameters) holding the parameters of N repeated commands.
+        Relative coordinates are always computed from the rounded absolute coordinates,
+        so the rounding errors do not accumulate along the path.
+
+        Args:
+            parts (list[PathDataPart]): Path data parts.
+
+        Raises:
+            ValueError: If a coordinate is not finite or too large for the precision.
+
+        Returns:
+            str: Path data string.
+        """
+        groups = self._group_parts(parts)
+        if not groups:
+            return ""
+
+        for _, values in groups:
+            if not np.all(np.isfinite(values)):
+                raise ValueError("The path data contains non-finite coordinates.")
+
+        precision = self._precision
+        if precision is None:
+            precision = self._find_exact_precision(groups)
+        scale = 10**precision
+
+        position = np.zeros(2, dtype=np.float64)
+        subpath_start = np.zeros(2, dtype=np.float64)
+        rounded_position = np.zeros(2, dtype=np.int64)
+        rounded_subpath_start = np.zeros(2, dtype=np.int64)
+
+        row_letters: list[np.ndarray] = []
+        row_token_counts: list[np.ndarray] = []
+        token_values: list[np.ndarray] = []
+        token_has_number: list[np.ndarray] = []
+
+        for command, values in groups:
+            base_command = command.upper()
+            is_relative = command.islower()
+            row_count = values.shape[0]
+
+            if base_command == "Z":
+                row_letters.append(np.full(row_count, ord(command), dtype=np.uint8))
+                row_token_counts.append(np.ones(row_count, dtype=np.int64))
+                token_values.append(np.zeros(row_count, dtype=np.int64))
+                token_has_number.append(np.zeros(row_count, dtype=bool))
+                position = subpath_start.copy()
+                rounded_position = rounded_subpath_start.copy()
+                continue
+
+            axes = np.array(PARAMETER_AXES[base_command])
+            starts, ends = self._get_row_positions(values, axes, position, is_relative)
+            absolute = values.copy()
+            if is_relative:
+                absolute += np.where(axes >= 0, starts[:, np.maximum(axes, 0)], 0)
+
+            rounded = self._round(absolute, scale)
+            rounded_starts, rounded_ends = self._get_row_positions(
+                rounded, axes, rounded_position, is_relative=False
+            )
+            rounded_relative = rounded - np.where(
+                axes >= 0, rounded_starts[:, np.maximum(axes, 0)], 0
+            )
+
+            if self._compact:
+                absolute_cost = self._estimate_lengths(rounded, precision)
+                relative_cost = self._estimate_lengths(rounded_relative, precision)
+                use_relative = (relative_cost < absolute_cost) | (
+                    (relative_cost == absolute_cost) & is_relative
+                )
+            else:
+                use_relative = np.full(row_count, is_relative)
+
+            row_letters.append(
+                np.where(
+                    use_relative, ord(base_command.lower()), ord(base_command)
+                ).astype(np.uint8)
+            )
+            row_token_counts.append(np.full(row_count, len(axes), dtype=np.int64))
+            token_values.append(
+                np.where(use_relative[:, np.newaxis], rounded_relative, rounded).ravel()
+            )
+            token_has_number.append(np.ones(rounded.size, dtype=bool))
+
+            position = ends[-1]
+            rounded_position = rounded_ends[-1]
+            if base_command == "M":
+                subpath_start = position.copy()
+                rounded_subpath_start = rounded_position.copy()
+
+        letters = np.concatenate(row_letters)
+        token_counts = np.concatenate(row_token_counts)
+
+        if self._compact:
+            # After a move, implicit coordinates are lines (absolute after "M", relative after "m")
+            previous_letters = np.roll(letters, 1)
+            previous_letters[previous_letters == ord("M")] = ord("L")
+            previous_letters[previous_letters == ord("m")] = ord("l")
+            is_implicit = (letters == previous_letters) & ~np.isin(
+                letters, np.frombuffer(b"MmZz", dtype=np.uint8)
+            )
+            is_implicit[0] = False
+            letters = np.where(is_implicit, 0, letters).astype(np.uint8)
+
+        token_letters = np.zeros(int(token_counts.sum()), dtype=np.uint8)
+        token_letters[np.cumsum(token_counts) - token_counts] = letters
+
+        return self.format_tokens(
+            token_letters,
+            np.concatenate(token_values),
+            np.concatenate(token_has_number),
+            precision,
+            self._compact,
+        )
+
+    @staticmethod
+    def format_tokens(
+        letters: np.ndarray,
+        values: np.ndarray,
+        has_number: np.ndarray,
+        precision: int,
+        compact: bool,
+        min_fraction_digits: int = 0,
+    ) -> str:
+        """
+        Formats path data tokens into a path data string in one vectorized pass.
+
+        A token is an optional command letter followed by an optional number.
+        The numbers are given as integers scaled by 10 to the power of the precision.
+
+        Args:
+            letters (np.ndarray): ASCII code of the command letter of each token, or 0 for no letter.
+            values (np.ndarray): Number of each token, scaled by 10 to the power of the precision.
+            has_number (np.ndarray): Whether each token has a number.
+            precision (int): Number of decimals of the numbers.
+            compact (bool): If True, separators are only written where required and leading zeros are omitted.
+                Otherwise, tokens are separated by a space and letters are followed by a space.
+            min_fraction_digits (int): Minimum number of decimals written for each number. Defaults to 0.
+
+        Returns:
+            str: Path data string.
+        """
+        if values.size == 0:
+            return ""
+
+        values = np.where(has_number, values, 0).astype(np.int64)
+        negative = values < 0
+        integer_parts, fractions, fraction_digit_counts = (
+            PathDataEncoder._split_numbers(
+                np.abs(values), precision, min_fraction_digits
+            )
+        )
+        has_fraction = fraction_digit_counts > 0
+
+        has_integer_part = has_number & ~(compact & (integer_parts == 0) & has_fraction)
+        integer_digit_counts = np.where(
+            has_integer_part, PathDataEncoder._count_digits(integer_parts), 0
+        )
+        number_lengths = (
+            negative + integer_digit_counts + has_fraction * (1 + fraction_digit_counts)
+        )
+
+        has_letter = letters != 0
+        if compact:
+            has_dot = has_fraction & has_number
+            previous_has_dot = np.roll(has_dot, 1)
+            starts_with_dot = has_number & ~negative & ~has_integer_part
+            needs_separator = (
+                ~has_letter & ~negative & ~(starts_with_dot & previous_has_dot)
+            )
+            needs_separator[0] = False
+            prefix_lengths = has_letter + needs_separator
+            letter_offsets = np.zeros(values.shape, dtype=np.int64)
+        else:
+            is_first = np.zeros(values.shape, dtype=bool)
+            is_first[0] = True
+            letter_offsets = (~is_first).astype(np.int64)
+            prefix_lengths = letter_offsets + has_letter * (1 + has_number)
+
+        token_lengths = prefix_lengths + number_lengths
+        token_ends = np.cumsum(token_lengths)
+        token_starts = token_ends - token_lengths
+
+        # Separators are spaces, everything else overwrites them
+        buffer = np.full(int(token_ends[-1]), ord(" "), dtype=np.uint8)
+        buffer[(token_starts + letter_offsets)[has_letter]] = letters[has_letter]
+
+        number_starts = token_starts + prefix_lengths
+        buffer[number_starts[negative]] = ord("-")
+        integer_ends = number_starts + negative + integer_digit_counts
+        PathDataEncoder._write_digits(
+            buffer, integer_ends, integer_parts, integer_digit_counts
+        )
+        buffer[integer_ends[has_fraction]] = ord(".")
+        PathDataEncoder._write_digits(
+            buffer, token_ends, fractions, fraction_digit_counts
+        )
+
+        return buffer.tobytes().decode("ascii")
+
+    @staticmethod
+    def _split_numbers(
+        magnitudes: np.ndarray,
+        precision: int,
+        min_fraction_digits: int = 0,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Splits non-negative scaled numbers into their integer part and their fraction without trailing zeros.
+
+        Args:
+            magnitudes (np.ndarray): Non-negative numbers, scaled by 10 to the power of the precision.
+            precision (int): Number of decimals of the numbers.
+            min_fraction_digits (int): Minimum number of decimals kept. Defaults to 0.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Integer parts, fractions without trailing zeros
+                and number of digits of the fractions.
+        """
+        scale = 10**precision
+        integer_parts = magnitudes // scale
+        fractions = magnitudes % scale
+        fraction_digit_counts = np.full(magnitudes.shape, precision, dtype=np.int64)
+        is_stripping = np.ones(magnitudes.shape, dtype=bool)
+        for _ in range(precision - min_fraction_digits):
+            is_stripping &= fractions % 10 == 0
+            fraction_digit_counts -= is_stripping
+            fractions = np.where(is_stripping, fractions // 10, fractions)
+        return integer_parts, fractions, fraction_digit_counts
+
+    @staticmethod
+    def _write_digits(
+        buffer: np.ndarray,
+        ends: np.ndarray,
+        values: np.ndarray,
+        digit_counts: np.ndarray,
+    ) -> None:
+        """
+        Writes the decimal digits of non-negative integers into a buffer, from the least significant to the most significant.
+
+        Args:
+            buffer (np.ndarray): ASCII buffer to write into.
+            ends (np.ndarray): Position after the last digit of each value.
+            values (np.ndarray): Non-negative integer values.
+            digit_counts (np.ndarray): Number of digits written for each value (zero-padded on the left).
+        """
+        if values.size == 0:
+            return
+        remainders = values
+        for position in range(int(digit_counts.max())):
+            is_written = digit_counts > position
+            buffer[ends[is_written] - 1 - position] = (
+                remainders[is_written] % 10 + ord("0")
+            ).astype(np.uint8)
+            remainders = remainders // 10
+
+    @staticmethod
+    def _count_digits(values: np.ndarray) -> np.ndarray:
+        """
+        Counts the decimal digits of non-negative integers (at least one, for 0).
+
+        Args:
+            values (np.ndarray): Non-negative integer values.
+
+        Returns:
+            np.ndarray: Number of digits of each value.
+        """
+        digit_counts = np.ones(values.shape, dtype=np.int64)
+        if values.size == 0:
+            return digit_counts
+        max_value = int(values.max())
+        power = 10
+        while power <= max_value:
+            digit_counts += values >= power
+            power *= 10
+        return digit_counts
+
+    @staticmethod
+    def _group_parts(parts: list[PathDataPart]) -> list[tuple[str, np.ndarray]]:
+        """
+        Groups consecutive parts with the same command into arrays of parameters.
+
+        Args:
+            parts (list[PathDataPart]): Path data parts.
+
+        Returns:
+            list[tuple[str, np.ndarray]]: Commands with an array of shape (N, number of parameters).
+        """
+        groups: list[tuple[str, np.ndarray]] = []
+        pending_command: str | None = None
+        pending_rows: list[list[float]] = []
+
+        def flush() -> None:
+            if pending_rows:
+                groups.append(
+                    (pending_command, np.array(pending_rows, dtype=np.float64))
+                )
+
+        for command, parameters in parts:
+            if isinstance(parameters, np.ndarray):
+                flush()
+                pending_command, pending_rows = None, []
+                if parameters.shape[0] > 0:
+                    groups.append((command, parameters.astype(np.float64)))
+                continue
+
+            if command != pending_command:
+                flush()
+                pending_command, pending_rows = command, []
+            row: list[float] = []
+            for parameter in parameters:
+                if isinstance(parameter, (int, float)):
+                    row.append(parameter)
+                else:
+                    row.extend((parameter[0], parameter[1]))
+            pending_rows.append(row)
+        flush()
+
+        # Parameter-less commands still need one (empty) row per command
+        return [
+            (
+                command,
+                values.reshape(values.shape[0], len(PARAMETER_AXES[command.upper()])),
+            )
+            for command, values in groups
+        ]
+
+    @staticmethod
+    def _get_row_positions(
+        values: np.ndarray,
+        axes: np.ndarray,
+        position: np.ndarray,
+        is_relative: bool,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the current position before and after each command of a group.
+
+        Args:
+            values (np.ndarray): Parameters of the commands, of shape (N, number of parameters).
+            axes (np.ndarray): Axis of each parameter (see PARAMETER_AXES).
+            position (np.ndarray): Current position before the first command.
+            is_relative (bool): Whether the parameters are relative to the current position.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Positions before and after each command, of shape (N, 2).
+        """
+        ends = np.empty((values.shape[0], 2), dtype=values.dtype)
+        for axis in (0, 1):
+            columns = np.flatnonzero(axes == axis)
+            if columns.size == 0:
+                ends[:, axis] = position[axis]
+            elif is_relative:
+                ends[:, axis] = position[axis] + np.cumsum(values[:, columns[-1]])
+            else:
+                ends[:, axis] = values[:, columns[-1]]
+        starts = np.concatenate((position[np.newaxis, :], ends[:-1]))
+        return starts, ends
+
+    @staticmethod
+    def _round(values: np.ndarray, scale: int) -> np.ndarray:
+        """
+        Rounds values to integers scaled by the given factor.
+
+        Args:
+            values (np.ndarray): Values to round.
+            scale (int): Scale factor (10 to the power of the precision).
+
+        Raises:
+            ValueError: If a scaled value is too large.
+
+        Returns:
+            np.ndarray: Rounded scaled values.
+        """
+        scaled = np.rint(values * scale)
+        if scaled.size and np.abs(scaled).max() >= _MAX_SCALED_VALUE:
+            raise ValueError(
+                "The path data coordinates are too large for the precision."
+            )
+        return scaled.astype(np.int64)
+
+    @staticmethod
+    def _find_exact_precision(groups: list[tuple[str, np.ndarray]]) -> int:
+        """
+        Finds the smallest precision that represents all parameters exactly, up to MAX_PRECISION.
+
+        Args:
+            groups (list[tuple[str, np.ndarray]]): Commands with their parameters.
+
+        Returns:
+            int: The precision.
+        """
+        values = np.concatenate([values.ravel() for _, values in groups])
+        for precision in range(MAX_PRECISION):
+            scaled = values * 10**precision
+            if np.all(np.abs(scaled - np.rint(scaled)) < 1e-6):
+                return precision
+        return MAX_PRECISION
+
+    @staticmethod
+    def _estimate_lengths(values: np.ndarray, precision: int) -> np.ndarray:
+        """
+        Estimates the length of each row of scaled numbers in the compact syntax, separators included.
+
+        Args:
+            values (np.ndarray): Scaled values of shape (N, number of parameters).
+            precision (int): Number of decimals of the numbers.
+
+        Returns:
+            np.ndarray: Estimated length of each row.
+        """
+        integer_parts, _, fraction_digit_counts = PathDataEncoder._split_numbers(
+            np.abs(values), precision
+        )
+        has_fraction = fraction_digit_counts > 0
+        # Numbers below 1 are written without their leading zero
+        integer_lengths = np.where(
+            has_fraction & (integer_parts == 0),
+            0,
+            PathDataEncoder._count_digits(integer_parts),
+        )
+        # A negative sign replaces the separator
+        return (integer_lengths + has_fraction * (1 + fraction_digit_counts) + 1).sum(
+            axis=1
+        )
@@ -0,0 +1,358 @@
+import numpy as np
+
+
+class PathMerger:
+    """Class to join polylines whose ends meet into continuous polylines.
+
+    The endpoints are hashed into a grid with cells at least as large as the tolerance, so the endpoints
+    that meet are found by comparing each endpoint with a bounded number of endpoints of its cell and of the
+    neighbouring cells. The endpoints at the same point are joined first, a group at a time.
+    Each endpoint is joined to at most one other endpoint, the closest pairs first,
+    and the polylines are then chained along the joins, reversing them where needed.
+    """
+
+    # Neighbouring cells compared with each cell, half of them so that each pair of cells is compared once
+    NEIGHBOUR_OFFSETS = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+    # Number of endpoints of a neighbouring cell compared with an endpoint on either side of its position
+    CANDIDATE_WINDOW = 4
+    # Maximum number of cells along each axis, so that a cell fits in a 64-bit key
+    MAX_CELLS_PER_AXIS = 2**30
+
+    def __init__(self, tolerance: float = 0) -> None:
+        """
+        Initializes a new PathMerger object.
+
+        Args:
+            tolerance (float): Maximum distance between two endpoints that are joined. Defaults to 0 (same point).
+
+        Raises:
+            ValueError: If the tolerance is negative.
+        """
+        if tolerance < 0:
+            raise ValueError(f"The tolerance must not be negative, got {tolerance}.")
+        self._tolerance: float = tolerance
+
+    def merge_paths(self, paths: list[np.ndarray]) -> list[np.ndarray]:
+        """
+        Joins the polylines whose ends meet. Where the joined points are equal, only one of them is kept.
+
+        Polylines that form a loop are joined into a polyline ending at its first point.
+        Empty polylines are not joined, they are kept at the end.
+
+        Args:
+            paths (list[np.ndarray]): Arrays of points of shape (N, 2).
+
+        Raises:
+            ValueError: If a path is not an array of shape (N, 2).
+
+        Returns:
+            list[np.ndarray]: The joined polylines, in the order of their first polyline.
+        """
+        # Empty lists of points are arrays of shape (0,)
+        paths = [
+            np.asarray(path).reshape(-1, 2) if len(path) == 0 else np.asarray(path)
+            for path in paths
+        ]
+        for path in paths:
+            if path.ndim != 2 or path.shape[1] != 2:
+                raise ValueError(
+                    f"The points must be an array of shape (N, 2), got {path.shape}."
+                )
+        empty_paths = [path for path in paths if path.shape[0] == 0]
+        paths = [path for path in paths if path.shape[0] > 0]
+        if not paths:
+            return empty_paths
+
+        # Endpoint i < N is the first point of path i, endpoint N + i is its last point
+        endpoints = np.concatenate(
+            (
+                np.array([path[0] for path in paths], dtype=np.float64),
+                np.array([path[-1] for path in paths], dtype=np.float64),
+            )
+        )
+        partners = self._join_endpoints(endpoints)
+        endpoint_tuples = list(map(tuple, endpoints.tolist()))
+        return [
+            self._concatenate_chain(paths, endpoint_tuples, chain)
+            for chain in self._get_chains(partners)
+        ] + empty_paths
+
+    def _join_endpoints(self, endpoints: np.ndarray) -> list[int]:
+        """
+        Chooses the endpoints joined together, the closest pairs first.
+
+        The endpoints at the same point are joined first, a group at a time (see _join_coincident_endpoints).
+        Where the candidates of an endpoint were bounded (see _find_close_endpoints), the endpoints left free
+        are then searched again among themselves, until no more of them are joined.
+
+        Args:
+            endpoints (np.ndarray): First points then last points of the paths, of shape (2 * N, 2).
+
+        Returns:
+            list[int]: For each endpoint, the endpoint it is joined to, or -1.
+        """
+        path_count = len(endpoints) // 2
+        partners = self._join_coincident_endpoints(endpoints)
+        free_endpoints = np.flatnonzero(partners < 0)
+        partners = partners.tolist()
+        while len(free_endpoints) > 1:
+            first_endpoints, second_endpoints, is_complete = self._find_close_endpoints(
+                endpoints[free_endpoints]
+            )
+            first_endpoints, second_endpoints = (
+                np.minimum(
+                    free_endpoints[first_endpoints], free_endpoints[second_endpoints]
+                ),
+                np.maximum(
+                    free_endpoints[first_endpoints], free_endpoints[second_endpoints]
+                ),
+            )
+            # The two ends of a path are not joined together, the path would already be a loop
+            is_pair = first_endpoints % path_count != second_endpoints % path_count
+            first_endpoints = first_endpoints[is_pair]
+            second_endpoints = second_endpoints[is_pair]
+            squared_distances = np.square(
+                endpoints[first_endpoints] - endpoints[second_endpoints]
+            ).sum(axis=1)
+
+            join_count = 0
+            pair_order = np.lexsort(
+                (second_endpoints, first_endpoints, squared_distances)
+            )
+            for first, second in zip(
+                first_endpoints[pair_order].tolist(),
+                second_endpoints[pair_order].tolist(),
+            ):
+                if partners[first] < 0 and partners[second] < 0:
+                    partners[first] = second
+                    partners[second] = first
+                    join_count += 1
+            if is_complete or join_count == 0:
+                break
+            free_endpoints = free_endpoints[np.asarray(partners)[free_endpoints] < 0]
+        return partners
+
+    @staticmethod
+    def _join_coincident_endpoints(endpoints: np.ndarray) -> np.ndarray:
+        """
+        Joins the endpoints at the same point together, as many of them as possible.
+
+        The endpoints of a point are ordered by path, so that the two ends of a path are next to each other,
+        and the first half of them is joined to the second half. The two ends of a path are only joined together
+        when they are alone at their point, and then they are left free.
+
+        Args:
+            endpoints (np.ndarray): First points then last points of the paths, of shape (2 * N, 2).
+
+        Returns:
+            np.ndarray: For each endpoint, the endpoint it is joined to, or -1.
+        """
+        path_count = len(endpoints) // 2
+        endpoint_ids = np.arange(2 * path_count)
+        # By x then y as complex numbers, faster to sort than with lexsort, stable from the order by path
+        path_order = endpoint_ids.reshape(2, path_count).T.ravel()
+        points = endpoints[path_order, 0] + 1j * endpoints[path_order, 1]
+        endpoint_order = path_order[np.argsort(points, kind="stable")]
+        sorted_endpoints = endpoints[endpoint_order]
+        is_group_start = np.ones(len(endpoint_order), dtype=bool)
+        is_group_start[1:] = np.any(
+            sorted_endpoints[1:] != sorted_endpoints[:-1], axis=1
+        )
+        group_starts = np.flatnonzero(is_group_start)
+        group_sizes = np.diff(np.append(group_starts, len(endpoint_order)))
+        positions = endpoint_ids - np.repeat(group_starts, group_sizes)
+        # At least 2 apart in the groups of 3 or more endpoints, never the two ends of a path
+        shifts = np.repeat((group_sizes + 1) // 2, group_sizes)
+        is_first = positions < np.repeat(group_sizes, group_sizes) - shifts
+        firsts = endpoint_order[is_first]
+        seconds = endpoint_order[endpoint_ids[is_first] + shifts[is_first]]
+        is_pair = firsts % path_count != seconds % path_count
+
+        partners = np.full(2 * path_count, -1)
+        partners[firsts[is_pair]] = seconds[is_pair]
+        partners[seconds[is_pair]] = firsts[is_pair]
+        return partners
+
+    def _find_close_endpoints(
+        self, endpoints: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, bool]:
+        """
+        Finds the pairs of endpoints within the tolerance of each other, with a grid of cells.
+
+        The endpoints of each cell are sorted by position in the cell, and each endpoint is only compared with
+        the CANDIDATE_WINDOW endpoints of each neighbouring cell on either side of its own position,
+        so that the number of comparisons stays linear when many endpoints fall in the same cells
+        (e.g. a tolerance close to the size of the drawing).
+
+        Args:
+            endpoints (np.ndarray): Coordinates of the endpoints, of shape (M, 2).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, bool]: Indices of the first and second endpoints of each pair,
+                each pair found once or twice, and whether all the pairs were found (no candidate was left out).
+        """
+        min_point = endpoints.min(axis=0)
+        extent = float(np.ptp(endpoints, axis=0).max())
+        # Cells larger than the tolerance still find all the pairs, with more candidates to compare,
+        # and cells larger than the drawing would only lose the precision of the positions in the cells
+        cell_size = max(
+            min(self._tolerance, extent), extent / self.MAX_CELLS_PER_AXIS, 1e-12
+        )
+        positions = (endpoints - min_point) / cell_size
+        cells = np.floor(positions).astype(np.int64)
+        # Shifted by 1 so that the neighbours of the first cells do not have negative keys
+        key_factor = self.MAX_CELLS_PER_AXIS + 3
+        keys = (cells[:, 0] + 1) * key_factor + cells[:, 1] + 1
+        cell_keys, cell_ids = np.unique(keys, return_inverse=True)
+        # Cell then position in the cell, rounded to a fraction of the cell along each axis
+        sort_keys = (cell_ids << 32) + self._get_cell_position(positions, cells)
+        endpoint_order = np.argsort(sort_keys, kind="stable")
+        sorted_keys = sort_keys[endpoint_order]
+        cell_starts = np.searchsorted(sorted_keys, np.arange(len(cell_keys)) << 32)
+        cell_ends = np.append(cell_starts[1:], len(endpoint_order))
+
+        # In the sorted order from here on, the pairs are mapped back to the endpoints at the end
+        sorted_points = endpoints[endpoint_order]
+        sorted_cell_keys = keys[endpoint_order]
+        sorted_positions = positions[endpoint_order]
+        sorted_cells = cells[endpoint_order]
+        sorted_ids = np.arange(len(endpoint_order))
+
+        squared_tolerance = self._tolerance**2
+        is_complete = True
+        first_endpoints, second_endpoints = [], []
+        for dx, dy in self.NEIGHBOUR_OFFSETS:
+            neighbour_keys = sorted_cell_keys + dx * key_factor + dy
+            neighbour_cells = np.minimum(
+                np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1
+            )
+            is_neighbour = cell_keys[neighbour_cells] == neighbour_keys
+            lows = np.where(is_neighbour, cell_starts[neighbour_cells], 0)
+            highs = np.where(is_neighbour, cell_ends[neighbour_cells], 0)
+            if (dx, dy) == (0, 0):
+                middles = sorted_ids
+            else:
+                # Position of the endpoint relative to the neighbouring cell, at its side if outside
+                middles = np.searchsorted(
+                    sorted_keys,
+                    (neighbour_cells << 32)
+                    + self._get_cell_position(
+                        sorted_positions, sorted_cells + (dx, dy)
+                    ),
+                )
+            starts = np.clip(middles - self.CANDIDATE_WINDOW, lows, highs)
+            counts = np.clip(middles + self.CANDIDATE_WINDOW, lows, highs) - starts
+            is_complete &= bool(np.all(counts == highs - lows))
+            # Each endpoint with the candidates of the neighbouring cell
+            firsts = np.repeat(sorted_ids, counts)
+            seconds = np.arange(firsts.size) + np.repeat(
+                starts - (np.cumsum(counts) - counts), counts
+            )
+            is_pair = (
+                np.square(sorted_points[firsts] - sorted_points[seconds]).sum(axis=1)
+                <= squared_tolerance
+            )
+            first_endpoints.append(firsts[is_pair])
+            second_endpoints.append(seconds[is_pair])
+        return (
+            endpoint_order[np.concatenate(first_endpoints)],
+            endpoint_order[np.concatenate(second_endpoints)],
+            is_complete,
+        )
+
+    @staticmethod
+    def _get_cell_position(positions: np.ndarray, cells: np.ndarray) -> np.ndarray:
+        """
+        Encodes the positions of points in cells as integers, increasing along x then y.
+
+        Args:
+            positions (np.ndarray): Coordinates of the points in units of cells, of shape (M, 2).
+            cells (np.ndarray): Cells of the points, of shape (M, 2). Points outside their cell are moved to its side.
+
+        Returns:
+            np.ndarray: The positions, below 2**32.
+        """
+        fractions = np.clip(
+            ((positions - cells) * 2**16).astype(np.int64), 0, 2**16 - 1
+        )
+        return (fractions[:, 0] << 16) + fractions[:, 1]
+
+    @staticmethod
+    def _get_chains(partners: list[int]) -> list[list[tuple[int, bool]]]:
+        """
+        Follows the joins from path to path.
+
+        Args:
+            partners (list[int]): For each endpoint, the endpoint it is joined to, or -1.
+
+        Returns:
+            list[list[tuple[int, bool]]]: For each chain, its paths and whether each of them is reversed,
+                the chains ordered by their first path.
+        """
+        path_count = len(partners) // 2
+        is_visited = [False] * path_count
+        chains: list[list[tuple[int, bool]]] = []
+
+        def follow(path_id: int, is_reversed: bool) -> list[tuple[int, bool]]:
+            chain = []
+            while not is_visited[path_id]:
+                is_visited[path_id] = True
+                chain.append((path_id, is_reversed))
+                # The last point of a reversed path is its first endpoint
+                next_endpoint = partners[
+                    path_id if is_reversed else path_count + path_id
+                ]
+                if next_endpoint < 0:
+                    break
+                path_id = next_endpoint % path_count
+                # Entering a path by its last point reverses it
+                is_reversed = next_endpoint >= path_count
+            return chain
+
+        # Chains start at a path with a free end, the remaining paths form loops
+        for path_id in range(path_count):
+            if not is_visited[path_id] and partners[path_id] < 0:
+                chains.append(follow(path_id, False))
+            elif not is_visited[path_id] and partners[path_count + path_id] < 0:
+                chains.append(follow(path_id, True))
+        for path_id in range(path_count):
+            if not is_visited[path_id]:
+                chains.append(follow(path_id, False))
+        chains.sort(key=lambda chain: min(path_id for path_id, _ in chain))
+        return chains
+
+    @staticmethod
+    def _concatenate_chain(
+        paths: list[np.ndarray],
+        endpoints: list[tuple[float, float]],
+        chain: list[tuple[int, bool]],
+    ) -> np.ndarray:
+        """
+        Concatenates the points of the paths of a chain.
+
+        Args:
+            paths (list[np.ndarray]): Arrays of points of shape (N, 2).
+            endpoints (list[tuple[float, float]]): First points then last points of the paths.
+            chain (list[tuple[int, bool]]): Paths of the chain and whether each of them is reversed.
+
+        Returns:
+            np.ndarray: The points of the chain.
+        """
+        if len(chain) == 1:
+            path_id, is_reversed = chain[0]
+            return paths[path_id][::-1] if is_reversed else paths[path_id]
+
+        path_count = len(paths)
+        pieces = []
+        previous_last_point = None
+        for path_id, is_reversed in chain:
+            piece = paths[path_id][::-1] if is_reversed else paths[path_id]
+            first_point = endpoints[path_count + path_id if is_reversed else path_id]
+            if first_point == previous_last_point:
+                piece = piece[1:]
+            if len(piece):
+                pieces.append(piece)
+            previous_last_point = endpoints[
+                path_id if is_reversed else path_count + path_id
+            ]
+        return np.concatenate(pieces)
@@ -0,0 +1,376 @@
+import math
+
+import numpy as np
+
+
+class PathOrderer:
+    """Class to order paths and choose their direction to reduce the pen-up travel between them.
+
+    The order is built greedily, always going to the nearest endpoint of the remaining paths (found with a grid index),
+    then improved with 2-opt moves, which reverse a run of consecutive paths (order and direction).
+    The 2-opt moves are limited to runs of at most `window` paths, so that all the moves of a pass
+    are evaluated together with vectorized operations.
+    """
+
+    def __init__(
+        self,
+        start: tuple[float, float] = (0, 0),
+        window: int = 32,
+        max_passes: int = 50,
+    ) -> None:
+        """
+        Initializes a new PathOrderer object.
+
+        Args:
+            start (tuple[float, float]): Position of the pen before the first path. Defaults to (0, 0).
+            window (int): Maximum number of consecutive paths reversed by a 2-opt move. Defaults to 32.
+            max_passes (int): Maximum number of 2-opt passes. Defaults to 50.
+
+        Raises:
+            ValueError: If the window or the maximum number of passes is not positive.
+        """
+        if window < 1 or max_passes < 0:
+            raise ValueError(
+                f"The window must be positive and the maximum number of passes not negative, got {window} and {max_passes}."
+            )
+        self._start: np.ndarray = np.array(start, dtype=np.float64)
+        self._window: int = window
+        self._max_passes: int = max_passes
+
+    def order(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Orders paths given by their endpoints.
+
+        Args:
+            starts (np.ndarray): First point of each path, of shape (N, 2).
+            ends (np.ndarray): Last point of each path, of shape (N, 2). Closed paths have the same start and end.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Indices of the paths in their new order,
+                and whether each of them (in the new order) is drawn in reverse.
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+        order, is_reversed = self._order_greedily(starts, ends)
+        return self._improve_with_2_opt(starts, ends, order, is_reversed)
+
+    def order_paths(
+        self, paths: list[np.ndarray], is_closed_path: bool = False
+    ) -> list[np.ndarray]:
+        """
+        Orders paths and reverses some of them to reduce the pen-up travel.
+
+        Args:
+            paths (list[np.ndarray]): Arrays of points of shape (N, 2).
+            is_closed_path (bool): Whether the paths are closed, the pen going back to their first point. Defaults to False.
+
+        Returns:
+            list[np.ndarray]: The paths in their new order, some of them reversed.
+        """
+        # Empty paths do not move the pen, they are kept at the end
+        non_empty_paths = [path for path in paths if len(path) > 0]
+        empty_paths = [path for path in paths if len(path) == 0]
+        order, is_reversed = self.order(
+            *self.get_endpoints(non_empty_paths, is_closed_path)
+        )
+        return [
+            non_empty_paths[index][::-1] if reverse else non_empty_paths[index]
+            for index, reverse in zip(order.tolist(), is_reversed.tolist())
+        ] + empty_paths
+
+    def get_travel(
+        self, paths: list[np.ndarray], is_closed_path: bool = False
+    ) -> float:
+        """
+        Computes the pen-up travel to draw paths in the given order, from the start position.
+
+        Args:
+            paths (list[np.ndarray]): Arrays of points of shape (N, 2).
+            is_closed_path (bool): Whether the paths are closed, the pen going back to their first point. Defaults to False.
+
+        Returns:
+            float: Sum of the distances between the end of each path and the start of the next one.
+        """
+        starts, ends = self.get_endpoints(paths, is_closed_path)
+        previous_ends = np.concatenate((self._start[np.newaxis, :], ends[:-1]))
+        return float(np.hypot(*(starts - previous_ends).T).sum())
+
+    def get_endpoints(
+        self, paths: list[np.ndarray], is_closed_path: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Gets the first and last points of paths. Empty paths start and end where the previous path ends.
+
+        Args:
+            paths (list[np.ndarray]): Arrays of points of shape (N, 2).
+            is_closed_path (bool): Whether the paths are closed, so that they end at their first point. Defaults to False.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: First and last points of the paths, of shape (number of paths, 2).
+        """
+        is_empty = np.array([len(path) == 0 for path in paths], dtype=bool)
+        starts = np.zeros((len(paths), 2), dtype=np.float64)
+        ends = np.zeros((len(paths), 2), dtype=np.float64)
+        for index in np.flatnonzero(~is_empty).tolist():
+            starts[index] = paths[index][0]
+            ends[index] = paths[index][0 if is_closed_path else -1]
+        # Empty paths do not move the pen
+        for index in np.flatnonzero(is_empty).tolist():
+            starts[index] = ends[index] = ends[index - 1] if index > 0 else self._start
+        return starts, ends
+
+    def _order_greedily(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Orders paths by always going to the nearest endpoint of the remaining paths.
+
+        Args:
+            starts (np.ndarray): First point of each path, of shape (N, 2).
+            ends (np.ndarray): Last point of each path, of shape (N, 2).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Indices of the paths in their new order,
+                and whether each of them (in the new order) is drawn in reverse.
+        """
+        path_count = starts.shape[0]
+        is_closed = np.all(starts == ends, axis=1)
+        # Endpoint i < N is the start of path i, endpoint N + i is the end of path i (except for closed paths)
+        endpoint_ids = np.concatenate(
+            (np.arange(path_count), path_count + np.flatnonzero(~is_closed))
+        )
+        endpoints = np.concatenate((starts, ends))
+
+        order = np.empty(path_count, dtype=np.int64)
+        is_reversed = np.zeros(path_count, dtype=bool)
+        grid = _EndpointGrid(endpoints, endpoint_ids)
+        x, y = self._start.tolist()
+        for position in range(path_count):
+            if grid.count * 4 < grid.built_count:
+                # Fewer, larger cells, so that the search does not go through many empty cells
+                grid = _EndpointGrid(endpoints, grid.get_endpoint_ids())
+            endpoint_id = grid.find_nearest(x, y)
+            path_id = endpoint_id % path_count
+            grid.remove(path_id)
+            if not is_closed[path_id]:
+                grid.remove(path_count + path_id)
+            order[position] = path_id
+            is_reversed[position] = endpoint_id >= path_count
+            x, y = (starts if is_reversed[position] else ends)[path_id].tolist()
+        return order, is_reversed
+
+    def _improve_with_2_opt(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        order: np.ndarray,
+        is_reversed: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Improves an order with 2-opt moves, reversing runs of up to `window` consecutive paths.
+
+        At each pass, the gain of all the moves is computed, and the best moves that do not overlap are applied.
+
+        Args:
+            starts (np.ndarray): First point of each path, of shape (N, 2).
+            ends (np.ndarray): Last point of each path, of shape (N, 2).
+            order (np.ndarray): Indices of the paths in their current order.
+            is_reversed (np.ndarray): Whether each path (in the current order) is drawn in reverse.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The improved order and directions.
+        """
+        path_count = order.size
+        if path_count == 0:
+            return order, is_reversed
+        order = order.copy()
+        is_reversed = is_reversed.copy()
+        for _ in range(self._max_passes):
+            ordered_starts = np.where(
+                is_reversed[:, np.newaxis], ends[order], starts[order]
+            )
+            ordered_ends = np.where(
+                is_reversed[:, np.newaxis], starts[order], ends[order]
+            )
+            previous_ends = np.concatenate(
+                (self._start[np.newaxis, :], ordered_ends[:-1])
+            )
+            start_x, start_y = ordered_starts.T.copy()
+            end_x, end_y = ordered_ends.T.copy()
+            previous_x, previous_y = previous_ends.T.copy()
+            # Pen-up travel to each path, and 0 after the last one
+            links = np.append(np.hypot(start_x - previous_x, start_y - previous_y), 0)
+
+            move_firsts, move_lasts, move_gains = [], [], []
+            for length in range(1, min(self._window, path_count) + 1):
+                # Reversing the paths first to last replaces the links previous end -> first start
+                # and last end -> next start with previous end -> last end and first start -> next start
+                move_count = path_count - length + 1
+                gains = links[:move_count] + links[length : length + move_count]
+                gains -= np.hypot(
+                    previous_x[:move_count] - end_x[length - 1 :],
+                    previous_y[:move_count] - end_y[length - 1 :],
+                )
+                gains[:-1] -= np.hypot(
+                    start_x[: move_count - 1] - start_x[length:],
+                    start_y[: move_count - 1] - start_y[length:],
+                )
+                firsts = np.flatnonzero(gains > 1e-9)
+                move_firsts.append(firsts)
+                move_lasts.append(firsts + length - 1)
+                move_gains.append(gains[firsts])
+
+            move_gains = np.concatenate(move_gains)
+            if move_gains.size == 0:
+                break
+            move_firsts = np.concatenate(move_firsts)
+            move_lasts = np.concatenate(move_lasts)
+
+            # Moves that share a path or a link between paths cannot be applied together
+            is_touched = np.zeros(path_count + 1, dtype=bool)
+            for move in np.argsort(-move_gains, kind="stable").tolist():
+                first, last = int(move_firsts[move]), int(move_lasts[move])
+                if is_touched[first : last + 2].any():
+                    continue
+                is_touched[first : last + 2] = True
+                order[first : last + 1] = order[first : last + 1][::-1]
+                is_reversed[first : last + 1] = ~is_reversed[first : last + 1][::-1]
+        # A closed path starts and ends at its first point in either direction, a reversed copy would not
+        is_reversed &= np.any(starts[order] != ends[order], axis=1)
+        return order, is_reversed
+
+
+class _EndpointGrid:
+    """Uniform grid over the endpoints of paths, to find the nearest endpoint to a position."""
+
+    def __init__(self, endpoints: np.ndarray, endpoint_ids: np.ndarray) -> None:
+        """
+        Initializes a new _EndpointGrid object.
+
+        Args:
+            endpoints (np.ndarray): Coordinates of all the endpoints, of shape (M, 2).
+            endpoint_ids (np.ndarray): Indices of the endpoints to put in the grid.
+        """
+        points = endpoints[endpoint_ids]
+        self._x: list[float] = endpoints[:, 0].tolist()
+        self._y: list[float] = endpoints[:, 1].tolist()
+        self._min_x, self._min_y = (
+            points.min(axis=0).tolist() if len(points) else (0.0, 0.0)
+        )
+        extent = float(np.ptp(points, axis=0).max()) if len(points) else 0.0
+        # About one endpoint per cell
+        self._cell_size: float = max(extent / math.sqrt(max(len(points), 1)), 1e-9)
+        self._column_count: int = (
+            int(np.ptp(points[:, 0]) / self._cell_size) + 1 if len(points) else 1
+        )
+        self._row_count: int = (
+            int(np.ptp(points[:, 1]) / self._cell_size) + 1 if len(points) else 1
+        )
+
+        self._cells: list[list[int]] = [
+            [] for _ in range(self._column_count * self._row_count)
+        ]
+        self._cell_of: dict[int, int] = {}
+        self._position_in_cell: dict[int, int] = {}
+        for endpoint_id in endpoint_ids.tolist():
+            cell = self._get_cell(self._x[endpoint_id], self._y[endpoint_id])
+            self._cell_of[endpoint_id] = cell
+            self._position_in_cell[endpoint_id] = len(self._cells[cell])
+            self._cells[cell].append(endpoint_id)
+        self.built_count: int = len(endpoint_ids)
+        self.count: int = len(endpoint_ids)
+
+    def get_endpoint_ids(self) -> np.ndarray:
+        """
+        Gets the endpoints remaining in the grid.
+
+        Returns:
+            np.ndarray: Indices of the remaining endpoints.
+        """
+        return np.fromiter(self._cell_of, dtype=np.int64, count=len(self._cell_of))
+
+    def remove(self, endpoint_id: int) -> None:
+        """
+        Removes an endpoint from the grid.
+
+        Args:
+            endpoint_id (int): Index of the endpoint.
+        """
+        cell = self._cells[self._cell_of.pop(endpoint_id)]
+        position = self._position_in_cell.pop(endpoint_id)
+        last_endpoint_id = cell.pop()
+        if last_endpoint_id != endpoint_id:
+            cell[position] = last_endpoint_id
+            self._position_in_cell[last_endpoint_id] = position
+        self.count -= 1
+
+    def find_nearest(self, x: float, y: float) -> int:
+        """
+        Finds the nearest endpoint to a position, searching the cells ring by ring around it.
+
+        Args:
+            x (float): x coordinate of the position.
+            y (float): y coordinate of the position.
+
+        Returns:
+            int: Index of the nearest endpoint.
+        """
+        cell_size = self._cell_size
+        column = min(
+            max(int((x - self._min_x) // cell_size), 0), self._column_count - 1
+        )
+        row = min(max(int((y - self._min_y) // cell_size), 0), self._row_count - 1)
+        # The position can be outside the grid, then the rings are counted from the nearest cell
+        # and all the endpoints are at least as far as the grid
+        outside_distance = math.hypot(
+            max(self._min_x - x, x - (self._min_x + self._column_count * cell_size), 0),
+            max(self._min_y - y, y - (self._min_y + self._row_count * cell_size), 0),
+        )
+
+        best_endpoint_id = -1
+        best_squared_distance = math.inf
+        max_ring = max(self._column_count, self._row_count)
+        for ring in range(max_ring + 1):
+            for cell_column in range(column - ring, column + ring + 1):
+                if not 0 <= cell_column < self._column_count:
+                    continue
+                is_edge_column = abs(cell_column - column) == ring
+                row_step = 1 if is_edge_column else 2 * ring
+                for cell_row in range(row - ring, row + ring + 1, max(row_step, 1)):
+                    if not 0 <= cell_row < self._row_count:
+                        continue
+                    for endpoint_id in self._cells[
+                        cell_column * self._row_count + cell_row
+                    ]:
+                        dx = self._x[endpoint_id] - x
+                        dy = self._y[endpoint_id] - y
+                        squared_distance = dx * dx + dy * dy
+                        if squared_distance < best_squared_distance:
+                            best_squared_distance = squared_distance
+                            best_endpoint_id = endpoint_id
+            # Endpoints in the next rings are at least this far
+            min_next_distance = max(outside_distance, ring * cell_size)
+            if best_endpoint_id >= 0 and best_squared_distance <= min_next_distance**2:
+                break
+        return best_endpoint_id
+
+    def _get_cell(self, x: float, y: float) -> int:
+        """
+        Gets the cell of a position inside the grid.
+
+        Args:
+            x (float): x coordinate of the position.
+            y (float): y coordinate of the position.
+
+        Returns:
+            int: Index of the cell.
+        """
+        column = min(int((x - self._min_x) // self._cell_size), self._column_count - 1)
+        row = min(int((y - self._min_y) // self._cell_size), self._row_count - 1)
+        return column * self._row_count + row
@@ -0,0 +1,191 @@
+import numpy as np
+
+
+class PathSimplifier:
+    """Class to simplify polylines with the Ramer–Douglas–Peucker algorithm.
+
+    Instead of recursing on each segment, all the segments of all the paths that still have to be split
+    are processed together with vectorized operations, one level of the recursion at a time.
+    """
+
+    # Segments with more inner points are also split at their middle point when they are split.
+    # With some shapes (e.g. spirals) the farthest point is always close to an end of the segment,
+    # so the number of levels would grow with the number of points. Keeping an extra point never
+    # moves the polyline further than the tolerance from the removed points.
+    MIDDLE_SPLIT_MIN_POINTS = 4096
+
+    def __init__(self, tolerance: float) -> None:
+        """
+        Initializes a new PathSimplifier object.
+
+        Args:
+            tolerance (float): Maximum distance between a removed point and the simplified polyline.
+
+        Raises:
+            ValueError: If the tolerance is negative.
+        """
+        if tolerance < 0:
+            raise ValueError(f"The tolerance must not be negative, got {tolerance}.")
+        self._tolerance: float = tolerance
+
+    def simplify(self, points: np.ndarray) -> np.ndarray:
+        """
+        Simplifies a polyline.
+
+        Args:
+            points (np.ndarray): Array of points of shape (N, 2).
+
+        Returns:
+            np.ndarray: The kept points, in their original order and type.
+        """
+        return self.simplify_paths([points])[0]
+
+    def simplify_paths(self, paths: list[np.ndarray]) -> list[np.ndarray]:
+        """
+        Simplifies several polylines at once. The first and last points of each polyline are always kept.
+
+        Args:
+            paths (list[np.ndarray]): Arrays of points of shape (N, 2).
+
+        Raises:
+            ValueError: If a path is not an array of shape (N, 2).
+
+        Returns:
+            list[np.ndarray]: The kept points of each polyline, in their original order and type.
+        """
+        # Empty lists of points are arrays of shape (0,)
+        paths = [
+            np.asarray(path).reshape(-1, 2) if len(path) == 0 else np.asarray(path)
+            for path in paths
+        ]
+        for path in paths:
+            if path.ndim != 2 or path.shape[1] != 2:
+                raise ValueError(
+                    f"The points must be an array of shape (N, 2), got {path.shape}."
+                )
+        if not paths:
+            return []
+
+        path_lengths = np.array([path.shape[0] for path in paths], dtype=np.int64)
+        path_ends = np.cumsum(path_lengths)
+        path_starts = path_ends - path_lengths
+        # Separate coordinates, faster to gather than rows of points
+        x, y = np.concatenate(paths).astype(np.float64).T.copy()
+
+        is_kept = np.zeros(x.size, dtype=bool)
+        is_kept[path_starts[path_lengths > 0]] = True
+        is_kept[path_ends[path_lengths > 0] - 1] = True
+
+        # Segments to split, as indices of their first and last points
+        segment_starts = path_starts[path_lengths > 2]
+        segment_ends = path_ends[path_lengths > 2] - 1
+        while segment_starts.size > 0:
+            split_indices, is_split = self._find_farthest_points(
+                x, y, segment_starts, segment_ends
+            )
+            split_indices = split_indices[is_split]
+            segment_starts = segment_starts[is_split]
+            segment_ends = segment_ends[is_split]
+            middle_indices = np.where(
+                segment_ends - segment_starts > self.MIDDLE_SPLIT_MIN_POINTS,
+                (segment_starts + segment_ends) // 2,
+                split_indices,
+            )
+            first_indices = np.minimum(split_indices, middle_indices)
+            second_indices = np.maximum(split_indices, middle_indices)
+            is_kept[first_indices] = True
+            is_kept[second_indices] = True
+            segment_starts, segment_ends = (
+                np.concatenate((segment_starts, first_indices, second_indices)),
+                np.concatenate((first_indices, second_indices, segment_ends)),
+            )
+            has_inner_points = segment_ends - segment_starts > 1
+            segment_starts = segment_starts[has_inner_points]
+            segment_ends = segment_ends[has_inner_points]
+
+        return [
+            path[is_kept[start:end]]
+            for path, start, end in zip(paths, path_starts, path_ends)
+        ]
+
+    def _find_farthest_points(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        segment_starts: np.ndarray,
+        segment_ends: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the inner point of each segment that is the farthest from the segment.
+
+        Args:
+            x (np.ndarray): x coordinates of the points of all the paths.
+            y (np.ndarray): y coordinates of the points of all the paths.
+            segment_starts (np.ndarray): Index of the first point of each segment.
+            segment_ends (np.ndarray): Index of the last point of each segment, with at least one inner point.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Index of the farthest inner point of each segment,
+                and whether it is farther than the tolerance.
+        """
+        inner_counts = segment_ends - segment_starts - 1
+        segment_offsets = np.cumsum(inner_counts) - inner_counts
+        segment_ids = np.repeat(np.arange(segment_starts.size), inner_counts)
+        inner_indices = (
+            np.arange(segment_ids.size)
+            - segment_offsets[segment_ids]
+            + segment_starts[segment_ids]
+            + 1
+        )
+
+        start_x = x[segment_starts][segment_ids]
+        start_y = y[segment_starts][segment_ids]
+        squared_distances = self._get_squared_distances_to_segments(
+            x[inner_indices] - start_x,
+            y[inner_indices] - start_y,
+            x[segment_ends][segment_ids] - start_x,
+            y[segment_ends][segment_ids] - start_y,
+        )
+        max_squared_distances = np.maximum.reduceat(squared_distances, segment_offsets)
+
+        # First inner point reaching the maximum distance of its segment (the positions are sorted by segment)
+        farthest_positions = np.flatnonzero(
+            squared_distances == max_squared_distances[segment_ids]
+        )
+        farthest_segment_ids = segment_ids[farthest_positions]
+        is_first = np.ones(farthest_positions.size, dtype=bool)
+        is_first[1:] = farthest_segment_ids[1:] != farthest_segment_ids[:-1]
+        split_indices = inner_indices[farthest_positions[is_first]]
+        return split_indices, max_squared_distances > self._tolerance**2
+
+    @staticmethod
+    def _get_squared_distances_to_segments(
+        offset_x: np.ndarray,
+        offset_y: np.ndarray,
+        direction_x: np.ndarray,
+        direction_y: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Computes the squared distance of each point to its segment, both given relative to the start of the segment.
+
+        Args:
+            offset_x (np.ndarray): x coordinates of the points relative to the start of their segment.
+            offset_y (np.ndarray): y coordinates of the points relative to the start of their segment.
+            direction_x (np.ndarray): x coordinates of the ends of the segments relative to their start.
+            direction_y (np.ndarray): y coordinates of the ends of the segments relative to their start.
+
+        Returns:
+            np.ndarray: Squared distance of each point to its segment.
+        """
+        squared_lengths = direction_x * direction_x + direction_y * direction_y
+        # Position of the projection on the segment, clamped to the segment (0 for degenerate segments)
+        projections = np.divide(
+            offset_x * direction_x + offset_y * direction_y,
+            squared_lengths,
+            out=np.zeros_like(squared_lengths),
+            where=squared_lengths > 0,
+        )
+        np.clip(projections, 0, 1, out=projections)
+        offset_x -= projections * direction_x
+        offset_y -= projections * direction_y
+        return offset_x * offset_x + offset_y * offset_y
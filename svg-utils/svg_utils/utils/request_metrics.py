@@ -0,0 +1,343 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# Timer of the request handled by the current thread, if its route is instrumented
+_current_timer: ContextVar["RequestTimer | None"] = ContextVar(
+    "current_timer", default=None
+)
+
+
+class RequestTimer:
+    """Durations of the stages of a request, with the size of its payload and its number of points.
+
+    The stages are timed with time_stage by the code handling the request, once the timer is activated
+    for the current thread with activate_timer. Stages with the same name add up, and stages can be nested
+    (e.g. "encode" is part of "generate").
+    """
+
+    def __init__(self) -> None:
+        """Initializes a new RequestTimer object, starting the duration of the request."""
+        self._start: float = time.perf_counter()
+        self.stage_durations: dict[str, float] = {}
+        self.payload_bytes: int = 0
+        self.point_count: int = 0
+
+    def get_duration(self) -> float:
+        """
+        Gets the time elapsed since the timer was created.
+
+        Returns:
+            float: The duration in seconds.
+        """
+        return time.perf_counter() - self._start
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Times a stage of the request.
+
+        Args:
+            name (str): Name of the stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage_duration(name, time.perf_counter() - start)
+
+    def add_stage_duration(self, name: str, duration: float) -> None:
+        """
+        Adds a duration to a stage of the request.
+
+        Args:
+            name (str): Name of the stage.
+            duration (float): The duration in seconds.
+        """
+        self.stage_durations[name] = self.stage_durations.get(name, 0) + duration
+
+    def get_server_timing(self) -> str:
+        """
+        Formats the durations of the stages as the value of a Server-Timing header.
+
+        Returns:
+            str: The stages with their durations in milliseconds, e.g. "parse;dur=1.25, validate;dur=3.50".
+        """
+        return ", ".join(
+            f"{name};dur={duration * 1000:.2f}"
+            for name, duration in self.stage_durations.items()
+        )
+
+
+@contextmanager
+def activate_timer(timer: RequestTimer) -> Iterator[None]:
+    """
+    Makes a timer the timer of the current thread, so that time_stage records its stages.
+
+    Args:
+        timer (RequestTimer): The timer of the request.
+    """
+    token = _current_timer.set(timer)
+    try:
+        yield
+    finally:
+        _current_timer.reset(token)
+
+
+@contextmanager
+def time_stage(name: str) -> Iterator[None]:
+    """
+    Times a stage of the request handled by the current thread. Does nothing if no timer is active,
+    e.g. in the worker processes or when the route is not instrumented.
+
+    Args:
+        name (str): Name of the stage.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def record_stage_duration(name: str, duration: float) -> None:
+    """
+    Adds a duration measured by the caller to a stage of the request handled by the current thread,
+    if a timer is active. For stages made of many short steps, where time_stage around each step would cost
+    about as much as the step itself.
+
+    Args:
+        name (str): Name of the stage.
+        duration (float): The duration in seconds.
+    """
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add_stage_duration(name, duration)
+
+
+def record_point_count(point_count: int) -> None:
+    """
+    Records the number of points of the request handled by the current thread, if a timer is active.
+
+    Args:
+        point_count (int): Number of points of the request.
+    """
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.point_count = point_count
+
+
+class _Histogram:
+    """Cumulative histogram of observations by label values, in the Prometheus text format."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...],
+        buckets: tuple[float, ...],
+    ) -> None:
+        """
+        Initializes a new _Histogram object.
+
+        Args:
+            name (str): Name of the metric.
+            description (str): Description of the metric.
+            label_names (tuple[str, ...]): Names of the labels.
+            buckets (tuple[float, ...]): Upper bounds of the buckets, in increasing order.
+        """
+        self._name: str = name
+        self._description: str = description
+        self._label_names: tuple[str, ...] = label_names
+        self._buckets: tuple[float, ...] = buckets
+        # Count of each bucket (not cumulative, with the +Inf bucket last) and sum, by label values
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, label_values: tuple[str, ...], value: float) -> None:
+        """
+        Adds an observation. Not thread-safe, the caller holds the lock of the metrics.
+
+        Args:
+            label_values (tuple[str, ...]): Values of the labels.
+            value (float): The observed value.
+        """
+        counts = self._counts.setdefault(label_values, [0] * (len(self._buckets) + 1))
+        bucket_index = next(
+            (
+                index
+                for index, upper_bound in enumerate(self._buckets)
+                if value <= upper_bound
+            ),
+            len(self._buckets),
+        )
+        counts[bucket_index] += 1
+        self._sums[label_values] = self._sums.get(label_values, 0) + value
+
+    def render(self) -> list[str]:
+        """
+        Formats the histogram in the Prometheus text format.
+
+        Returns:
+            list[str]: The lines of the histogram.
+        """
+        lines = [
+            f"# HELP {self._name} {self._description}",
+            f"# TYPE {self._name} histogram",
+        ]
+        for label_values in sorted(self._counts):
+            labels = _format_labels(self._label_names, label_values)
+            cumulative_count = 0
+            for upper_bound, count in zip(
+                (*self._buckets, math.inf), self._counts[label_values]
+            ):
+                cumulative_count += count
+                bucket_labels = _format_labels(
+                    (*self._label_names, "le"),
+                    (*label_values, _format_value(upper_bound)),
+                )
+                lines.append(f"{self._name}_bucket{bucket_labels} {cumulative_count}")
+            lines.append(
+                f"{self._name}_sum{labels} {_format_value(self._sums[label_values])}"
+            )
+            lines.append(f"{self._name}_count{labels} {cumulative_count}")
+        return lines
+
+
+class RequestMetrics:
+    """Thread-safe metrics of the requests, exposed in the Prometheus text format.
+
+    For each route, the metrics are the number of requests by status, and the histograms of the request
+    durations, of the stage durations, of the payload sizes and of the numbers of points.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+    # Upper bounds of the buckets of the durations, in seconds
+    DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    # Upper bounds of the buckets of the payload sizes, in bytes
+    PAYLOAD_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8)
+    # Upper bounds of the buckets of the numbers of points
+    POINT_BUCKETS = (1e2, 1e3, 1e4, 1e5, 1e6, 1e7)
+
+    def __init__(self, prefix: str = "svg_utils") -> None:
+        """
+        Initializes a new RequestMetrics object.
+
+        Args:
+            prefix (str): Prefix of the names of the metrics. Defaults to "svg_utils".
+        """
+        self._prefix: str = prefix
+        self._request_counts: dict[tuple[str, str], int] = {}
+        self._request_durations: _Histogram = _Histogram(
+            f"{prefix}_request_duration_seconds",
+            "Duration of the requests, until the response is fully generated.",
+            ("route",),
+            self.DURATION_BUCKETS,
+        )
+        self._stage_durations: _Histogram = _Histogram(
+            f"{prefix}_request_stage_duration_seconds",
+            "Duration of the stages of the requests.",
+            ("route", "stage"),
+            self.DURATION_BUCKETS,
+        )
+        self._payload_sizes: _Histogram = _Histogram(
+            f"{prefix}_request_payload_bytes",
+            "Size of the request bodies.",
+            ("route",),
+            self.PAYLOAD_BUCKETS,
+        )
+        self._point_counts: _Histogram = _Histogram(
+            f"{prefix}_request_points",
+            "Number of points of the requests.",
+            ("route",),
+            self.POINT_BUCKETS,
+        )
+        self._lock: threading.Lock = threading.Lock()
+
+    def observe(self, route: str, status: int, timer: RequestTimer) -> None:
+        """
+        Records a finished request.
+
+        Args:
+            route (str): Route of the request, e.g. "/generate-single-path".
+            status (int): Status code of the response.
+            timer (RequestTimer): Timer of the request.
+        """
+        duration = timer.get_duration()
+        with self._lock:
+            count_key = (route, str(status))
+            self._request_counts[count_key] = self._request_counts.get(count_key, 0) + 1
+            self._request_durations.observe((route,), duration)
+            for stage, stage_duration in timer.stage_durations.items():
+                self._stage_durations.observe((route, stage), stage_duration)
+            self._payload_sizes.observe((route,), timer.payload_bytes)
+            if timer.point_count:
+                self._point_counts.observe((route,), timer.point_count)
+
+    def render(self) -> str:
+        """
+        Formats the metrics in the Prometheus text format.
+
+        Returns:
+            str: The metrics.
+        """
+        name = f"{self._prefix}_requests_total"
+        lines = [
+            f"# HELP {name} Number of requests by route and status.",
+            f"# TYPE {name} counter",
+        ]
+        with self._lock:
+            for route, status in sorted(self._request_counts):
+                labels = _format_labels(("route", "status"), (route, status))
+                lines.append(f"{name}{labels} {self._request_counts[route, status]}")
+            for histogram in (
+                self._request_durations,
+                self._stage_durations,
+                self._payload_sizes,
+                self._point_counts,
+            ):
+                lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """
+    Formats labels in the Prometheus text format, escaping their values.
+
+    Args:
+        names (tuple[str, ...]): Names of the labels.
+        values (tuple[str, ...]): Values of the labels.
+
+    Returns:
+        str: The labels, e.g. '{route="/metrics",status="200"}'.
+    """
+    escaped_values = (
+        value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for value in values
+    )
+    return (
+        "{"
+        + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped_values))
+        + "}"
+    )
+
+
+def _format_value(value: float) -> str:
+    """
+    Formats a number in the Prometheus text format.
+
+    Args:
+        value (float): The number.
+
+    Returns:
+        str: The number, "+Inf" for infinity and without decimals for integers.
+    """
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -0,0 +1,376 @@
+# Also the profiler of projected_ar, which loads this file with its services/shared_module_service.py:
+# only import the standard library here.
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from types import FrameType
+from typing import Any, Callable, Iterable, Iterator, Literal
+
+
+class _CProfileSession:
+    """Deterministic profile of a request with cProfile, saved as a .prof file (pstats, snakeviz...)."""
+
+    EXTENSION = ".prof"
+
+    def __init__(self) -> None:
+        """Initializes a new _CProfileSession object."""
+        self._profile: cProfile.Profile = cProfile.Profile()
+
+    def __enter__(self) -> None:
+        """Profiles the current thread until the exit."""
+        self._profile.enable()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stops profiling the current thread."""
+        self._profile.disable()
+
+    def save(self, path: str) -> None:
+        """
+        Writes the profile.
+
+        Args:
+            path (str): Path of the file.
+        """
+        self._profile.dump_stats(path)
+
+
+class _SamplingSession:
+    """Statistical profile of a request, saved as collapsed stacks (one "frame;frame;frame count" line per stack),
+    the input format of flame graph tools (flamegraph.pl, speedscope...).
+
+    A thread samples the stack of the request thread at a fixed interval while the session is entered,
+    so the request runs at full speed, unlike with cProfile.
+    """
+
+    EXTENSION = ".collapsed"
+
+    def __init__(self, interval: float) -> None:
+        """
+        Initializes a new _SamplingSession object.
+
+        Args:
+            interval (float): Time between two samples, in seconds.
+        """
+        self._interval: float = interval
+        self._stacks: Counter[str] = Counter()
+        self._thread_id: int | None = None
+        self._stopped: threading.Event = threading.Event()
+        self._sampler: threading.Thread | None = None
+
+    def __enter__(self) -> None:
+        """Samples the current thread until the exit."""
+        self._thread_id = threading.get_ident()
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sample, daemon=True)
+            self._sampler.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stops sampling the current thread."""
+        self._thread_id = None
+
+    def save(self, path: str) -> None:
+        """
+        Stops the sampling and writes the collapsed stacks.
+
+        Args:
+            path (str): Path of the file.
+        """
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        with open(path, "w") as file:
+            for stack, count in self._stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+    def _sample(self) -> None:
+        """Records the stack of the sampled thread at each interval, until the session is saved."""
+        while not self._stopped.wait(self._interval):
+            thread_id = self._thread_id
+            if thread_id is None:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                self._stacks[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame: FrameType | None) -> str:
+        """
+        Formats a stack from its root, as "file:function:line;file:function:line;...".
+
+        Args:
+            frame (FrameType | None): The innermost frame of the stack.
+
+        Returns:
+            str: The collapsed stack.
+        """
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            file_name = os.path.basename(code.co_filename)
+            names.append(f"{file_name}:{code.co_name}:{code.co_firstlineno}")
+            frame = frame.f_back
+        # Semicolons separate the frames and spaces separate the count
+        return ";".join(reversed(names)).replace(" ", "_")
+
+
+class RequestProfiler:
+    """Thread-safe selection of the requests to profile, and storage of their profiles in a directory.
+
+    The requests profiled are the next ones after arming the profiler with a number of requests,
+    and the requests carrying the profiling header, if any.
+    """
+
+    # Time between two samples of the sampling profiler, in seconds
+    SAMPLING_INTERVAL = 0.001
+    # Maximum length of the request path in the file names
+    MAX_PATH_LENGTH = 80
+
+    def __init__(
+        self,
+        directory: str,
+        request_count: int = 0,
+        header: str | None = None,
+        mode: Literal["cprofile", "sampling"] = "cprofile",
+    ) -> None:
+        """
+        Initializes a new RequestProfiler object.
+
+        Args:
+            directory (str): Directory the profiles are saved to, created if needed.
+            request_count (int): Number of next requests to profile. Defaults to 0.
+            header (str | None): Name of the header that makes a request profiled. Defaults to None (no header).
+            mode (Literal["cprofile", "sampling"]): Profiler, cProfile (.prof files) or sampling (.collapsed files).
+                Defaults to "cprofile".
+
+        Raises:
+            ValueError: If the number of requests is negative or the mode is unknown.
+        """
+        if request_count < 0:
+            raise ValueError(
+                f"The number of requests must not be negative, got {request_count}."
+            )
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError(
+                f"The mode must be 'cprofile' or 'sampling', got '{mode}'."
+            )
+        self._directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+        self._remaining_count: int = request_count
+        # Header names as found in the WSGI environ, e.g. "X-Profile" as "HTTP_X_PROFILE"
+        self._header_key: str | None = (
+            "HTTP_" + header.upper().replace("-", "_") if header else None
+        )
+        self._mode: Literal["cprofile", "sampling"] = mode
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def directory(self) -> str:
+        """
+        Returns the directory the profiles are saved to.
+
+        Returns:
+            str: The directory.
+        """
+        return self._directory
+
+    def arm(self, request_count: int) -> int:
+        """
+        Profiles the next requests, in addition to those not profiled yet.
+
+        Args:
+            request_count (int): Number of requests.
+
+        Raises:
+            ValueError: If the number of requests is negative.
+
+        Returns:
+            int: The number of next requests that will be profiled.
+        """
+        if request_count < 0:
+            raise ValueError(
+                f"The number of requests must not be negative, got {request_count}."
+            )
+        with self._lock:
+            self._remaining_count += request_count
+            return self._remaining_count
+
+    def get_remaining_count(self) -> int:
+        """
+        Gets the number of next requests that will be profiled.
+
+        Returns:
+            int: The number of requests.
+        """
+        with self._lock:
+            return self._remaining_count
+
+    def should_profile(self, environ: dict[str, Any]) -> bool:
+        """
+        Decides whether to profile a request, counting it if the profiler is armed.
+
+        Args:
+            environ (dict[str, Any]): WSGI environ of the request.
+
+        Returns:
+            bool: Whether to profile the request.
+        """
+        if self._header_key is not None and self._header_key in environ:
+            return True
+        with self._lock:
+            if self._remaining_count == 0:
+                return False
+            self._remaining_count -= 1
+            return True
+
+    def create_session(self) -> _CProfileSession | _SamplingSession:
+        """
+        Creates the profile of a request. The request is profiled while the session is entered,
+        possibly several times (e.g. for each chunk of a streamed response).
+
+        Returns:
+            _CProfileSession | _SamplingSession: The session.
+        """
+        if self._mode == "sampling":
+            return _SamplingSession(self.SAMPLING_INTERVAL)
+        return _CProfileSession()
+
+    def save(
+        self,
+        session: _CProfileSession | _SamplingSession,
+        environ: dict[str, Any],
+        duration: float,
+    ) -> str:
+        """
+        Saves the profile of a request, named after its date, its duration, its method and its path.
+
+        Args:
+            session (_CProfileSession | _SamplingSession): The profile.
+            environ (dict[str, Any]): WSGI environ of the request.
+            duration (float): Duration of the request, in seconds.
+
+        Returns:
+            str: Name of the file.
+        """
+        date = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        path = re.sub(r"[^A-Za-z0-9]+", "_", environ.get("PATH_INFO", "")).strip("_")[
+            : self.MAX_PATH_LENGTH
+        ]
+        name = (
+            f"{date}-{duration * 1000:.0f}ms-{environ.get('REQUEST_METHOD', 'GET')}"
+            f"-{path or 'root'}{session.EXTENSION}"
+        )
+        session.save(os.path.join(self._directory, name))
+        return name
+
+    def list_profiles(self) -> list[dict[str, str | int]]:
+        """
+        Lists the saved profiles, the most recent first.
+
+        Returns:
+            list[dict[str, str | int]]: The name, the size in bytes and the modification date of each profile.
+        """
+        profiles = []
+        for entry in os.scandir(self._directory):
+            if entry.is_file() and entry.name.endswith(
+                (_CProfileSession.EXTENSION, _SamplingSession.EXTENSION)
+            ):
+                stat = entry.stat()
+                profiles.append(
+                    {
+                        "name": entry.name,
+                        "size": stat.st_size,
+                        "modified": datetime.fromtimestamp(
+                            stat.st_mtime, timezone.utc
+                        ).isoformat(),
+                    }
+                )
+        return sorted(profiles, key=lambda profile: profile["name"], reverse=True)
+
+
+class ProfilingMiddleware:
+    """WSGI middleware profiling the requests selected by a RequestProfiler, until their response is fully sent."""
+
+    def __init__(
+        self,
+        app: Callable,
+        profiler: RequestProfiler,
+        excluded_prefix: str | None = None,
+    ) -> None:
+        """
+        Initializes a new ProfilingMiddleware object.
+
+        Args:
+            app (Callable): The WSGI app.
+            profiler (RequestProfiler): Profiler selecting and saving the profiles.
+            excluded_prefix (str | None): Prefix of the paths never profiled, e.g. of the endpoints listing the profiles.
+                Defaults to None.
+        """
+        self._app: Callable = app
+        self._profiler: RequestProfiler = profiler
+        self._excluded_prefix: str | None = excluded_prefix
+
+    def __call__(
+        self, environ: dict[str, Any], start_response: Callable
+    ) -> Iterable[bytes]:
+        """
+        Handles a request, profiling it if it is selected.
+
+        Args:
+            environ (dict[str, Any]): WSGI environ of the request.
+            start_response (Callable): WSGI start_response callable.
+
+        Returns:
+            Iterable[bytes]: Body of the response.
+        """
+        if (
+            self._excluded_prefix is not None
+            and environ.get("PATH_INFO", "").startswith(self._excluded_prefix)
+        ) or not self._profiler.should_profile(environ):
+            return self._app(environ, start_response)
+
+        start = time.perf_counter()
+        session = self._profiler.create_session()
+        try:
+            with session:
+                body = self._app(environ, start_response)
+        except BaseException:
+            self._profiler.save(session, environ, time.perf_counter() - start)
+            raise
+        return self._profile_body(body, session, environ, start)
+
+    def _profile_body(
+        self,
+        body: Iterable[bytes],
+        session: _CProfileSession | _SamplingSession,
+        environ: dict[str, Any],
+        start: float,
+    ) -> Iterator[bytes]:
+        """
+        Profiles the generation of each chunk of a response, then saves the profile once it is sent or closed.
+
+        Args:
+            body (Iterable[bytes]): Body of the response.
+            session (_CProfileSession | _SamplingSession): Profile of the request.
+            environ (dict[str, Any]): WSGI environ of the request.
+            start (float): Start time of the request (time.perf_counter).
+
+        Returns:
+            Iterator[bytes]: The chunks of the body.
+        """
+        iterator = iter(body)
+        try:
+            while True:
+                with session:
+                    chunk = next(iterator, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+            self._profiler.save(session, environ, time.perf_counter() - start)
@@ -0,0 +1,185 @@
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Thread-safe cache of results by key, least recently used first out, with an optional on-disk tier.
+
+    The results kept in memory are bounded by their total size in bytes. With a directory, every result
+    is also written to a file named after its key, so that it survives the eviction and the restarts.
+    Keys must be usable as file names, e.g. hexadecimal hashes.
+    """
+
+    def __init__(self, max_bytes: int, directory: str | None = None) -> None:
+        """
+        Initializes a new ResultCache object.
+
+        Args:
+            max_bytes (int): Maximum total size of the results kept in memory.
+            directory (str | None): Directory of the on-disk tier. Defaults to None (no on-disk tier).
+
+        Raises:
+            ValueError: If the maximum size is negative.
+        """
+        if max_bytes < 0:
+            raise ValueError(f"The maximum size must not be negative, got {max_bytes}.")
+        self._max_bytes: int = max_bytes
+        self._directory: str | None = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self._results: OrderedDict[str, bytes] = OrderedDict()
+        self._size: int = 0
+        self._hits: int = 0
+        self._disk_hits: int = 0
+        self._misses: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        """
+        Returns the maximum total size of the results kept in memory.
+
+        Returns:
+            int: The maximum size in bytes.
+        """
+        return self._max_bytes
+
+    @property
+    def directory(self) -> str | None:
+        """
+        Returns the directory of the on-disk tier.
+
+        Returns:
+            str | None: The directory, or None if there is no on-disk tier.
+        """
+        return self._directory
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Gets a result, from memory or else from the disk.
+
+        Args:
+            key (str): Key of the result.
+
+        Returns:
+            bytes | None: The result, or None if it is not cached.
+        """
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self._hits += 1
+                return result
+
+        result = self._read_file(key)
+        with self._lock:
+            if result is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._disk_hits += 1
+        self._keep_in_memory(key, result)
+        return result
+
+    def put(self, key: str, result: bytes) -> None:
+        """
+        Adds a result, evicting the least recently used results from memory to stay within the maximum size.
+
+        Args:
+            key (str): Key of the result.
+            result (bytes): The result.
+        """
+        self._keep_in_memory(key, result)
+        if self._directory is not None:
+            self._write_file(key, result)
+
+    def get_statistics(self) -> dict[str, int]:
+        """
+        Gets the counters of the cache.
+
+        Returns:
+            dict[str, int]: The number of hits (with those from the disk), of misses,
+                and the number and total size of the results in memory.
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "entries": len(self._results),
+                "bytes": self._size,
+            }
+
+    def _keep_in_memory(self, key: str, result: bytes) -> None:
+        """
+        Adds a result to memory, unless it is larger than the maximum size.
+
+        Args:
+            key (str): Key of the result.
+            result (bytes): The result.
+        """
+        if len(result) > self._max_bytes:
+            return
+        with self._lock:
+            previous_result = self._results.pop(key, None)
+            if previous_result is not None:
+                self._size -= len(previous_result)
+            self._results[key] = result
+            self._size += len(result)
+            while self._size > self._max_bytes:
+                _, evicted_result = self._results.popitem(last=False)
+                self._size -= len(evicted_result)
+
+    def _get_file_path(self, key: str) -> str:
+        """
+        Gets the path of the file of a result, in a subdirectory named after the first characters of the key.
+
+        Args:
+            key (str): Key of the result.
+
+        Returns:
+            str: Path of the file.
+        """
+        return os.path.join(self._directory, key[:2], key)
+
+    def _read_file(self, key: str) -> bytes | None:
+        """
+        Reads a result from the disk.
+
+        Args:
+            key (str): Key of the result.
+
+        Returns:
+            bytes | None: The result, or None if there is no on-disk tier or no file for the key.
+        """
+        if self._directory is None:
+            return None
+        try:
+            with open(self._get_file_path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_file(self, key: str, result: bytes) -> None:
+        """
+        Writes a result to the disk. The file is written under a temporary name then renamed,
+        so that a concurrent read never sees a partial result.
+
+        Args:
+            key (str): Key of the result.
+            result (bytes): The result.
+        """
+        file_path = self._get_file_path(key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(file_path)
+        )
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(result)
+            os.replace(temporary_path, file_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
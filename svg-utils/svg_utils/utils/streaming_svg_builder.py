@@ -0,0 +1,413 @@
+import io
+from typing import Literal, TextIO
+from xml.sax.saxutils import escape
+
+from svgwrite.validator2 import get_validator
+
+_ATTRIBUTE_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+
+class StreamingSVGBuilder:
+    """Class to write SVG files element by element, without building the document in memory.
+
+    It has the same add_* methods as SVGBuilder, but each element is written to the output as soon as it is added,
+    so the memory usage scales with one element rather than with the whole document.
+    The size and the viewbox can be changed until the first element is written.
+    """
+
+    def __init__(
+        self,
+        output: TextIO | None = None,
+        filename: str = "output.svg",
+        size: tuple[float | str, float | str] = ("100%", "100%"),
+        viewbox: tuple[int, int, int, int] | None = None,
+        profile: Literal["tiny", "basic", "full"] = "tiny",
+        validate: bool = False,
+    ) -> None:
+        """
+        Initializes a new StreamingSVGBuilder object.
+
+        Args:
+            output (TextIO | None) : Text stream the SVG is written to (e.g. an open file).
+                If None, the SVG is written to an in-memory buffer, returned by get_svg_string. Defaults to None.
+            filename (str) : Name of the output SVG file used by save. Defaults to "output.svg".
+            size (tuple[float | str, float | str]) : Size of the SVG image (width, height). Defaults to ("100%", "100%").
+            viewbox (tuple[int, int, int, int] | None) : Defines the viewbox for the SVG in the form of a tuple (x, y, width, height). Defaults to None.
+            profile (Literal["tiny", "basic", "full"]) : SVG profile to use ("tiny", "basic", or "full"). Defaults to "tiny".
+            validate (bool) : Whether the attributes are checked against the SVG profile with the svgwrite validator. Defaults to False.
+        """
+        self._buffer: io.StringIO | None = io.StringIO() if output is None else None
+        self._output: TextIO = self._buffer if output is None else output
+        self._filename: str = filename
+        self._size: tuple[float | str, float | str] = size
+        self._viewbox: tuple[int, int, int, int] | None = viewbox
+        self._profile: Literal["tiny", "basic", "full"] = profile
+        self._validator = get_validator(profile, debug=True) if validate else None
+        self._is_started: bool = False
+        self._is_closed: bool = False
+
+    def set_filename(self, filename: str) -> None:
+        """
+        Sets the filename for the SVG to be saved.
+
+        Args:
+            filename (str) : New filename for the SVG file.
+        """
+        self._filename = filename
+
+    def set_size(self, size: tuple[float, float]) -> None:
+        """
+        Modifies the size of the SVG.
+
+        Args:
+            size (tuple[float, float]) : New size of the image (width, height).
+
+        Raises:
+            RuntimeError: If elements have already been written.
+        """
+        self._check_not_started("size")
+        self._size = size
+
+    def set_viewbox(self, viewbox: tuple[int, int, int, int]) -> None:
+        """
+        Sets the viewbox for the SVG.
+
+        Args:
+            viewbox (tuple[int, int, int, int]) : New viewbox (x, y, width, height) for the SVG.
+
+        Raises:
+            RuntimeError: If elements have already been written.
+        """
+        self._check_not_started("viewbox")
+        self._viewbox = viewbox
+
+    def add_circle(
+        self,
+        center: tuple[float, float],
+        radius: float,
+        **presentation_attributes: dict[str, float | str],
+    ) -> None:
+        """
+        Adds a circle to the SVG.
+
+        Args:
+            center (tuple[float, float]) : Position of the center of the circle (x, y).
+            radius (float) : Radius of the circle.
+            **presentation_attributes (dict[str, str]) : Additional SVG attributes (see SVGBuilder.add_circle).
+        """
+        self._write_element(
+            "circle",
+            {"cx": center[0], "cy": center[1], "r": radius},
+            presentation_attributes,
+        )
+
+    def add_ellipse(
+        self,
+        center: tuple[float, float],
+        radii: tuple[float, float],
+        **presentation_attributes: dict[str, float | str],
+    ) -> None:
+        """
+        Adds an ellipse to the SVG.
+
+        Args:
+            center (tuple[float, float]) : Position of the center of the ellipse (x, y).
+            radii (tuple[float, float]) : Radii of the ellipse (rx, ry).
+            **presentation_attributes (dict[str, str]) : Additional SVG attributes (see SVGBuilder.add_ellipse).
+        """
+        self._write_element(
+            "ellipse",
+            {"cx": center[0], "cy": center[1], "rx": radii[0], "ry": radii[1]},
+            presentation_attributes,
+        )
+
+    def add_rectangle(
+        self,
+        top_left: tuple[float, float],
+        size: tuple[float, float],
+        rx: float | None = None,
+        ry: float | None = None,
+        **presentation_attributes: dict[str, float | str],
+    ) -> None:
+        """
+        Adds a rectangle to the SVG.
+
+        Args:
+            top_left (tuple[float, float]) : Position of the top-left corner of the rectangle (x, y).
+            size (tuple[float, float]) : Size of the rectangle (width, height).
+            rx (float | None) : Horizontal radius of the corners of the rectangle. Defaults to None (no rounding).
+            ry (float | None) : Vertical radius of the corners of the rectangle. Defaults to None (no rounding).
+            **presentation_attributes (dict[str, str]) : Additional SVG attributes (see SVGBuilder.add_rectangle).
+        """
+        self._write_element(
+            "rect",
+            {
+                "x": top_left[0],
+                "y": top_left[1],
+                "width": size[0],
+                "height": size[1],
+                "rx": rx,
+                "ry": ry,
+            },
+            presentation_attributes,
+        )
+
+    def add_line(
+        self,
+        start: tuple[float, float],
+        end: tuple[float, float],
+        **presentation_attributes: dict[str, float | str],
+    ) -> None:
+        """
+        Adds a line to the SVG.
+
+        Args:
+            start (tuple[float, float]) : Starting point of the line (x, y).
+            end (tuple[float, float]) : Ending point of the line (x, y).
+            **presentation_attributes (dict[str, str]) : Additional SVG attributes (see SVGBuilder.add_line).
+        """
+        self._write_element(
+            "line",
+            {"x1": start[0], "y1": start[1], "x2": end[0], "y2": end[1]},
+            presentation_attributes,
+        )
+
+    def add_path(
+        self,
+        path_data: str,
+        **presentation_attributes: dict[str, float | str],
+    ) -> None:
+        """
+        Adds a path to the SVG.
+
+        Args:
+            path_data (str) : Path data string for the path, following the SVG path data syntax (https://developer.mozilla.org/en-US/docs/Web/SVG/Tutorial/Paths).
+            **presentation_attributes (dict[str, str]) : Additional SVG attributes (see SVGBuilder.add_path).
+        """
+        self._write_element("path", {"d": path_data}, presentation_attributes)
+
+    def add_text(
+        self,
+        text: str,
+        position: tuple[float, float],
+        **presentation_attributes: dict[str, float | str],
+    ) -> None:
+        """
+        Adds text to the SVG.
+
+        Args:
+            text (str) : Text to display.
+            position (tuple[float, float]) : Position of the text (x, y).
+            **presentation_attributes (dict[str, str]) : Additional SVG attributes (see SVGBuilder.add_text).
+        """
+        self._write_element(
+            "text",
+            {"x": position[0], "y": position[1]},
+            presentation_attributes,
+            content=text,
+        )
+
+    def add_polygon(
+        self,
+        points: list[tuple[float, float]],
+        **presentation_attributes: dict[str, float | str],
+    ) -> None:
+        """
+        Adds a polygon to the SVG.
+
+        Args:
+            points (list[tuple[float, float]]) : list of points defining the polygon.
+            **presentation_attributes (dict[str, str]) : Additional SVG attributes (see SVGBuilder.add_polygon).
+        """
+        self._write_element(
+            "polygon",
+            {"points": self._format_points(points)},
+            presentation_attributes,
+        )
+
+    def add_polyline(
+        self,
+        points: list[tuple[float, float]],
+        **presentation_attributes: dict[str, float | str],
+    ) -> None:
+        """
+        Adds a polyline to the SVG.
+
+        Args:
+            points (list[tuple[float, float]]) : list of points defining the polyline.
+            **presentation_attributes (dict[str, str]) : Additional SVG attributes (see SVGBuilder.add_polyline).
+        """
+        self._write_element(
+            "polyline",
+            {"points": self._format_points(points)},
+            presentation_attributes,
+        )
+
+    def close(self) -> None:
+        """Writes the end of the SVG. No element can be added afterwards."""
+        if self._is_closed:
+            return
+        self._write_start()
+        self._output.write("</svg>")
+        self._is_closed = True
+
+    def save(self, filename: str | None = None) -> None:
+        """
+        Saves the SVG image written to the in-memory buffer to a file.
+
+        Args:
+            filename (str | None) : Name of the output file. If None, the filename set in the constructor is used.
+
+        Raises:
+            RuntimeError: If the SVG is written to an output stream.
+        """
+        if filename is not None:
+            self.set_filename(filename)
+        svg_string = self.get_svg_string()
+        with io.open(self._filename, mode="w", encoding="utf-8") as file:
+            file.write(svg_string)
+
+    def get_svg_string(self) -> str:
+        """
+        Closes the SVG and returns it as a string.
+
+        Raises:
+            RuntimeError: If the SVG is written to an output stream.
+
+        Returns:
+            str: SVG as a string.
+        """
+        if self._buffer is None:
+            raise RuntimeError(
+                "The SVG is written to an output stream, not to a string."
+            )
+        self.close()
+        return self._buffer.getvalue()
+
+    def clear(self) -> None:
+        """
+        Clears the SVG image written to the in-memory buffer.
+
+        Raises:
+            RuntimeError: If the SVG is written to an output stream.
+        """
+        if self._buffer is None:
+            raise RuntimeError("An SVG written to an output stream cannot be cleared.")
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._is_started = False
+        self._is_closed = False
+
+    def _check_not_started(self, name: str) -> None:
+        """
+        Checks that the start of the SVG has not been written yet.
+
+        Args:
+            name (str) : Name of the modified property, for the error message.
+
+        Raises:
+            RuntimeError: If the start of the SVG has been written.
+        """
+        if self._is_started:
+            raise RuntimeError(
+                f"The {name} cannot be changed after elements have been written."
+            )
+
+    def _write_start(self) -> None:
+        """Writes the start tag of the SVG, if not written yet."""
+        if self._is_started:
+            return
+        attributes: dict[str, float | str | None] = {
+            "baseProfile": self._profile,
+            "height": self._size[1],
+            "version": "1.2" if self._profile == "tiny" else "1.1",
+            "viewBox": (
+                ",".join(map(str, self._viewbox)) if self._viewbox is not None else None
+            ),
+            "width": self._size[0],
+            "xmlns": "http://www.w3.org/2000/svg",
+            "xmlns:ev": "http://www.w3.org/2001/xml-events",
+            "xmlns:xlink": "http://www.w3.org/1999/xlink",
+        }
+        self._output.write(f"<svg{self._format_attributes('svg', attributes)}>")
+        self._is_started = True
+
+    def _write_element(
+        self,
+        element_name: str,
+        attributes: dict[str, float | str | None],
+        presentation_attributes: dict[str, float | str],
+        content: str | None = None,
+    ) -> None:
+        """
+        Writes an element to the output.
+
+        Args:
+            element_name (str) : Name of the SVG element.
+            attributes (dict[str, float | str | None]) : Geometry attributes of the element (None values are omitted).
+            presentation_attributes (dict[str, float | str]) : Additional SVG attributes, with Python names
+                (trailing '_' removed and inner '_' replaced by '-').
+            content (str | None) : Text content of the element. Defaults to None (empty element).
+
+        Raises:
+            RuntimeError: If the SVG is closed.
+        """
+        if self._is_closed:
+            raise RuntimeError("No element can be added to a closed SVG.")
+        self._write_start()
+
+        attributes = dict(attributes)
+        for key, value in presentation_attributes.items():
+            attributes[key.rstrip("_").replace("_", "-")] = value
+        formatted_attributes = self._format_attributes(element_name, attributes)
+
+        if content is None:
+            self._output.write(f"<{element_name}{formatted_attributes} />")
+        else:
+            self._output.write(
+                f"<{element_name}{formatted_attributes}>{escape(content)}</{element_name}>"
+            )
+
+    def _format_attributes(
+        self,
+        element_name: str,
+        attributes: dict[str, float | str | None],
+    ) -> str:
+        """
+        Formats attributes sorted by name, like svgwrite does, and validates them if required.
+
+        Args:
+            element_name (str) : Name of the SVG element.
+            attributes (dict[str, float | str | None]) : Attributes of the element (None values are omitted).
+
+        Raises:
+            TypeError, ValueError: If validation is enabled and an attribute is invalid for the profile.
+
+        Returns:
+            str: Formatted attributes, each preceded by a space.
+        """
+        formatted_attributes = []
+        for name in sorted(attributes):
+            value = attributes[name]
+            if value is None:
+                continue
+            value = str(value)
+            if self._validator is not None and not name.startswith("xmlns"):
+                self._validator.check_svg_attribute_value(element_name, name, value)
+            formatted_attributes.append(
+                f' {name}="{escape(value, _ATTRIBUTE_ENTITIES)}"'
+            )
+        return "".join(formatted_attributes)
+
+    @staticmethod
+    def _format_points(points: list[tuple[float, float]]) -> str:
+        """
+        Formats points for the points attribute of polygons and polylines.
+
+        Args:
+            points (list[tuple[float, float]]) : list of points (x, y).
+
+        Returns:
+            str: Formatted points.
+        """
+        return " ".join(f"{x},{y}" for x, y in points)
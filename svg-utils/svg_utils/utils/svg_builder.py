@@ -12,6 +12,7 @@ class SVGBuilder:
         size: tuple[float | str, float | str] = ("100%", "100%"),
         viewbox: tuple[int, int, int, int] | None = None,
         profile: Literal["tiny", "basic", "full"] = "tiny",
+        validate: bool = True,
     ) -> None:
         """
         Initializes a new SVGBuilder object.
@@ -21,9 +22,12 @@ class SVGBuilder:
             size (tuple[float | str, float | str]) : Size of the SVG image (width, height). Defaults to ("100%", "100%").
             viewbox (tuple[int, int, int, int] | None) : Defines the viewbox for the SVG in the form of a tuple (x, y, width, height). Defaults to None.
             profile (Literal["tiny", "full"]) : SVG profile to use ("tiny", "basic", or "full"). Defaults to "tiny".
+            validate (bool) : Whether the attributes are checked against the SVG profile. Defaults to True.
+                The path data check of svgwrite requires separators between all numbers,
+                so it rejects the compact path data syntax (e.g. "M1-2") which is valid SVG.
         """
         self._drawing: svgwrite.Drawing = svgwrite.Drawing(
-            filename, size=size, profile=profile
+            filename, size=size, profile=profile, debug=validate
         )
         if viewbox is not None:
             self._drawing.viewbox(*viewbox)
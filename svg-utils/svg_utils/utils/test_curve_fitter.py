@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+from utils import CurveFitter
+
+
+class TestCurveFitter:
+    """Test for the CurveFitter class."""
+
+    @staticmethod
+    def _get_max_distance(
+        points: np.ndarray,
+        end_indices: np.ndarray,
+        controls: np.ndarray,
+        is_line: np.ndarray,
+    ) -> float:
+        """Get the largest distance between the points and the fitted curves, sampled densely."""
+        parameters = np.linspace(0, 1, 1001)[:, np.newaxis]
+        max_distance = 0.0
+        start_index = 0
+        for end_index, (control1, control2), is_line_segment in zip(
+            end_indices, controls, is_line
+        ):
+            start, end = points[start_index], points[end_index]
+            if is_line_segment:
+                samples = start + parameters * (end - start)
+            else:
+                samples = (
+                    (1 - parameters) ** 3 * start
+                    + 3 * parameters * (1 - parameters) ** 2 * control1
+                    + 3 * parameters**2 * (1 - parameters) * control2
+                    + parameters**3 * end
+                )
+            run_points = points[start_index : end_index + 1]
+            distances = np.hypot(
+                *(run_points[:, np.newaxis] - samples[np.newaxis]).transpose(2, 0, 1)
+            )
+            max_distance = max(max_distance, float(distances.min(axis=1).max()))
+            start_index = end_index
+        return max_distance
+
+    @pytest.mark.parametrize("tolerance", [1, 2, 5])
+    def test_fit_rounded_spiral(self, tolerance: float) -> None:
+        """Test that the curves fitted to a spiral rounded to integers are within the tolerance and much fewer than the points."""
+        angles = np.linspace(0, 8 * np.pi, 5000)
+        points = np.round(
+            np.column_stack((angles * np.cos(angles), angles * np.sin(angles))) * 20
+        ).astype(np.int32)
+
+        end_indices, controls, is_line = CurveFitter(tolerance).fit(points)
+
+        assert end_indices[-1] == len(points) - 1
+        assert np.all(np.diff(end_indices) > 0)
+        assert len(end_indices) < len(points) / 20
+        assert np.all(np.isnan(controls[is_line]))
+        assert (
+            self._get_max_distance(points, end_indices, controls, is_line)
+            <= tolerance * 1.01
+        )
+
+    def test_fit_smooth_joins(self) -> None:
+        """Test that consecutive curves have the same tangent where they join."""
+        x = np.linspace(0, 100, 2000)
+        points = np.column_stack((x, 20 * np.sin(x / 5)))
+
+        end_indices, controls, is_line = CurveFitter(0.01).fit(points)
+
+        assert not np.any(is_line)
+        assert len(end_indices) > 1
+        for index, end_index in enumerate(end_indices[:-1]):
+            incoming = points[end_index] - controls[index][1]
+            outgoing = controls[index + 1][0] - points[end_index]
+            assert incoming[0] * outgoing[1] - incoming[1] * outgoing[
+                0
+            ] == pytest.approx(0, abs=1e-6 * np.hypot(*incoming) * np.hypot(*outgoing))
+            assert np.dot(incoming, outgoing) > 0
+
+    def test_fit_noise(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the number of fits to a noisy polyline is bounded, its runs left being kept as lines."""
+        points = np.cumsum(
+            np.random.default_rng(0).integers(-2, 3, size=(5000, 2)), axis=0
+        )
+        fit_curve = CurveFitter._fit_curve
+        fit_counts = []
+
+        def count_fit(*args: object) -> tuple[np.ndarray | None, int]:
+            """Count the fits."""
+            fit_counts.append(1)
+            return fit_curve(*args)
+
+        monkeypatch.setattr(CurveFitter, "_fit_curve", count_fit)
+        end_indices, controls, is_line = CurveFitter(0.5).fit(points)
+
+        assert len(fit_counts) <= (
+            CurveFitter.MIN_FIT_BUDGET + CurveFitter.MAX_FITS_PER_POINT * len(points)
+        )
+        assert end_indices[-1] == len(points) - 1
+        assert np.all(np.diff(end_indices) > 0)
+        assert (
+            self._get_max_distance(points, end_indices, controls, is_line) <= 0.5 * 1.01
+        )
+
+    @pytest.mark.parametrize(
+        "points, expected_end_indices, expected_is_line",
+        [
+            ([[0, 0], [10, 0], [10, 10]], [1, 2], [True, True]),
+            ([[0, 0], [0, 0], [5, 5], [5, 5]], [2], [True]),
+            ([[3, 4]], [], []),
+            (np.zeros((0, 2)), [], []),
+        ],
+    )
+    def test_fit_lines(
+        self,
+        points: list[list[int]],
+        expected_end_indices: list[int],
+        expected_is_line: list[bool],
+    ) -> None:
+        """Test the corners, the repeated points and the paths without segments."""
+        end_indices, controls, is_line = CurveFitter(1).fit(np.array(points))
+
+        assert end_indices.tolist() == expected_end_indices
+        assert is_line.tolist() == expected_is_line
+        assert controls.shape == (len(expected_end_indices), 2, 2)
+
+    @pytest.mark.parametrize(
+        "tolerance, points",
+        [(0, [[0, 0], [1, 1]]), (-1, [[0, 0], [1, 1]]), (1, [[0, 0, 0]]), (1, [0, 0])],
+    )
+    def test_invalid(self, tolerance: float, points: list) -> None:
+        """Test invalid tolerances and points."""
+        with pytest.raises(ValueError):
+            CurveFitter(tolerance).fit(np.array(points))
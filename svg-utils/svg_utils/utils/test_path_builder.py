@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from utils import PathBuilder
 
@@ -56,6 +57,57 @@ class TestPathBuilder:
         path_data = path_builder.get_data()
         assert expected in path_data
 
+    @pytest.mark.parametrize(
+        "points, relative",
+        [
+            ([(50, 100), (150, -200), (0, 0), (-123456, 7)], False),
+            ([(50, 100), (150, -200), (0, 0), (-123456, 7)], True),
+            ([(1.5, 2.0), (-3.0, 0.0), (-0.0, 1e-07), (1e16, 2.25)], False),
+            ([(1.0, 2.0), (-3.0, 0.0)], True),
+            ([(50, 100)], False),
+            ([(i * 37 % 1001, -i) for i in range(1000)], False),
+            ([(float(i * 37 % 1001), -0.5 * i) for i in range(1000)], False),
+            ([(float(i * 37 % 1001), -1.0 * i) for i in range(1, 1000)], True),
+        ],
+    )
+    def test_polyline_from_array(
+        self,
+        path_builder: PathBuilder,
+        points: list[tuple[float, float]],
+        relative: bool,
+    ):
+        """Test that drawing a polyline from an array matches a move followed by lines."""
+        expected_builder = PathBuilder()
+        expected_builder.move_to((10, 20))
+        expected_builder.move_to(points[0], relative)
+        for point in points[1:]:
+            expected_builder.line_to(point, relative)
+
+        path_builder.move_to((10, 20))
+        path_builder.polyline_from_array(np.array(points), relative)
+
+        assert path_builder.get_data() == expected_builder.get_data()
+        assert path_builder.current_position == expected_builder.current_position
+        assert (
+            path_builder.subpath_start_position
+            == expected_builder.subpath_start_position
+        )
+
+    @pytest.mark.parametrize(
+        "points",
+        [
+            np.array([1, 2, 3]),
+            np.array([[1, 2, 3]]),
+            np.array([["a", "b"]]),
+        ],
+    )
+    def test_polyline_from_array_invalid(
+        self, path_builder: PathBuilder, points: np.ndarray
+    ):
+        """Test that drawing a polyline from an invalid array raises a ValueError."""
+        with pytest.raises(ValueError):
+            path_builder.polyline_from_array(points)
+
     @pytest.mark.parametrize(
         "position, relative, expected",
         [
@@ -225,6 +277,29 @@ class TestPathBuilder:
         path_data = path_builder.get_data()
         assert "Z" in path_data
 
+    @pytest.mark.parametrize(
+        "precision, compact, expected",
+        [
+            (None, False, "M 10.25 20 L 12.5 -3.125 l 1 1 Z"),
+            (1, False, "M 10.2 20 L 12.5 -3.1 l 1 1 Z"),
+            (None, True, "M10.25 20 12.5-3.125l1 1Z"),
+            (0, True, "M10 20 12-3l2 1Z"),
+        ],
+    )
+    def test_get_data_encoding(
+        self,
+        path_builder: PathBuilder,
+        precision: int | None,
+        compact: bool,
+        expected: str,
+    ):
+        """Test getting the path data with a precision and the compact syntax."""
+        path_builder.move_to((10.25, 20))
+        path_builder.line_to((12.5, -3.125))
+        path_builder.line_to((1, 1), relative=True)
+        path_builder.close_path()
+        assert path_builder.get_data(precision, compact) == expected
+
     def test_clear(self, path_builder: PathBuilder):
         """Test clearing the path data."""
         path_builder.move_to((100, 100))
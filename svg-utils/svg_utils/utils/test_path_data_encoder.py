@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from utils.path_data_encoder import MAX_PRECISION, PathDataEncoder
+
+
+class TestPathDataEncoder:
+    """Test for the PathDataEncoder class."""
+
+    @pytest.mark.parametrize(
+        "parts, precision, compact, expected",
+        [
+            ([], 2, True, ""),
+            ([("M", ((10, 20),)), ("L", ((30, 40),))], 0, False, "M 10 20 L 30 40"),
+            ([("M", ((1.234, -5.678),))], 2, False, "M 1.23 -5.68"),
+            ([("M", ((1.5, 0.25),))], 1, False, "M 1.5 0.2"),
+            ([("M", ((1.0, 2.5),))], 3, False, "M 1 2.5"),
+            ([("M", ((0.5, -0.5),))], 1, True, "M.5-.5"),
+            ([("M", ((1, -2),)), ("L", ((3, -4),))], 0, True, "M1-2 3-4"),
+            ([("M", ((0.5, 0.5),)), ("L", ((0.75, 0.5),))], 2, True, "M.5.5l.25 0"),
+            (
+                [("M", ((100, 100),)), ("L", ((101, 101),)), ("L", ((102, 100),))],
+                0,
+                True,
+                "M100 100l1 1 1-1",
+            ),
+            (
+                [
+                    ("M", np.array([[100, 100]])),
+                    ("L", np.array([[101, 101], [102, 100]])),
+                ],
+                0,
+                True,
+                "M100 100l1 1 1-1",
+            ),
+            (
+                [("M", ((10, 10),)), ("L", ((20, 10),)), ("Z", ())],
+                0,
+                True,
+                "M10 10l10 0Z",
+            ),
+            (
+                [("M", ((1, 1),)), ("m", ((2, 2),)), ("l", ((1, 0),))],
+                0,
+                True,
+                "M1 1m2 2 1 0",
+            ),
+            (
+                [("M", ((0, 0),)), ("A", ((5, 5), 0, 1, 0, (10, 0)))],
+                0,
+                False,
+                "M 0 0 A 5 5 0 1 0 10 0",
+            ),
+        ],
+    )
+    def test_encode(
+        self,
+        parts: list,
+        precision: int,
+        compact: bool,
+        expected: str,
+    ):
+        """Test encoding path data parts with a precision (compact syntax or not)."""
+        encoder = PathDataEncoder(precision, compact)
+        assert encoder.encode(parts) == expected
+
+    def test_encode_relative_without_drift(self):
+        """Test that rounding relative coordinates does not accumulate errors."""
+        parts = [("M", ((0, 0),))] + [("l", ((0.4, 0),))] * 10
+        encoded = PathDataEncoder(0, False).encode(parts)
+        x_offsets = [int(part.split()[0]) for part in encoded.split("l")[1:]]
+        assert sum(x_offsets) == 4
+
+    def test_encode_exact_precision(self):
+        """Test that the smallest exact precision is used when no precision is given."""
+        parts = [("M", ((1.25, 2),)), ("L", ((3, 4.5),))]
+        assert PathDataEncoder(None, True).encode(parts) == "M1.25 2 3 4.5"
+
+    @pytest.mark.parametrize("precision", [-1, MAX_PRECISION + 1])
+    def test_invalid_precision(self, precision: int):
+        """Test that an invalid precision raises a ValueError."""
+        with pytest.raises(ValueError):
+            PathDataEncoder(precision)
+
+    def test_encode_non_finite(self):
+        """Test that non-finite coordinates raise a ValueError."""
+        with pytest.raises(ValueError):
+            PathDataEncoder(2).encode([("M", ((float("nan"), 0),))])
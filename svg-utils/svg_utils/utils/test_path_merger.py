@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from utils import PathMerger
+
+
+class TestPathMerger:
+    """Test for the PathMerger class."""
+
+    @pytest.mark.parametrize(
+        "paths, tolerance, expected",
+        [
+            (
+                [[[0, 0], [1, 0]], [[2, 0], [1, 0]], [[2, 0], [3, 3]]],
+                0,
+                [[[0, 0], [1, 0], [2, 0], [3, 3]]],
+            ),
+            (
+                [[[1, 0], [1, 1]], [[0, 0], [1, 0]], [[0, 0], [1, 1]]],
+                0,
+                [[[1, 0], [1, 1], [0, 0], [1, 0]]],
+            ),
+            (
+                [[[0, 0], [1, 0]], [[1, 1], [2, 1]]],
+                0.5,
+                [[[0, 0], [1, 0]], [[1, 1], [2, 1]]],
+            ),
+            (
+                [[[0, 0], [1, 0]], [[1, 1], [2, 1]]],
+                1,
+                [[[0, 0], [1, 0], [1, 1], [2, 1]]],
+            ),
+            (
+                [[[5, 5]], [], [[0, 0], [3, 3]], [[3, 3]]],
+                0,
+                [[[5, 5]], [[0, 0], [3, 3]], []],
+            ),
+            ([], 0, []),
+        ],
+    )
+    def test_merge_paths(
+        self,
+        paths: list[list[list[int]]],
+        tolerance: float,
+        expected: list[list[list[int]]],
+    ) -> None:
+        """Test the merge_paths method."""
+        merged_paths = PathMerger(tolerance).merge_paths(
+            [np.array(path) for path in paths]
+        )
+
+        assert [path.tolist() for path in merged_paths] == expected
+
+    def test_merge_paths_closest_first(self) -> None:
+        """Test that an endpoint close to several others is joined to the closest one."""
+        paths = [
+            np.array([[0.0, 0.0], [1.0, 0.0]]),
+            np.array([[1.4, 0.0], [2.0, 0.0]]),
+            np.array([[1.1, 0.0], [1.1, 5.0]]),
+        ]
+
+        merged_paths = PathMerger(0.5).merge_paths(paths)
+
+        assert [path.tolist() for path in merged_paths] == [
+            [[0, 0], [1, 0], [1.1, 0], [1.1, 5]],
+            [[1.4, 0], [2, 0]],
+        ]
+
+    def test_merge_fragments(self) -> None:
+        """Test that shuffled and reversed fragments of polylines are joined back into the polylines."""
+        rng = np.random.default_rng(0)
+        # Increasing x, so that the joins of a polyline are not ambiguous
+        polylines = [
+            np.cumsum(rng.integers([1, -5], [6, 6], (41, 2)), axis=0)
+            + rng.integers(0, 10**6, 2)
+            for _ in range(200)
+        ]
+        fragments = [
+            polyline[start : start + 5]
+            for polyline in polylines
+            for start in range(0, 40, 4)
+        ]
+        fragments = [
+            fragments[index][::-1] if rng.random() < 0.5 else fragments[index]
+            for index in rng.permutation(len(fragments))
+        ]
+
+        merged_paths = PathMerger().merge_paths(fragments)
+
+        def canonical(path: np.ndarray) -> tuple[int, ...]:
+            return min(tuple(path.ravel()), tuple(path[::-1].ravel()))
+
+        assert sorted(map(canonical, merged_paths)) == sorted(map(canonical, polylines))
+
+    def test_merge_coincident_endpoints(self) -> None:
+        """Test that many endpoints at the same point are all joined in pairs, including the loops meeting there."""
+        rng = np.random.default_rng(1)
+        angles = rng.random(3000) * 2 * np.pi
+        lines = [
+            np.array([[0.0, 0.0], [np.cos(angle), np.sin(angle)]]) for angle in angles
+        ]
+        loops = [np.array([[0.0, 0.0], [1.0, index], [0.0, 0.0]]) for index in range(3)]
+
+        merged_paths = PathMerger().merge_paths(lines + loops)
+
+        # The 3006 endpoints at the origin joined in 1503 pairs, each dropping a duplicated point
+        assert sum(len(path) for path in merged_paths) == 2 * 3000 + 3 * 3 - 1503
+        assert 1500 <= len(merged_paths) <= 1503
+
+    def test_merge_paths_large_tolerance(self) -> None:
+        """Test that a tolerance as large as the drawing joins the paths with a bounded number of candidates."""
+        rng = np.random.default_rng(2)
+        paths = [rng.random((3, 2)) * 100 for _ in range(5000)]
+
+        merged_paths = PathMerger(1000).merge_paths(paths)
+
+        assert len(merged_paths) < 50
+        assert sorted(map(tuple, np.concatenate(merged_paths).tolist())) == sorted(
+            map(tuple, np.concatenate(paths).tolist())
+        )
+
+    @pytest.mark.parametrize(
+        "tolerance, paths",
+        [(-1, [[[0, 0]]]), (1, [[[0, 0, 0]]]), (1, [[0, 0]])],
+    )
+    def test_invalid(self, tolerance: float, paths: list) -> None:
+        """Test invalid tolerances and paths."""
+        with pytest.raises(ValueError):
+            PathMerger(tolerance).merge_paths([np.array(path) for path in paths])
@@ -0,0 +1,149 @@
+import itertools
+
+import numpy as np
+import pytest
+from utils import PathOrderer
+
+
+def brute_force_travel(
+    starts: np.ndarray, ends: np.ndarray, start: tuple[float, float]
+) -> float:
+    """Minimum pen-up travel over all the orders and directions of the paths."""
+    best_travel = np.inf
+    for order in itertools.permutations(range(len(starts))):
+        for directions in itertools.product((False, True), repeat=len(starts)):
+            position = np.array(start, dtype=np.float64)
+            travel = 0.0
+            for index, reverse in zip(order, directions):
+                first, last = (ends, starts) if reverse else (starts, ends)
+                travel += float(np.hypot(*(first[index] - position)))
+                position = last[index]
+            best_travel = min(best_travel, travel)
+    return best_travel
+
+
+class TestPathOrderer:
+    """Test for the PathOrderer class."""
+
+    @pytest.mark.parametrize(
+        "paths, expected",
+        [
+            (
+                [[[10, 0], [11, 0]], [[1, 0], [2, 0]], [[5, 0], [4, 0]]],
+                [[[1, 0], [2, 0]], [[4, 0], [5, 0]], [[10, 0], [11, 0]]],
+            ),
+            (
+                [[[3, 3]], [], [[1, 1], [2, 2]]],
+                [[[1, 1], [2, 2]], [[3, 3]], []],
+            ),
+            ([], []),
+        ],
+    )
+    def test_order_paths(
+        self,
+        paths: list[list[list[int]]],
+        expected: list[list[list[int]]],
+    ) -> None:
+        """Test the order_paths method."""
+        ordered_paths = PathOrderer().order_paths([np.array(path) for path in paths])
+
+        assert [path.tolist() for path in ordered_paths] == expected
+
+    def test_order_paths_closed(self) -> None:
+        """Test that closed paths, reordered by 2-opt moves, are never reversed and still start at their first point."""
+        rng = np.random.default_rng(2)
+        angles = np.linspace(0, 2 * np.pi, 8, endpoint=False)
+        octagon = np.stack((np.cos(angles), np.sin(angles)), axis=1)
+        paths = [
+            center + radius * np.roll(octagon, rng.integers(8), axis=0)
+            for center, radius in zip(
+                rng.uniform(0, 1000, (300, 2)), rng.uniform(5, 20, 300)
+            )
+        ]
+        starts, ends = PathOrderer().get_endpoints(paths, is_closed_path=True)
+        greedy_order, _ = PathOrderer(max_passes=0).order(starts, ends)
+        orderer = PathOrderer()
+        order, is_reversed = orderer.order(starts, ends)
+
+        ordered_paths = orderer.order_paths(paths, is_closed_path=True)
+
+        # The 2-opt moves changed the greedy order
+        assert not np.array_equal(order, greedy_order)
+        assert not is_reversed.any()
+        assert all(
+            np.array_equal(ordered_path, paths[index])
+            for ordered_path, index in zip(ordered_paths, order.tolist())
+        )
+        ordered_starts, ordered_ends = orderer.get_endpoints(
+            ordered_paths, is_closed_path=True
+        )
+        assert np.array_equal(ordered_starts, starts[order])
+        assert np.array_equal(ordered_ends, ends[order])
+
+    def test_order_keeps_all_paths(self) -> None:
+        """Test that each path is drawn exactly once and that the travel is not increased."""
+        rng = np.random.default_rng(0)
+        paths = [rng.uniform(0, 1000, (rng.integers(1, 5), 2)) for _ in range(2000)]
+        orderer = PathOrderer()
+
+        ordered_paths = orderer.order_paths(paths)
+
+        def canonical(path: np.ndarray) -> tuple[float, ...]:
+            return min(tuple(path.ravel()), tuple(path[::-1].ravel()))
+
+        assert sorted(map(canonical, ordered_paths)) == sorted(map(canonical, paths))
+        assert orderer.get_travel(ordered_paths) < orderer.get_travel(paths) / 10
+
+    def test_order_near_optimal(self) -> None:
+        """Test that small instances are ordered close to the optimal travel."""
+        rng = np.random.default_rng(1)
+        orderer = PathOrderer()
+        ratios = []
+        for _ in range(20):
+            starts = rng.uniform(0, 100, (5, 2))
+            ends = starts + rng.uniform(-30, 30, (5, 2))
+
+            order, is_reversed = orderer.order(starts, ends)
+
+            paths = [
+                (
+                    np.array([ends[index], starts[index]])
+                    if reverse
+                    else np.array([starts[index], ends[index]])
+                )
+                for index, reverse in zip(order, is_reversed)
+            ]
+            assert sorted(order.tolist()) == list(range(5))
+            ratios.append(
+                orderer.get_travel(paths) / brute_force_travel(starts, ends, (0, 0))
+            )
+
+        assert max(ratios) < 1.5
+        assert np.mean(ratios) < 1.1
+
+    def test_2_opt_improves_greedy(self) -> None:
+        """Test that the 2-opt passes reduce the travel of the greedy order."""
+        rng = np.random.default_rng(2)
+        paths = [rng.uniform(0, 100, 2) + rng.normal(0, 5, (3, 2)) for _ in range(500)]
+
+        greedy_travel = PathOrderer(max_passes=0).get_travel(
+            PathOrderer(max_passes=0).order_paths(paths)
+        )
+        improved_travel = PathOrderer().get_travel(PathOrderer().order_paths(paths))
+
+        assert improved_travel < greedy_travel
+
+    def test_get_travel(self) -> None:
+        """Test the get_travel method."""
+        paths = [np.array([[3, 4], [6, 4]]), np.array([]), np.array([[6, 8]])]
+
+        assert PathOrderer().get_travel(paths) == pytest.approx(9)
+        assert PathOrderer(start=(3, 4)).get_travel(
+            paths, is_closed_path=True
+        ) == pytest.approx(5)
+
+    @pytest.mark.parametrize("window, max_passes", [(0, 10), (8, -1)])
+    def test_invalid(self, window: int, max_passes: int) -> None:
+        """Test invalid windows and numbers of passes."""
+        with pytest.raises(ValueError):
+            PathOrderer(window=window, max_passes=max_passes)
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+from utils import PathSimplifier
+
+
+def rdp_reference(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Recursive Ramer–Douglas–Peucker algorithm, one segment at a time."""
+
+    def distance(point: np.ndarray, start: np.ndarray, end: np.ndarray) -> float:
+        direction = end - start
+        squared_length = direction @ direction
+        projection = (
+            0 if squared_length == 0 else (point - start) @ direction / squared_length
+        )
+        projection = min(max(projection, 0), 1)
+        return float(np.hypot(*(point - start - projection * direction)))
+
+    kept_indices = {0, len(points) - 1}
+
+    def simplify(start: int, end: int) -> None:
+        if end - start < 2:
+            return
+        distances = [
+            distance(points[i], points[start], points[end])
+            for i in range(start + 1, end)
+        ]
+        farthest = start + 1 + int(np.argmax(distances))
+        if distances[farthest - start - 1] > tolerance:
+            kept_indices.add(farthest)
+            simplify(start, farthest)
+            simplify(farthest, end)
+
+    simplify(0, len(points) - 1)
+    return points[sorted(kept_indices)]
+
+
+def max_distance_to_simplified(points: np.ndarray, simplified: np.ndarray) -> float:
+    """Maximum distance between the points and the segment of the simplified polyline that replaces them."""
+    kept_indices = [
+        int(np.flatnonzero((points == point).all(axis=1))[0]) for point in simplified
+    ]
+    max_distance = 0.0
+    for start, end in zip(kept_indices[:-1], kept_indices[1:]):
+        direction = points[end] - points[start]
+        for point in points[start + 1 : end]:
+            offset = point - points[start]
+            projection = min(max(offset @ direction / (direction @ direction), 0), 1)
+            max_distance = max(
+                max_distance, float(np.hypot(*(offset - projection * direction)))
+            )
+    return max_distance
+
+
+class TestPathSimplifier:
+    """Test for the PathSimplifier class."""
+
+    @pytest.mark.parametrize(
+        "points, tolerance, expected",
+        [
+            ([[0, 0], [1, 0], [2, 0], [3, 0]], 0, [[0, 0], [3, 0]]),
+            ([[0, 0], [1, 1], [2, 0]], 0.5, [[0, 0], [1, 1], [2, 0]]),
+            ([[0, 0], [1, 1], [2, 0]], 1, [[0, 0], [2, 0]]),
+            ([[0, 0], [5, 0], [0, 0]], 1, [[0, 0], [5, 0], [0, 0]]),
+            ([[0, 0], [1, 0]], 10, [[0, 0], [1, 0]]),
+            ([[4, 2]], 10, [[4, 2]]),
+            ([], 10, []),
+        ],
+    )
+    def test_simplify(
+        self,
+        points: list[list[int]],
+        tolerance: float,
+        expected: list[list[int]],
+    ) -> None:
+        """Test the simplify method."""
+        simplified = PathSimplifier(tolerance).simplify(np.array(points))
+
+        assert simplified.tolist() == expected
+
+    def test_simplify_as_recursive(self) -> None:
+        """Test that the simplification keeps the same points as the recursive algorithm."""
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            # Random real coordinates, so no two points are exactly as far from a segment
+            points = np.cumsum(rng.normal(0, 3, (rng.integers(1, 300), 2)), axis=0)
+            tolerance = rng.uniform(0, 10)
+
+            simplified = PathSimplifier(tolerance).simplify(points)
+
+            assert np.array_equal(simplified, rdp_reference(points, tolerance))
+
+    def test_simplify_long_segments(self) -> None:
+        """Test that splitting long segments at their middle keeps the points within the tolerance."""
+        angles = np.linspace(0, 20 * np.pi, 2000)
+        points = np.column_stack(
+            (100 * np.cos(angles) + angles, 100 * np.sin(angles))
+        ).round(3)
+        simplifier = PathSimplifier(0.5)
+        simplifier.MIDDLE_SPLIT_MIN_POINTS = 64
+
+        simplified = simplifier.simplify(points)
+
+        assert 2 < len(simplified) < len(points)
+        assert max_distance_to_simplified(points, simplified) <= 0.5
+
+    def test_simplify_paths(self) -> None:
+        """Test that simplifying several paths at once gives the same result as one at a time."""
+        rng = np.random.default_rng(1)
+        paths = [
+            np.cumsum(rng.integers(-5, 6, (length, 2)), axis=0)
+            for length in (0, 1, 2, 50, 300)
+        ]
+        simplifier = PathSimplifier(2)
+
+        simplified_paths = simplifier.simplify_paths(paths)
+
+        assert len(simplified_paths) == len(paths)
+        for path, simplified in zip(paths, simplified_paths):
+            assert np.array_equal(simplified, simplifier.simplify(path))
+
+    @pytest.mark.parametrize(
+        "tolerance, points",
+        [(-1, [[0, 0]]), (1, [[0, 0, 0]]), (1, [0, 0])],
+    )
+    def test_invalid(self, tolerance: float, points: list) -> None:
+        """Test invalid tolerances and points."""
+        with pytest.raises(ValueError):
+            PathSimplifier(tolerance).simplify(np.array(points))
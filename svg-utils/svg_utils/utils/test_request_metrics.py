@@ -0,0 +1,88 @@
+import time
+
+from utils import (
+    RequestMetrics,
+    RequestTimer,
+    activate_timer,
+    record_point_count,
+    record_stage_duration,
+    time_stage,
+)
+
+
+class TestRequestMetrics:
+    """Test for the RequestTimer and RequestMetrics classes."""
+
+    def test_time_stage(self) -> None:
+        """Test that the stages are recorded by the active timer only, adding up by name."""
+        timer = RequestTimer()
+
+        with time_stage("ignored"):
+            record_point_count(5)
+        with activate_timer(timer):
+            with time_stage("parse"):
+                time.sleep(0.01)
+            with time_stage("parse"), time_stage("encode"):
+                pass
+            record_point_count(3)
+            record_stage_duration("encode", 0.5)
+        with time_stage("ignored"):
+            record_stage_duration("ignored", 0.5)
+
+        assert list(timer.stage_durations) == ["parse", "encode"]
+        assert timer.stage_durations["parse"] >= 0.01
+        assert 0.5 <= timer.stage_durations["encode"] < 0.51
+        assert timer.point_count == 3
+        assert timer.get_duration() >= timer.stage_durations["parse"]
+
+    def test_get_server_timing(self) -> None:
+        """Test the Server-Timing header value."""
+        timer = RequestTimer()
+        timer.stage_durations = {"parse": 0.00125, "generate": 0.5}
+
+        assert timer.get_server_timing() == "parse;dur=1.25, generate;dur=500.00"
+
+    def test_render(self) -> None:
+        """Test the Prometheus text format of the metrics."""
+        metrics = RequestMetrics("test")
+        for duration, status in [(2**-9, 200), (2**-3, 200), (2**-8, 400)]:
+            timer = RequestTimer()
+            timer.get_duration = lambda duration=duration: duration
+            timer.stage_durations = {"parse": duration}
+            timer.payload_bytes = 2000
+            timer.point_count = 150 if status == 200 else 0
+            metrics.observe("/path", status, timer)
+
+        lines = metrics.render().splitlines()
+
+        assert 'test_requests_total{route="/path",status="200"} 2' in lines
+        assert 'test_requests_total{route="/path",status="400"} 1' in lines
+        assert "# TYPE test_request_duration_seconds histogram" in lines
+        assert (
+            'test_request_duration_seconds_bucket{route="/path",le="0.005"} 2' in lines
+        )
+        assert 'test_request_duration_seconds_bucket{route="/path",le="0.1"} 2' in lines
+        assert (
+            'test_request_duration_seconds_bucket{route="/path",le="0.25"} 3' in lines
+        )
+        assert (
+            'test_request_duration_seconds_bucket{route="/path",le="+Inf"} 3' in lines
+        )
+        assert 'test_request_duration_seconds_sum{route="/path"} 0.130859375' in lines
+        assert 'test_request_duration_seconds_count{route="/path"} 3' in lines
+        assert (
+            'test_request_stage_duration_seconds_count{route="/path",stage="parse"} 3'
+            in lines
+        )
+        assert 'test_request_payload_bytes_bucket{route="/path",le="1000"} 0' in lines
+        assert 'test_request_payload_bytes_bucket{route="/path",le="10000"} 3' in lines
+        assert 'test_request_points_count{route="/path"} 2' in lines
+
+    def test_render_escape(self) -> None:
+        """Test that the label values are escaped."""
+        metrics = RequestMetrics("test")
+        metrics.observe('/a"b\\c', 200, RequestTimer())
+
+        assert 'test_requests_total{route="/a\\"b\\\\c",status="200"} 1' in (
+            metrics.render().splitlines()
+        )
@@ -0,0 +1,89 @@
+import pstats
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+from utils import ProfilingMiddleware, RequestProfiler
+
+
+def slow_function() -> None:
+    """Busy loop long enough to be sampled."""
+    end = time.perf_counter() + 0.05
+    while time.perf_counter() < end:
+        pass
+
+
+def app(environ: dict[str, Any], start_response: Callable) -> Iterator[bytes]:
+    """WSGI app streaming its response."""
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    for _ in range(2):
+        slow_function()
+        yield b"chunk"
+
+
+def call(
+    wsgi_app: Callable, path: str = "/generate", headers: dict[str, str] | None = None
+) -> bytes:
+    """Send a GET request to a WSGI app, without a server."""
+    environ = {"REQUEST_METHOD": "GET", "PATH_INFO": path, **(headers or {})}
+    return b"".join(wsgi_app(environ, lambda status, headers, exc_info=None: None))
+
+
+class TestRequestProfiler:
+    """Test for the RequestProfiler and ProfilingMiddleware classes."""
+
+    def test_should_profile(self, tmp_path: Path) -> None:
+        """Test that the next requests and the requests with the header are profiled."""
+        profiler = RequestProfiler(str(tmp_path), 2, "X-Profile")
+
+        decisions = [profiler.should_profile({}) for _ in range(3)]
+        decisions.append(profiler.should_profile({"HTTP_X_PROFILE": "1"}))
+        remaining_count = profiler.arm(1)
+
+        assert decisions == [True, True, False, True]
+        assert remaining_count == 1
+        assert profiler.should_profile({})
+        assert profiler.get_remaining_count() == 0
+
+    def test_cprofile(self, tmp_path: Path) -> None:
+        """Test that a profiled request is saved as a cProfile profile, with its streamed response."""
+        profiler = RequestProfiler(str(tmp_path), 1)
+        middleware = ProfilingMiddleware(app, profiler, "/profiles")
+
+        body = call(middleware, "/profiles")
+        body += call(middleware)
+        body += call(middleware)
+
+        assert body == b"chunk" * 6
+        profiles = profiler.list_profiles()
+        assert len(profiles) == 1
+        assert profiles[0]["name"].endswith("-GET-generate.prof")
+        stats = pstats.Stats(str(tmp_path / profiles[0]["name"]))
+        assert any(
+            function_name == "slow_function" and call_count == 2
+            for (_, _, function_name), (call_count, *_) in stats.stats.items()
+        )
+
+    def test_sampling(self, tmp_path: Path) -> None:
+        """Test that a profiled request is saved as collapsed stacks."""
+        profiler = RequestProfiler(str(tmp_path), 1, mode="sampling")
+
+        call(ProfilingMiddleware(app, profiler))
+
+        (profile,) = profiler.list_profiles()
+        assert profile["name"].endswith(".collapsed")
+        lines = (tmp_path / profile["name"]).read_text().splitlines()
+        samples = {
+            line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in lines
+        }
+        assert (
+            sum(count for stack, count in samples.items() if ":slow_function:" in stack)
+            > 10
+        )
+
+    @pytest.mark.parametrize("request_count, mode", [(-1, "cprofile"), (0, "unknown")])
+    def test_invalid(self, tmp_path: Path, request_count: int, mode: str) -> None:
+        """Test invalid numbers of requests and modes."""
+        with pytest.raises(ValueError):
+            RequestProfiler(str(tmp_path), request_count, mode=mode)
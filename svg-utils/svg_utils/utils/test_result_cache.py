@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from utils import ResultCache
+
+
+class TestResultCache:
+    """Test for the ResultCache class."""
+
+    def test_get_put(self) -> None:
+        """Test the get and put methods, with the counters."""
+        cache = ResultCache(100)
+
+        assert cache.get("a") is None
+        cache.put("a", b"result")
+
+        assert cache.get("a") == b"result"
+        assert cache.get_statistics() == {
+            "hits": 1,
+            "disk_hits": 0,
+            "misses": 1,
+            "entries": 1,
+            "bytes": 6,
+        }
+
+    def test_evict_least_recently_used(self) -> None:
+        """Test that the least recently used results are evicted to stay within the maximum size."""
+        cache = ResultCache(10)
+        cache.put("a", b"aaaa")
+        cache.put("b", b"bbbb")
+        cache.get("a")
+
+        cache.put("c", b"cccc")
+
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"cccc"
+        assert cache.get_statistics()["bytes"] == 8
+
+    def test_put_too_large(self) -> None:
+        """Test that a result larger than the maximum size is not kept in memory."""
+        cache = ResultCache(4)
+        cache.put("a", b"aaaa")
+
+        cache.put("b", b"bbbbb")
+
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("b") is None
+
+    def test_disk_tier(self, tmp_path: Path) -> None:
+        """Test that the results are read back from the disk, by another cache or once evicted."""
+        cache = ResultCache(4, str(tmp_path))
+        cache.put("0a", b"aaaa")
+        cache.put("0b", b"bbbbbbbb")
+
+        other_cache = ResultCache(4, str(tmp_path))
+
+        assert other_cache.get("0a") == b"aaaa"
+        assert other_cache.get("0b") == b"bbbbbbbb"
+        assert cache.get("0a") == b"aaaa"
+        assert other_cache.get_statistics()["disk_hits"] == 2
+        assert (tmp_path / "0b" / "0b").read_bytes() == b"bbbbbbbb"
+
+    def test_concurrent_use(self) -> None:
+        """Test that the cache stays within its maximum size when used by several threads."""
+        cache = ResultCache(1000)
+
+        def use(index: int) -> None:
+            key = str(index % 50)
+            if cache.get(key) is None:
+                cache.put(key, bytes(index % 37))
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(use, range(5000)))
+
+        statistics = cache.get_statistics()
+        assert statistics["hits"] + statistics["misses"] == 5000
+        assert statistics["bytes"] <= 1000
+
+    def test_invalid(self) -> None:
+        """Test an invalid maximum size."""
+        with pytest.raises(ValueError):
+            ResultCache(-1)
@@ -0,0 +1,114 @@
+import io
+from unittest import mock
+
+import pytest
+from utils.streaming_svg_builder import StreamingSVGBuilder
+from utils.svg_builder import SVGBuilder
+
+
+class TestStreamingSVGBuilder:
+    """Test for the StreamingSVGBuilder class."""
+
+    DEFAULT_FILENAME = "test_output.svg"
+    DEFAULT_SIZE = (400, 600)
+    DEFAULT_VIEWBOX = (0, 0, 400, 600)
+    DEFAULT_PROFILE = "tiny"
+
+    @pytest.fixture
+    def svg_builder(self) -> StreamingSVGBuilder:
+        """Fixture to create a StreamingSVGBuilder instance."""
+        return StreamingSVGBuilder(
+            filename=self.DEFAULT_FILENAME,
+            size=self.DEFAULT_SIZE,
+            viewbox=self.DEFAULT_VIEWBOX,
+            profile=self.DEFAULT_PROFILE,
+        )
+
+    def test_same_output_as_svg_builder(self, svg_builder: StreamingSVGBuilder) -> None:
+        """Test that the elements are written like SVGBuilder writes them."""
+        reference_builder = SVGBuilder(
+            filename=self.DEFAULT_FILENAME,
+            size=self.DEFAULT_SIZE,
+            viewbox=self.DEFAULT_VIEWBOX,
+            profile=self.DEFAULT_PROFILE,
+        )
+        reference_builder.clear()
+
+        for builder in (svg_builder, reference_builder):
+            builder.add_circle((100, 200), 50.5, fill="yellow", stroke_width=2)
+            builder.add_ellipse((100, 200), (25, 50))
+            builder.add_rectangle((100, 200), (25, 50), rx=5, ry=10)
+            builder.add_line((100, 200), (150, 250), stroke="red")
+            builder.add_path("M 50 100 L 150 200 Z", fill="none", class_="outline")
+            builder.add_text('a < b & "c"', (100, 200), font_size="20px")
+            builder.add_polygon([(100, 150), (200, 300), (400.5, 250)])
+            builder.add_polyline([(100, 150), (200, 300)])
+
+        assert svg_builder.get_svg_string() == reference_builder.get_svg_string()
+
+    def test_initialization(self, svg_builder: StreamingSVGBuilder) -> None:
+        """Test initialization of StreamingSVGBuilder."""
+        svg_string = svg_builder.get_svg_string().replace(",", " ")
+        assert svg_string.startswith("<svg")
+        assert svg_string.endswith("</svg>")
+        assert f'width="{self.DEFAULT_SIZE[0]}"' in svg_string
+        assert f'height="{self.DEFAULT_SIZE[1]}"' in svg_string
+        assert f'viewBox="{" ".join(map(str, self.DEFAULT_VIEWBOX))}"' in svg_string
+        assert f'baseProfile="{self.DEFAULT_PROFILE}"' in svg_string
+
+    def test_write_to_output_stream(self) -> None:
+        """Test that the elements are written to the output stream as soon as they are added."""
+        output = io.StringIO()
+        svg_builder = StreamingSVGBuilder(output, size=self.DEFAULT_SIZE)
+
+        svg_builder.add_path("M 50 100 L 150 200")
+        assert output.getvalue().endswith('<path d="M 50 100 L 150 200" />')
+
+        svg_builder.close()
+        assert output.getvalue().endswith("</svg>")
+        with pytest.raises(RuntimeError):
+            svg_builder.get_svg_string()
+
+    def test_set_size_after_start(self, svg_builder: StreamingSVGBuilder) -> None:
+        """Test that the size and the viewbox cannot be changed after elements have been written."""
+        svg_builder.add_circle((100, 100), 50)
+        with pytest.raises(RuntimeError):
+            svg_builder.set_size((800, 1000))
+        with pytest.raises(RuntimeError):
+            svg_builder.set_viewbox((0, 0, 800, 1000))
+
+    def test_add_after_close(self, svg_builder: StreamingSVGBuilder) -> None:
+        """Test that no element can be added after the SVG is closed."""
+        svg_builder.close()
+        with pytest.raises(RuntimeError):
+            svg_builder.add_circle((100, 100), 50)
+
+    def test_validation(self) -> None:
+        """Test that the attributes are only validated when required."""
+        StreamingSVGBuilder().add_circle((100, 100), 50, foo="bar")
+
+        svg_builder = StreamingSVGBuilder(validate=True)
+        with pytest.raises(ValueError):
+            svg_builder.add_circle((100, 100), 50, foo="bar")
+
+    def test_clear(self, svg_builder: StreamingSVGBuilder) -> None:
+        """Test clearing the SVG content."""
+        svg_builder.add_circle((100, 100), 50)
+        svg_builder.get_svg_string()
+        svg_builder.clear()
+        svg_builder.set_size((800, 1000))
+        svg_string = svg_builder.get_svg_string()
+        assert "<circle" not in svg_string
+        assert 'width="800"' in svg_string
+
+    @mock.patch("io.open", new_callable=mock.mock_open)
+    def test_save(self, mock_open: mock.Mock, svg_builder: StreamingSVGBuilder) -> None:
+        """Test saving the SVG to a file and verifying the filename.
+
+        The mock replaces the io.open call to avoid writing to the file system.
+        """
+        svg_builder.save()
+        mock_open.assert_called_once_with("test_output.svg", mode="w", encoding="utf-8")
+        content = mock_open().write.call_args[0][0]
+        assert "<svg" in content
+        assert "</svg>" in content
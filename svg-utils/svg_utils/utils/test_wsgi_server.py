@@ -0,0 +1,130 @@
+import _thread
+import http.client
+import io
+import json
+import socket
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+import pytest
+from utils import RequestSizeLimitMiddleware, WaitressServer, get_server_options
+
+
+def app(environ: dict[str, Any], start_response: Callable) -> Iterable[bytes]:
+    """WSGI app echoing the request body."""
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [environ["wsgi.input"].read(int(environ.get("CONTENT_LENGTH") or 0))]
+
+
+def call(wsgi_app: Callable, body: bytes) -> tuple[str, bytes]:
+    """Send a POST request to a WSGI app, without a server."""
+    statuses = []
+    environ = {
+        "REQUEST_METHOD": "POST",
+        "PATH_INFO": "/",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.input": io.BytesIO(body),
+    }
+    response_body = b"".join(
+        wsgi_app(
+            environ, lambda status, headers, exc_info=None: statuses.append(status)
+        )
+    )
+    return statuses[0], response_body
+
+
+class TestWSGIServer:
+    """Test for the RequestSizeLimitMiddleware and WaitressServer classes and the get_server_options function."""
+
+    def test_request_size_limit(self) -> None:
+        """Test that only the request bodies larger than the maximum size are rejected."""
+        middleware = RequestSizeLimitMiddleware(app, 10)
+
+        assert call(middleware, b"0123456789") == ("200 OK", b"0123456789")
+        status, body = call(middleware, b"01234567890")
+        assert status == "413 Request Entity Too Large"
+        assert json.loads(body)["error"] == "Request too large"
+
+    def test_gunicorn_options(self) -> None:
+        """Test the options of gunicorn, with an IPv6 host."""
+        options = get_server_options(
+            "gunicorn", "::0", 18000, workers=4, threads=2, keepalive=10
+        )
+
+        assert options["server"] == "gunicorn"
+        assert options["bind"] == "[::0]:18000"
+        assert options["workers"] == 4
+        assert options["threads"] == 2
+        assert options["worker_class"] == "gthread"
+        assert options["keepalive"] == 10
+
+    def test_waitress_options(self) -> None:
+        """Test the options of waitress, with the size limit of the request bodies."""
+        options = get_server_options(
+            "waitress", "0.0.0.0", 18000, threads=8, max_request_bytes=1000
+        )
+
+        assert options == {
+            "server": "waitress",
+            "host": "0.0.0.0",
+            "port": 18000,
+            "threads": 8,
+            "channel_timeout": 5,
+            "graceful_timeout": 30,
+            "max_request_body_size": 1000,
+        }
+
+    @pytest.mark.parametrize(
+        "server, workers, threads",
+        [("unknown", 1, 1), ("gunicorn", 0, 1), ("waitress", 2, 4), ("wsgiref", 1, 4)],
+    )
+    def test_invalid_options(self, server: str, workers: int, threads: int) -> None:
+        """Test unknown servers and numbers of workers or threads not supported by the server."""
+        with pytest.raises(ValueError):
+            get_server_options(server, "0.0.0.0", 18000, workers, threads)
+
+    def test_waitress_drain(self) -> None:
+        """Test that waitress finishes sending a response when it is stopped, and closes the listener."""
+        started = threading.Event()
+
+        def slow_app(
+            environ: dict[str, Any], start_response: Callable
+        ) -> Iterable[bytes]:
+            """WSGI app sending a large response after half a second."""
+            started.set()
+            time.sleep(0.5)
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            return [b"0123456789" * 100000] * 10
+
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        responses = []
+
+        def request() -> None:
+            """Send a request, then stop the server while it is handled."""
+            for _ in range(100):
+                try:
+                    connection = http.client.HTTPConnection("127.0.0.1", port)
+                    connection.request("GET", "/")
+                    break
+                except ConnectionRefusedError:
+                    time.sleep(0.05)
+            started.wait(5)
+            _thread.interrupt_main()
+            # Reading the response once the server is stopped, after the buffers of the socket are full
+            time.sleep(1)
+            response = connection.getresponse()
+            responses.append((response.status, response.read()))
+
+        client = threading.Thread(target=request)
+        client.start()
+        server = WaitressServer(host="127.0.0.1", port=port, graceful_timeout=5)
+        server.quiet = True
+        server.run(slow_app)
+        client.join()
+
+        assert responses == [(200, b"0123456789" * 1000000)]
+        with pytest.raises(ConnectionRefusedError):
+            socket.create_connection(("127.0.0.1", port), timeout=1)
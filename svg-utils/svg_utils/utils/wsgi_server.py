@@ -0,0 +1,261 @@
+# Also the server of projected_ar, which loads this file with its services/shared_module_service.py:
+# only import the standard library and bottle here (and the servers in the functions using them).
+import json
+import signal
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from bottle import ServerAdapter, run
+
+# Servers the apps can be run with: the single-threaded reference server of the standard library,
+# a multi-threaded server, and a pre-fork server with several threads per worker process (Linux and macOS only)
+SERVERS = ("wsgiref", "waitress", "gunicorn")
+
+
+class RequestSizeLimitMiddleware:
+    """WSGI middleware rejecting the requests whose body is larger than a maximum size, before reading it."""
+
+    def __init__(self, app: Callable, max_bytes: int) -> None:
+        """
+        Initializes a new RequestSizeLimitMiddleware object.
+
+        Args:
+            app (Callable): The WSGI app.
+            max_bytes (int): Maximum size of the request bodies, in bytes.
+
+        Raises:
+            ValueError: If the maximum size is not positive.
+        """
+        if max_bytes <= 0:
+            raise ValueError(
+                f"The maximum size of the requests must be positive, got {max_bytes}."
+            )
+        self._app: Callable = app
+        self._max_bytes: int = max_bytes
+
+    def __call__(
+        self, environ: dict[str, Any], start_response: Callable
+    ) -> Iterable[bytes]:
+        """
+        Handles a request, responding with a 413 error if its Content-Length is too large.
+
+        Args:
+            environ (dict[str, Any]): WSGI environ of the request.
+            start_response (Callable): WSGI start_response callable.
+
+        Returns:
+            Iterable[bytes]: Body of the response.
+        """
+        try:
+            content_length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            content_length = 0
+        if content_length <= self._max_bytes:
+            return self._app(environ, start_response)
+
+        body = json.dumps(
+            {
+                "error": "Request too large",
+                "message": f"The request body is too large. The maximum size allowed is {self._max_bytes} bytes.",
+            }
+        ).encode()
+        start_response(
+            "413 Request Entity Too Large",
+            [
+                ("Content-Type", "application/json"),
+                ("Content-Length", str(len(body))),
+            ],
+        )
+        return [body]
+
+
+def get_server_options(
+    server: str,
+    host: str,
+    port: int,
+    workers: int = 1,
+    threads: int = 1,
+    keepalive: int = 5,
+    graceful_timeout: int = 30,
+    timeout: int = 120,
+    max_request_bytes: int | None = None,
+) -> dict[str, Any]:
+    """
+    Gets the options of the Bottle adapter of a server.
+
+    Args:
+        server (str): Name of the server, one of SERVERS.
+        host (str): Host address the server listens on.
+        port (int): Port the server listens on.
+        workers (int): Number of worker processes, gunicorn only. Defaults to 1.
+        threads (int): Number of threads handling the requests in each worker process. Defaults to 1.
+        keepalive (int): Time an idle keep-alive connection is kept open, in seconds. Defaults to 5.
+        graceful_timeout (int): Time the requests being handled have to finish on shutdown, in seconds,
+            waitress and gunicorn only. Defaults to 30.
+        timeout (int): Time after which a worker process handling a request is restarted, in seconds,
+            gunicorn only. Defaults to 120.
+        max_request_bytes (int | None): Maximum size of the request bodies, in bytes, also enforced by waitress
+            for the bodies without a Content-Length. Defaults to None (no limit in the server).
+
+    Raises:
+        ValueError: If the server is unknown, or if a number of workers or of threads is not supported by the server.
+
+    Returns:
+        dict[str, Any]: The keyword arguments of bottle.run for the server, other than the app.
+    """
+    if server not in SERVERS:
+        raise ValueError(
+            f"The server must be one of {', '.join(SERVERS)}, got '{server}'."
+        )
+    if workers < 1 or threads < 1:
+        raise ValueError(
+            f"The numbers of workers and threads must be positive, got {workers} and {threads}."
+        )
+    if server != "gunicorn" and workers > 1:
+        raise ValueError(
+            f"Only gunicorn supports several worker processes, got {workers} for {server}."
+        )
+    if server == "wsgiref" and threads > 1:
+        raise ValueError(f"wsgiref is single-threaded, got {threads} threads.")
+
+    options: dict[str, Any] = {"server": server, "host": host, "port": port}
+    if server == "waitress":
+        options.update(
+            threads=threads,
+            channel_timeout=keepalive,
+            graceful_timeout=graceful_timeout,
+        )
+        if max_request_bytes is not None:
+            options["max_request_body_size"] = max_request_bytes
+    elif server == "gunicorn":
+        # IPv6 addresses are bracketed in the bind address of gunicorn
+        bind_host = f"[{host}]" if ":" in host and not host.startswith("[") else host
+        options.update(
+            bind=f"{bind_host}:{port}",
+            workers=workers,
+            threads=threads,
+            # Threaded workers, the only synchronous workers keeping the connections alive
+            worker_class="gthread",
+            keepalive=keepalive,
+            graceful_timeout=graceful_timeout,
+            timeout=timeout,
+        )
+    return options
+
+
+def run_server(app: Callable, options: dict[str, Any]) -> None:
+    """
+    Runs an app until the server is stopped, with Ctrl+C or SIGTERM.
+
+    gunicorn handles SIGTERM itself, stopping to accept connections and waiting for the responses being sent
+    (graceful_timeout). With the other servers, SIGTERM is handled like Ctrl+C: waitress does the same (see
+    WaitressServer), and wsgiref stops after the request being handled.
+
+    Args:
+        app (Callable): The WSGI app.
+        options (dict[str, Any]): Options of the server, see get_server_options.
+    """
+    if (
+        options["server"] != "gunicorn"
+        and threading.current_thread() is threading.main_thread()
+    ):
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    if options["server"] == "waitress":
+        options = {**options, "server": WaitressServer}
+    run(app, **options)
+
+
+class WaitressServer(ServerAdapter):
+    """
+    Bottle adapter of waitress, finishing the requests being handled when it is stopped.
+
+    The adapter of Bottle lets waitress stop on Ctrl+C, closing the connections of the responses being sent.
+    This one stops to accept connections, closes the idle ones, and keeps serving the others until their
+    responses are sent or for graceful_timeout seconds. A second Ctrl+C stops it at once.
+    """
+
+    def run(self, handler: Callable) -> None:
+        """
+        Runs the server until it is stopped with Ctrl+C, then finishes the requests being handled.
+
+        Args:
+            handler (Callable): The WSGI app.
+        """
+        from waitress import create_server, wasyncore
+
+        options = dict(self.options)
+        graceful_timeout = options.pop("graceful_timeout", 30)
+        socket_map: dict[int, Any] = {}
+        server = create_server(
+            handler, map=socket_map, host=self.host, port=self.port, **options
+        )
+        if not self.quiet:
+            server.print_listen("Serving on http://{}:{}")
+        loop_options = {
+            "timeout": server.adj.asyncore_loop_timeout,
+            "map": socket_map,
+            "use_poll": server.adj.asyncore_use_poll,
+        }
+        try:
+            wasyncore.loop(**loop_options)
+        except KeyboardInterrupt:
+            self._drain(socket_map, loop_options, graceful_timeout)
+        finally:
+            server.task_dispatcher.shutdown()
+            wasyncore.close_all(socket_map)
+
+    @staticmethod
+    def _drain(
+        socket_map: dict[int, Any], loop_options: dict[str, Any], timeout: float
+    ) -> None:
+        """
+        Stops to accept connections and serves the open ones until their requests are handled.
+
+        Args:
+            socket_map (dict[int, Any]): The sockets of the server, by file descriptor.
+            loop_options (dict[str, Any]): Options of the event loop of the server.
+            timeout (float): Maximum time to wait for the requests, in seconds.
+        """
+        from waitress.channel import HTTPChannel
+        from waitress.wasyncore import loop
+        from waitress.server import BaseWSGIServer
+
+        for dispatcher in list(socket_map.values()):
+            if isinstance(dispatcher, BaseWSGIServer):
+                # Closing the listening socket only, the trigger waking up the loop is shared with the connections
+                dispatcher.accepting = False
+                dispatcher.del_channel()
+                dispatcher.socket.close()
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            channels = [
+                dispatcher
+                for dispatcher in socket_map.values()
+                if isinstance(dispatcher, HTTPChannel)
+            ]
+            if not channels:
+                break
+            for channel in channels:
+                # Closing the connections without a request being received, handled or sent, even keep-alive
+                with channel.requests_lock:
+                    if not (
+                        channel.requests or channel.request or channel.total_outbufs_len
+                    ):
+                        channel.will_close = True
+            loop(count=1, **loop_options)
+
+
+def _raise_keyboard_interrupt(signal_number: int, frame: Any) -> None:
+    """
+    Handles a signal like Ctrl+C, which stops the servers run by Bottle.
+
+    Args:
+        signal_number (int): The signal.
+        frame (Any): The frame interrupted by the signal.
+
+    Raises:
+        KeyboardInterrupt: Always.
+    """
+    raise KeyboardInterrupt